@@ -1,11 +1,54 @@
+from decimal import ROUND_HALF_UP, Decimal
+
 from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import (
+    Boolean,
+    Integer,
+    Numeric,
+    String,
+    and_,
+    case,
+    cast,
+    column,
+    exists,
+    false,
+    insert,
+    null,
+    or_,
+    select,
+    true,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ..db import get_db
-from ..models import AlertKind, PriceAlert
-from ..schemas import AlertIn, AlertOut
+from ..db import get_async_db, get_db
+from ..models import AlertKind, AlertState, PriceAlert
+from ..schemas import AlertIn, AlertOut, BulkAlertsIn, BulkAlertsOut
+from ..serialization import ORJSONResponse, as_float, rows_to_dicts
+from ..services.symbols import normalize_ticker, symbol_ids
+from ..workers.watchlist import watchlist
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
+ALERT_COLUMNS = (
+    PriceAlert.id,
+    PriceAlert.ticker,
+    PriceAlert.kind,
+    as_float(PriceAlert.threshold_value),
+    PriceAlert.trailing,
+    PriceAlert.cooldown_seconds,
+    as_float(PriceAlert.rearm_band_pct),
+    PriceAlert.active,
+    PriceAlert.state,
+    PriceAlert.created_at,
+    PriceAlert.last_triggered_at,
+    PriceAlert.rearm_after,
+    as_float(PriceAlert.water_mark),
+    PriceAlert.water_mark_at,
+)
+
 
 def _serialize_alert(alert: PriceAlert) -> AlertOut:
     kind = alert.kind.value if hasattr(alert.kind, "value") else alert.kind
@@ -15,19 +58,29 @@ def _serialize_alert(alert: PriceAlert) -> AlertOut:
         kind=kind,
         threshold_value=float(alert.threshold_value),
         trailing=alert.trailing,
+        cooldown_seconds=alert.cooldown_seconds,
+        rearm_band_pct=float(alert.rearm_band_pct) if alert.rearm_band_pct is not None else None,
         active=alert.active,
+        state=alert.state.value if hasattr(alert.state, "value") else alert.state,
         created_at=alert.created_at,
         last_triggered_at=alert.last_triggered_at,
+        rearm_after=alert.rearm_after,
+        water_mark=float(alert.water_mark) if alert.water_mark is not None else None,
+        water_mark_at=alert.water_mark_at,
     )
 
 
 @router.post("", response_model=AlertOut)
 def create_alert(payload: AlertIn, db: Session = Depends(get_db)):
+    ticker = normalize_ticker(payload.ticker)
     a = PriceAlert(
-        ticker=payload.ticker.upper(),
+        ticker=ticker,
+        symbol_id=symbol_ids.resolve(db, ticker),
         kind=payload.kind,
         threshold_value=payload.threshold_value,
         trailing=payload.trailing,
+        cooldown_seconds=payload.cooldown_seconds,
+        rearm_band_pct=payload.rearm_band_pct,
     )
     db.add(a)
     db.commit()
@@ -37,12 +90,13 @@ def create_alert(payload: AlertIn, db: Session = Depends(get_db)):
 
 @router.post("/activate", response_model=AlertOut)
 def activate_alert(payload: AlertIn, db: Session = Depends(get_db)):
-    normalized_ticker = payload.ticker.upper()
+    normalized_ticker = normalize_ticker(payload.ticker)
+    symbol_id = symbol_ids.resolve(db, normalized_ticker)
 
     existing = (
         db.query(PriceAlert)
         .filter(
-            PriceAlert.ticker == normalized_ticker,
+            PriceAlert.symbol_id == symbol_id,
             PriceAlert.kind == payload.kind,
             PriceAlert.threshold_value == payload.threshold_value,
             PriceAlert.trailing == payload.trailing,
@@ -52,18 +106,31 @@ def activate_alert(payload: AlertIn, db: Session = Depends(get_db)):
     )
 
     if existing:
-        if not existing.active:
+        if not existing.active or existing.state == AlertState.fired:
+            # (re)activating arms the alert; a trailing stop starts tracking
+            # from the next quote
             existing.active = True
-            db.add(existing)
+            existing.state = AlertState.armed
+            existing.rearm_price = existing.rearm_above = existing.rearm_after = None
+            existing.water_mark = None
+            existing.water_mark_at = None
+        if "cooldown_seconds" in payload.model_fields_set:
+            existing.cooldown_seconds = payload.cooldown_seconds
+        if "rearm_band_pct" in payload.model_fields_set:
+            existing.rearm_band_pct = payload.rearm_band_pct
+        db.add(existing)
         db.commit()
         db.refresh(existing)
         return _serialize_alert(existing)
 
     new_alert = PriceAlert(
         ticker=normalized_ticker,
+        symbol_id=symbol_id,
         kind=payload.kind,
         threshold_value=payload.threshold_value,
         trailing=payload.trailing,
+        cooldown_seconds=payload.cooldown_seconds,
+        rearm_band_pct=payload.rearm_band_pct,
     )
     db.add(new_alert)
     db.commit()
@@ -73,12 +140,14 @@ def activate_alert(payload: AlertIn, db: Session = Depends(get_db)):
 
 @router.post("/deactivate", response_model=AlertOut)
 def deactivate_alert(payload: AlertIn, db: Session = Depends(get_db)):
-    normalized_ticker = payload.ticker.upper()
+    symbol_id = symbol_ids.lookup(db, payload.ticker)  # never creates a symbol
+    if symbol_id is None:
+        raise HTTPException(status_code=404, detail="Alert not found.")
 
     existing = (
         db.query(PriceAlert)
         .filter(
-            PriceAlert.ticker == normalized_ticker,
+            PriceAlert.symbol_id == symbol_id,
             PriceAlert.kind == payload.kind,
             PriceAlert.threshold_value == payload.threshold_value,
             PriceAlert.trailing == payload.trailing,
@@ -101,25 +170,218 @@ def deactivate_alert(payload: AlertIn, db: Session = Depends(get_db)):
     return _serialize_alert(existing)
 
 
+def _bulk_statement(ops):
+    """One statement applying ``ops``: rows of ``ord, op, symbol_id, ticker,
+    kind, threshold, trailing, cooldown, band, set_cooldown, set_band``.
+
+    Each op finds the newest alert with its (symbol, kind, threshold,
+    trailing), like the single endpoints.  Matches are updated in place,
+    missing upserts/activations inserted; returns ``ord`` plus the alert
+    columns.  Inserted rows get their ``ord`` by joining them back to the op
+    on the stored key, so ops must have distinct keys.
+    """
+
+    # typed in the CTE: bare VALUES columns would be text (or all-NULL)
+    types = {
+        "ord": Integer(),
+        "op": String(),
+        "symbol_id": Integer(),
+        "ticker": String(),
+        "kind": PriceAlert.kind.type,
+        "threshold": Numeric(12, 4),
+        "trailing": Boolean(),
+        "cooldown": Integer(),
+        "band": Numeric(6, 3),
+        "set_cooldown": Boolean(),
+        "set_band": Boolean(),
+    }
+    rows = values(*(column(name) for name in types), name="v").data(ops)
+    ops = select(*(cast(rows.c[name], type_).label(name) for name, type_ in types.items())).cte("ops")
+    same_key = and_(
+        PriceAlert.symbol_id == ops.c.symbol_id,
+        PriceAlert.kind == ops.c.kind,
+        PriceAlert.threshold_value == ops.c.threshold,
+        PriceAlert.trailing == ops.c.trailing,
+    )
+    target = (
+        select(ops.c.ord, PriceAlert.id)
+        .join_from(ops, PriceAlert, same_key)
+        .distinct(ops.c.ord)
+        .order_by(ops.c.ord, PriceAlert.created_at.desc())
+        .cte("target")
+    )
+
+    activate = ops.c.op == "activate"
+    # like /activate: switching on an inactive or fired alert re-arms it
+    arm = and_(activate, or_(PriceAlert.active.is_(False), PriceAlert.state == AlertState.fired))
+
+    def unless_armed(col):
+        return case((arm, null()), else_=col)
+
+    updated = (
+        update(PriceAlert)
+        .where(PriceAlert.id == target.c.id, target.c.ord == ops.c.ord)
+        .values(
+            active=case(
+                (activate, true()), (ops.c.op == "deactivate", false()), else_=PriceAlert.active
+            ),
+            state=case((arm, AlertState.armed), else_=PriceAlert.state),
+            rearm_price=unless_armed(PriceAlert.rearm_price),
+            rearm_above=unless_armed(PriceAlert.rearm_above),
+            rearm_after=unless_armed(PriceAlert.rearm_after),
+            water_mark=unless_armed(PriceAlert.water_mark),
+            water_mark_at=unless_armed(PriceAlert.water_mark_at),
+            cooldown_seconds=case(
+                (ops.c.set_cooldown, ops.c.cooldown), else_=PriceAlert.cooldown_seconds
+            ),
+            rearm_band_pct=case((ops.c.set_band, ops.c.band), else_=PriceAlert.rearm_band_pct),
+        )
+        .returning(ops.c.ord, PriceAlert.symbol_id, *ALERT_COLUMNS)
+        .cte("updated")
+    )
+    inserted = (
+        insert(PriceAlert)
+        .from_select(
+            [
+                "ticker",
+                "symbol_id",
+                "kind",
+                "threshold_value",
+                "trailing",
+                "cooldown_seconds",
+                "rearm_band_pct",
+            ],
+            select(
+                ops.c.ticker,
+                ops.c.symbol_id,
+                ops.c.kind,
+                ops.c.threshold,
+                ops.c.trailing,
+                ops.c.cooldown,
+                ops.c.band,
+            ).where(
+                ops.c.op != "deactivate",
+                ~exists().where(target.c.ord == ops.c.ord),
+            ),
+        )
+        .returning(
+            PriceAlert.symbol_id,
+            PriceAlert.threshold_value.label("stored_threshold"),
+            *ALERT_COLUMNS,
+        )
+        .cte("inserted")
+    )
+    inserted_ops = select(
+        ops.c.ord, inserted.c.symbol_id, *(inserted.c[col.key] for col in ALERT_COLUMNS)
+    ).join_from(
+        inserted,
+        ops,
+        and_(
+            ops.c.op != "deactivate",
+            ops.c.symbol_id == inserted.c.symbol_id,
+            ops.c.kind == inserted.c.kind,
+            ops.c.threshold == inserted.c.stored_threshold,
+            ops.c.trailing == inserted.c.trailing,
+        ),
+    )
+    return union_all(select(updated), inserted_ops)
+
+
+def _threshold_key(value: float) -> Decimal:
+    """``value`` as Postgres stores it in ``numeric(12,4)``.
+
+    float8 -> numeric goes through 15 significant digits, then rounds half
+    away from zero; Python's ``round`` works on the binary float instead and
+    can land on the other side (2.00005).
+    """
+
+    return Decimal(f"{value:.15g}").quantize(Decimal("0.0001"), ROUND_HALF_UP)
+
+
+@router.post("/bulk", response_model=BulkAlertsOut)
+def bulk_alerts(payload: BulkAlertsIn, db: Session = Depends(get_db)):
+    """Apply many upsert/activate/deactivate operations in one transaction."""
+
+    for item in payload.operations:
+        if item.kind not in AlertKind.__members__:
+            raise HTTPException(status_code=422, detail=f"Unknown alert kind: {item.kind}")
+    # only ops that may create an alert create symbols; deactivations look up
+    ids = symbol_ids.resolve_many(
+        db, (item.ticker for item in payload.operations if item.op != "deactivate")
+    )
+    ids.update(
+        symbol_ids.lookup_many(
+            db,
+            (
+                item.ticker
+                for item in payload.operations
+                if item.op == "deactivate" and normalize_ticker(item.ticker) not in ids
+            ),
+        )
+    )
+
+    # operations on the same alert collapse into the last one
+    keys = []
+    last_op: dict[tuple, tuple] = {}
+    for item in payload.operations:
+        ticker = normalize_ticker(item.ticker)
+        if ticker not in ids:
+            keys.append(None)  # deactivating an unknown ticker: nothing to do
+            continue
+        key = (ids[ticker], item.kind, _threshold_key(item.threshold_value), item.trailing)
+        keys.append(key)
+        last_op[key] = (
+            item.op,
+            ids[ticker],
+            ticker,
+            item.kind,
+            item.threshold_value,
+            item.trailing,
+            item.cooldown_seconds,
+            item.rearm_band_pct,
+            "cooldown_seconds" in item.model_fields_set and item.op != "deactivate",
+            "rearm_band_pct" in item.model_fields_set and item.op != "deactivate",
+        )
+    order = list(last_op)
+    rows = []
+    if order:
+        rows = db.execute(
+            _bulk_statement([(i, *last_op[key]) for i, key in enumerate(order)])
+        ).all()
+        db.commit()
+
+    by_key = {}
+    for alert in rows_to_dicts(rows):
+        ordinal = alert.pop("ord")
+        del alert["symbol_id"]
+        by_key[order[ordinal]] = alert
+    # the poller picks the changes up at once (other processes via the change feed)
+    watchlist.mark_changed(alert_ids=[alert["id"] for alert in by_key.values()])
+    return ORJSONResponse({"results": [by_key.get(key) for key in keys]})
+
+
 @router.get("", response_model=list[AlertOut])
-def list_alerts(
+async def list_alerts(
     active: bool | None = None,
     ticker: str | None = Query(default=None, min_length=1),
     kind: AlertKind | None = None,
     threshold_value: float | None = None,
     trailing: bool | None = None,
-    db: Session = Depends(get_db),
+    state: AlertState | None = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
-    q = db.query(PriceAlert)
+    q = select(*ALERT_COLUMNS)
     if active is not None:
-        q = q.filter(PriceAlert.active == active)
+        q = q.where(PriceAlert.active == active)
     if ticker:
-        q = q.filter(PriceAlert.ticker == ticker.upper())
+        q = q.where(PriceAlert.ticker == normalize_ticker(ticker))
     if kind is not None:
-        q = q.filter(PriceAlert.kind == kind)
+        q = q.where(PriceAlert.kind == kind)
     if threshold_value is not None:
-        q = q.filter(PriceAlert.threshold_value == threshold_value)
+        q = q.where(PriceAlert.threshold_value == threshold_value)
     if trailing is not None:
-        q = q.filter(PriceAlert.trailing == trailing)
-    rows = q.order_by(PriceAlert.created_at.desc()).all()
-    return [_serialize_alert(r) for r in rows]
+        q = q.where(PriceAlert.trailing == trailing)
+    if state is not None:
+        q = q.where(PriceAlert.state == state)
+    rows = await db.execute(q.order_by(PriceAlert.created_at.desc()))
+    return ORJSONResponse(rows_to_dicts(rows))
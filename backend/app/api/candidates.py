@@ -1,15 +1,31 @@
 # app/api/candidates.py
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from ..db import get_db
-from ..models import CandidateFiltered
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, cast, func, literal, select, tuple_
+from ..db import get_async_db
+from ..models import CandidateFiltered, RuleSnapshot
 from ..schemas import CandidateDTO
+from ..serialization import ORJSONResponse, as_float, rows_to_dicts
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 from datetime import datetime, timedelta
+from typing import Literal
 from zoneinfo import ZoneInfo
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 router = APIRouter(prefix="/api/candidates", tags=["candidates"])
 
+MAX_CANDIDATES_PER_PAGE = 500
+
+CandidateSort = Literal["recent", "score"]
+
+# Keyset columns per sort order, all descending; ticker breaks ties.
+SORT_KEYS = {
+    "recent": ("last_seen_at", "score", "ticker"),
+    "score": ("score", "last_seen_at", "ticker"),
+}
+SORT_KEY_TYPES = {
+    "recent": (datetime, float, str),
+    "score": (float, datetime, str),
+}
 
 
 def session_bounds_utc(
@@ -49,50 +65,85 @@ def day_bounds_utc(day: str | None, tz: str = "America/Santiago"):
     end_local = start_local + timedelta(days=1)
     return start_local.astimezone(ZoneInfo("UTC")), end_local.astimezone(ZoneInfo("UTC"))
 
-@router.get("", response_model=list[CandidateDTO])
-def list_candidates(
+def latest_candidates_stmt(
+    open_utc: datetime,
+    close_utc: datetime,
+    sort: CandidateSort = "recent",
     limit: int = 20,
-    day: str | None = None,                 # market-local date; None = today
-    market_tz: str = "America/New_York",    # US equities session
-    open_time: str = "09:30",
-    close_time: str = "16:00",
-    db: Session = Depends(get_db),
+    after: tuple | None = None,
 ):
-    open_utc, close_utc = session_bounds_utc(day, market_tz, open_time, close_time)
+    """Latest ``candidates_filtered`` row per ticker inside a time window.
 
-    # latest record per ticker within the session window
-    sub = (
-        db.query(
-            CandidateFiltered.ticker.label("ticker"),
-            func.max(CandidateFiltered.last_seen_at).label("max_last"),
+    ``DISTINCT ON (symbol_id)`` walks ``ix_candidates_filtered_symbol_latest``
+    once, comparing integers rather than ticker strings, and always yields
+    exactly one row per ticker, even when two rows share the same
+    ``last_seen_at``.  ``after`` is the sort key of the previous page's
+    last row (see ``SORT_KEYS``).  Metrics come from typed columns, the
+    rules (``reasons``) from the row's shared ``rule_snapshots`` entry.
+    """
+
+    latest = (
+        select(
+            CandidateFiltered.ticker,
+            CandidateFiltered.score,
+            CandidateFiltered.last_seen_at,
+            CandidateFiltered.price,
+            CandidateFiltered.rvol,
+            CandidateFiltered.rule_snapshot_id,
         )
-        .filter(
+        .where(
             CandidateFiltered.last_seen_at >= open_utc,
-            CandidateFiltered.last_seen_at <  close_utc,
+            CandidateFiltered.last_seen_at < close_utc,
+        )
+        .distinct(CandidateFiltered.symbol_id)
+        .order_by(
+            CandidateFiltered.symbol_id,
+            CandidateFiltered.last_seen_at.desc(),
+            CandidateFiltered.id.desc(),
         )
-        .group_by(CandidateFiltered.ticker)
-        .subquery()
+        .subquery("latest")
     )
 
-    q = (
-        db.query(CandidateFiltered)
-        .join(
-            sub,
-            (CandidateFiltered.ticker == sub.c.ticker)
-            & (CandidateFiltered.last_seen_at == sub.c.max_last),
+    sort_key = [latest.c[name] for name in SORT_KEYS[sort]]
+    q = select(
+        latest.c.ticker,
+        func.coalesce(cast(latest.c.price, Float), 0.0).label("price"),
+        func.coalesce(cast(latest.c.rvol, Float), 0.0).label("rvol"),
+        as_float(latest.c.score, "score"),
+        func.coalesce(RuleSnapshot.rules_json, func.jsonb_build_object()).label("reasons"),
+        latest.c.last_seen_at,
+    ).outerjoin(RuleSnapshot, RuleSnapshot.id == latest.c.rule_snapshot_id)
+    if after is not None:
+        q = q.where(
+            tuple_(*sort_key)
+            < tuple_(*[literal(v, col.type) for v, col in zip(after, sort_key)])
         )
-        .order_by(CandidateFiltered.last_seen_at.desc(), CandidateFiltered.score.desc())
-        .limit(limit)
+    return q.order_by(*[col.desc() for col in sort_key]).limit(limit)
+
+
+@router.get("", response_model=list[CandidateDTO])
+async def list_candidates(
+    limit: int = Query(20, ge=1, le=MAX_CANDIDATES_PER_PAGE),
+    day: str | None = None,                 # market-local date; None = today
+    market_tz: str = "America/New_York",    # US equities session
+    open_time: str = "09:30",
+    close_time: str = "16:00",
+    sort: CandidateSort = "recent",
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    open_utc, close_utc = session_bounds_utc(day, market_tz, open_time, close_time)
+    after = decode_cursor(cursor, *SORT_KEY_TYPES[sort]) if cursor else None
+
+    result = await db.execute(
+        latest_candidates_stmt(open_utc, close_utc, sort, limit, after)
     )
+    rows = rows_to_dicts(result)
 
-    out = []
-    for r in q:
-        rs = r.reasons_json or {}
-        out.append(CandidateDTO(
-            ticker=r.ticker,
-            price=rs.get("price", 0.0),
-            rvol=rs.get("rvol", 0.0),
-            score=float(r.score),
-            reasons=rs.get("rules", {})
-        ))
-    return out
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            *[last[name] for name in SORT_KEYS[sort]]
+        )
+    return ORJSONResponse(rows, headers=headers)
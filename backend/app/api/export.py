@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..services.export import FORMATS, stream_export
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+ExportDataset = Literal[
+    "rvol_candidates", "candidates_filtered", "rule_snapshots", "positions", "price_quotes"
+]
+ExportFormat = Literal["arrow", "arrows", "parquet"]
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: ExportDataset,
+    start: datetime = Query(description="ISO date/time, UTC if naive"),
+    end: datetime | None = Query(default=None, description="exclusive; now when omitted"),
+    format: ExportFormat = "arrow",
+    batch_rows: int = Query(default=settings.EXPORT_BATCH_ROWS, ge=1024, le=1_048_576),
+):
+    """Stream ``dataset`` over ``[start, end)`` as Arrow IPC (file or stream) or Parquet.
+
+    See ``services.export`` for the schemas and how to load the result.
+    """
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise HTTPException(
+            status_code=501, detail="exports need pyarrow: pip install '.[export]'"
+        ) from None
+
+    start = _utc(start)
+    end = _utc(end) if end else datetime.now(timezone.utc)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=settings.EXPORT_MAX_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"range longer than {settings.EXPORT_MAX_DAYS} days"
+        )
+
+    media_type, extension = FORMATS[format]
+    filename = f"{dataset}_{start:%Y%m%d}_{end:%Y%m%d}.{extension}"
+    return StreamingResponse(
+        stream_export(dataset, start, end, format, batch_rows),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,96 @@
+import hashlib
+from typing import List
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..db import get_db
+from ..models import FilterRule
+from ..rules import RuleError, compile_rule
+from ..schemas import EffectiveFilterOut, FilterRuleIn, FilterRuleOut
+from ..services.filter_rules import (
+    effective_expression,
+    enabled_rule_sets,
+    invalidate_rule_sets,
+)
+from ..services.regime import regime_profiles
+
+router = APIRouter(prefix="/api/filters", tags=["filters"])
+
+
+def _serialize(rule: FilterRule) -> FilterRuleOut:
+    return FilterRuleOut(
+        id=rule.id,
+        name=rule.name,
+        expression=rule.expression,
+        enabled=rule.enabled,
+        version=rule.version,
+        updated_at=rule.updated_at,
+    )
+
+
+@router.get("", response_model=List[FilterRuleOut])
+def list_filters(db: Session = Depends(get_db)) -> List[FilterRuleOut]:
+    rules = db.execute(select(FilterRule).order_by(FilterRule.name)).scalars()
+    return [_serialize(rule) for rule in rules]
+
+
+@router.get("/effective", response_model=EffectiveFilterOut)
+def effective_filter(
+    request: Request, response: Response, db: Session = Depends(get_db)
+) -> EffectiveFilterOut | Response:
+    """The rule ``filter_and_score`` applies right now (the ingester uses it too).
+
+    Carries an ``ETag`` over its content; a matching ``If-None-Match`` gets
+    an empty 304, so pollers can revalidate every cycle for next to nothing.
+    """
+
+    regime, cfg = regime_profiles.active(db)
+    out = EffectiveFilterOut(
+        regime=regime.value,
+        expression=effective_expression(db, cfg),
+        versions=enabled_rule_sets(db).versions,
+    )
+    digest = hashlib.md5(orjson.dumps(out.model_dump(), option=orjson.OPT_SORT_KEYS))
+    etag = f'"{digest.hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return out
+
+
+@router.put("/{name}", response_model=FilterRuleOut)
+def put_filter(name: str, payload: FilterRuleIn, db: Session = Depends(get_db)) -> FilterRuleOut:
+    """Create or replace a rule set; every change bumps its version."""
+
+    try:
+        expression = compile_rule(payload.expression).expression
+    except RuleError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from None
+
+    rule = db.execute(select(FilterRule).where(FilterRule.name == name)).scalar_one_or_none()
+    if rule is None:
+        rule = FilterRule(name=name, expression=expression, enabled=payload.enabled, version=1)
+    elif (rule.expression, rule.enabled) != (expression, payload.enabled):
+        rule.expression = expression
+        rule.enabled = payload.enabled
+        rule.version += 1
+        rule.updated_at = func.now()
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    invalidate_rule_sets()  # don't wait for the notification
+    return _serialize(rule)
+
+
+@router.delete("/{name}")
+def delete_filter(name: str, db: Session = Depends(get_db)):
+    rule = db.execute(select(FilterRule).where(FilterRule.name == name)).scalar_one_or_none()
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Filter not found")
+    db.delete(rule)
+    db.commit()
+    invalidate_rule_sets()
+    return {"status": "deleted", "name": name}
@@ -1,39 +1,53 @@
+import asyncio
 from datetime import datetime
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from ..db import get_db
 from ..models import RvolBatch, RvolCandidate
 from ..schemas import IngestBatch, TestTelegramRequest
 from ..workers.scheduler import on_new_batch
 from ..services.notify import notify_telegram
+from ..services.symbols import normalize_ticker, symbol_ids
 from ..config import settings
+from ..db_metrics import render_prometheus
+from ..profiling import MAX_SECONDS, render_folded, sample_stacks
+from ..tracing import span
 
 router = APIRouter(prefix="/internal", tags=["internal"])
 
 @router.post("/ingest-rvol-batch")
 def ingest_rvol_batch(payload: IngestBatch, db: Session = Depends(get_db)):
-    # create batch
-    batch = RvolBatch(id=payload.batch_id)
-    db.add(batch)
-    db.commit()
+    with span("ingest.store", batch_id=str(payload.batch_id), rows=len(payload.items)):
+        # create batch
+        batch = RvolBatch(id=payload.batch_id)
+        db.add(batch)
+        db.commit()
 
-    # insert rows
-    for it in payload.items:
-        db.add(RvolCandidate(
-            batch_id=payload.batch_id,
-            ticker=it.ticker.upper(),
-            name=it.name,
-            rvol=it.rvol,
-            price=it.price,
-            pct_change=it.pct_change,
-            volume=it.volume,
-            market_cap=it.market_cap,
-            sector=it.sector,
-            analyst_rating=it.analyst_rating,
-        ))
-    db.commit()
+        # insert rows in one executemany, symbols resolved for the whole batch
+        ids = symbol_ids.resolve_many(db, (it.ticker for it in payload.items))
+        rows = []
+        for it in payload.items:
+            ticker = normalize_ticker(it.ticker)
+            rows.append({
+                "batch_id": payload.batch_id,
+                "ticker": ticker,
+                "symbol_id": ids[ticker],
+                "name": it.name,
+                "rvol": it.rvol,
+                "price": it.price,
+                "pct_change": it.pct_change,
+                "volume": it.volume,
+                "market_cap": it.market_cap,
+                "sector": it.sector,
+                "analyst_rating": it.analyst_rating,
+            })
+        if rows:
+            db.execute(insert(RvolCandidate), rows)
+        db.commit()
 
     # kick filtering + notifications synchronously for now
     on_new_batch(payload.batch_id)
@@ -65,3 +79,25 @@ def test_telegram(
     )
 
     return {"status": "sent", "message": message}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    """Connection-pool and query counters in Prometheus text format."""
+    return render_prometheus()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_SECONDS),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+) -> str:
+    """Sample all threads for ``seconds``; folded stacks for a flamegraph.
+
+    Render with ``flamegraph.pl``/``inferno-flamegraph`` or load the output
+    into speedscope.  Requires ``PROFILE_ENDPOINT=true``.
+    """
+    if not settings.PROFILE_ENDPOINT:
+        raise HTTPException(status_code=400, detail="Profiling endpoint is disabled")
+    stacks = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1e3)
+    return render_folded(stacks)
@@ -0,0 +1,35 @@
+import base64
+from datetime import datetime
+from typing import Any, Callable
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_PARSERS: dict[type, Callable[[Any], Any]] = {
+    datetime: datetime.fromisoformat,
+    UUID: UUID,
+    float: float,
+    str: str,
+}
+
+
+def encode_cursor(*values: Any) -> str:
+    """Pack the sort key of the last row of a page into an opaque token."""
+
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Unpack a token made by ``encode_cursor`` back into typed values."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = orjson.loads(base64.urlsafe_b64decode(padded))
+        if len(values) != len(types):
+            raise ValueError("cursor arity mismatch")
+        return tuple(_PARSERS[t](v) for t, v in zip(types, values))
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor.") from exc
@@ -1,18 +1,33 @@
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..db import get_db
+from ..db import get_async_db
 from ..models import Position
-from ..schemas import PortfolioPoint, PortfolioSummary
-from ..services.app_settings import load_app_settings
+from ..schemas import PortfolioSummary
+from ..serialization import ORJSONResponse, as_float
+from ..services.app_settings import load_app_settings_async
+from ..services.price_board import live_price
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
 
+SUMMARY_COLUMNS = (
+    Position.ticker,
+    Position.side,
+    as_float(Position.qty),
+    as_float(Position.entry_price),
+    as_float(Position.current_price),
+    as_float(Position.exit_price),
+    Position.created_at,
+    Position.closed_at,
+)
+
+
 def _calc_realized(position: Position) -> float:
     if position.exit_price is None:
         return 0.0
@@ -30,11 +45,9 @@ def _calc_unrealized(position: Position) -> float:
     if position.closed_at is not None:
         return 0.0
 
-    current_price = (
-        float(position.current_price)
-        if position.current_price is not None
-        else float(position.entry_price)
-    )
+    current_price = live_price(position.ticker, position.current_price)
+    if current_price is None:
+        current_price = float(position.entry_price)
     qty = float(position.qty)
     entry_price = float(position.entry_price)
 
@@ -44,11 +57,14 @@ def _calc_unrealized(position: Position) -> float:
 
 
 @router.get("/summary", response_model=PortfolioSummary)
-def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
-    positions: List[Position] = (
-        db.query(Position).order_by(Position.created_at.asc()).all()
+async def get_portfolio_summary(
+    db: AsyncSession = Depends(get_async_db),
+) -> ORJSONResponse:
+    result = await db.execute(
+        select(*SUMMARY_COLUMNS).order_by(Position.created_at.asc())
     )
-    app_settings = load_app_settings(db)
+    positions = result.all()
+    app_settings = await load_app_settings_async(db)
     starting_capital = float(app_settings.get("starting_capital", 0.0))
     now = datetime.now(timezone.utc)
 
@@ -61,7 +77,7 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
 
     if not positions:
         equity_series = [
-            PortfolioPoint(
+            dict(
                 timestamp=now,
                 label="Start",
                 realized=0.0,
@@ -70,7 +86,7 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
             )
         ]
         equity_series.append(
-            PortfolioPoint(
+            dict(
                 timestamp=now,
                 label="Now",
                 realized=0.0,
@@ -83,8 +99,8 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
             (p.created_at for p in positions if p.created_at is not None),
             default=now,
         )
-        equity_series: List[PortfolioPoint] = [
-            PortfolioPoint(
+        equity_series: List[Dict[str, Any]] = [
+            dict(
                 timestamp=first_timestamp,
                 label="Start",
                 realized=0.0,
@@ -110,7 +126,7 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
             tickers = sorted({ticker for ticker, _ in entries})
             label = "Closed " + ", ".join(tickers) if tickers else "Closed"
             equity_series.append(
-                PortfolioPoint(
+                dict(
                     timestamp=timestamp,
                     label=label,
                     realized=cumulative_realized,
@@ -120,7 +136,7 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
             )
 
         equity_series.append(
-            PortfolioPoint(
+            dict(
                 timestamp=now,
                 label="Now",
                 realized=cumulative_realized,
@@ -129,10 +145,12 @@ def get_portfolio_summary(db: Session = Depends(get_db)) -> PortfolioSummary:
             )
         )
 
-    return PortfolioSummary(
-        starting_capital=starting_capital,
-        current_capital=starting_capital + realized_total + unrealized_total,
-        realized_pnl=realized_total,
-        unrealized_pnl=unrealized_total,
-        equity_series=equity_series,
+    return ORJSONResponse(
+        dict(
+            starting_capital=starting_capital,
+            current_capital=starting_capital + realized_total + unrealized_total,
+            realized_pnl=realized_total,
+            unrealized_pnl=unrealized_total,
+            equity_series=equity_series,
+        )
     )
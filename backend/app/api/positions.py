@@ -1,20 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Literal
-from ..db import get_db
+from ..db import get_async_db, get_db
 from ..models import Position
 from ..schemas import PositionCreate, PositionOut, PositionUpdate
+from ..serialization import ORJSONResponse, as_float
+from ..services.price_board import live_price
+from ..services.symbols import normalize_ticker, symbol_ids
 
 router = APIRouter(prefix="/api/positions", tags=["positions"])
 
 
-def serialize_position(position: Position) -> PositionOut:
+POSITION_COLUMNS = (
+    Position.id,
+    Position.created_at,
+    Position.ticker,
+    Position.side,
+    as_float(Position.qty),
+    as_float(Position.entry_price),
+    as_float(Position.current_price),
+    as_float(Position.exit_price),
+    Position.notes,
+    Position.closed_at,
+)
+
+
+def position_payload(position) -> dict:
+    """Build the ``PositionOut`` fields from an ORM object or a selected row."""
+
     exit_price = (
         float(position.exit_price) if position.exit_price is not None else None
     )
-    current_price = (
-        float(position.current_price) if position.current_price is not None else None
-    )
+    # open positions price off the poller's shared board when it is fresh
+    if position.closed_at is None:
+        current_price = live_price(position.ticker, position.current_price)
+    else:
+        current_price = (
+            float(position.current_price) if position.current_price is not None else None
+        )
     qty = float(position.qty)
     entry_price = float(position.entry_price)
 
@@ -32,21 +57,25 @@ def serialize_position(position: Position) -> PositionOut:
             if entry_price:
                 unrealized_pct = ((current_price - entry_price) / entry_price) * 100.0
 
-    return PositionOut(
-        id=position.id,
-        created_at=position.created_at,
-        ticker=position.ticker,
-        side=position.side,
-        qty=float(position.qty),
-        entry_price=float(position.entry_price),
-        current_price=current_price,
-        exit_price=exit_price,
-        notes=position.notes,
-        closed_at=position.closed_at,
-        status="closed" if position.closed_at else "open",
-        unrealized_pnl=unrealized_pnl,
-        unrealized_pct=unrealized_pct,
-    )
+    return {
+        "id": position.id,
+        "created_at": position.created_at,
+        "ticker": position.ticker,
+        "side": position.side,
+        "qty": qty,
+        "entry_price": entry_price,
+        "current_price": current_price,
+        "exit_price": exit_price,
+        "notes": position.notes,
+        "closed_at": position.closed_at,
+        "status": "closed" if position.closed_at else "open",
+        "unrealized_pnl": unrealized_pnl,
+        "unrealized_pct": unrealized_pct,
+    }
+
+
+def serialize_position(position: Position) -> PositionOut:
+    return PositionOut(**position_payload(position))
 
 
 @router.post("", response_model=PositionOut)
@@ -54,6 +83,8 @@ def create_position(payload: PositionCreate, db: Session = Depends(get_db)):
     data = payload.dict(exclude_unset=True)
     if data.get("current_price") is None:
         data["current_price"] = data["entry_price"]
+    data["ticker"] = normalize_ticker(data["ticker"])
+    data["symbol_id"] = symbol_ids.resolve(db, data["ticker"])
     p = Position(**data)
     db.add(p)
     db.commit()
@@ -62,19 +93,19 @@ def create_position(payload: PositionCreate, db: Session = Depends(get_db)):
 
 
 @router.get("", response_model=list[PositionOut])
-def list_positions(
+async def list_positions(
     status: Literal["open", "closed", "all"] = Query("open"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(Position).order_by(Position.created_at.desc())
+    query = select(*POSITION_COLUMNS).order_by(Position.created_at.desc())
 
     if status == "open":
-        query = query.filter(Position.closed_at.is_(None))
+        query = query.where(Position.closed_at.is_(None))
     elif status == "closed":
-        query = query.filter(Position.closed_at.isnot(None))
+        query = query.where(Position.closed_at.isnot(None))
 
-    rows = query.all()
-    return [serialize_position(r) for r in rows]
+    rows = await db.execute(query)
+    return ORJSONResponse([position_payload(r) for r in rows])
 
 
 @router.put("/{position_id}", response_model=PositionOut)
@@ -90,6 +121,9 @@ def update_position(
         data["current_price"] = data["entry_price"]
     if data.get("exit_price") is not None:
         data["current_price"] = data["exit_price"]
+    if "ticker" in data:
+        data["ticker"] = normalize_ticker(data["ticker"])
+        data["symbol_id"] = symbol_ids.resolve(db, data["ticker"])
 
     for field, value in data.items():
         setattr(position, field, value)
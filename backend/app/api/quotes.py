@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Query
+
+from ..schemas import QuoteOut
+from ..serialization import ORJSONResponse
+from ..services.price_board import Quote, price_board
+from ..services.symbols import normalize_ticker
+
+router = APIRouter(prefix="/api/quotes", tags=["quotes"])
+
+
+def quote_payload(quote: Quote) -> dict:
+    return {
+        "ticker": quote.ticker,
+        "price": quote.price,
+        "day_high": quote.day_high,
+        "day_low": quote.day_low,
+        "at": datetime.fromtimestamp(quote.at, timezone.utc),
+    }
+
+
+@router.get("", response_model=list[QuoteOut])
+async def list_quotes(
+    tickers: str | None = Query(default=None, description="comma-separated; all when omitted"),
+    max_age: float | None = Query(default=None, gt=0, description="seconds"),
+):
+    """Latest poller quotes from the shared price board; no database access."""
+
+    if tickers:
+        wanted = dict.fromkeys(
+            normalize_ticker(ticker) for ticker in tickers.split(",") if ticker.strip()
+        )
+        quotes = price_board.many(wanted, max_age).values()
+    else:
+        quotes = price_board.snapshot(max_age)
+    return ORJSONResponse([quote_payload(quote) for quote in quotes])
@@ -1,18 +1,36 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import Text, cast, func, literal, literal_column, select, true, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
 from zoneinfo import ZoneInfo
 
-from ..db import get_db
+from ..db import get_async_db
 from ..models import RvolBatch, RvolCandidate
-from ..schemas import ActiveRvolBatch, ActiveRvolCandidate
+from ..schemas import ActiveRvolBatch
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
 
 
 router = APIRouter(prefix="/api/rvol", tags=["rvol"])
 
+MAX_BATCHES_PER_PAGE = 100
+
+# Columns a client may request through ``fields``; order matches ActiveRvolCandidate.
+CANDIDATE_FIELDS = {
+    "ticker": RvolCandidate.ticker,
+    "name": RvolCandidate.name,
+    "rvol": RvolCandidate.rvol,
+    "price": RvolCandidate.price,
+    "pct_change": RvolCandidate.pct_change,
+    "volume": RvolCandidate.volume,
+    "market_cap": RvolCandidate.market_cap,
+    "sector": RvolCandidate.sector,
+    "analyst_rating": RvolCandidate.analyst_rating,
+}
+
 
 def _day_bounds_utc(day: str | None, tz_name: str) -> tuple[datetime, datetime]:
     tz = ZoneInfo(tz_name)
@@ -27,69 +45,114 @@ def _day_bounds_utc(day: str | None, tz_name: str) -> tuple[datetime, datetime]:
     return start_local.astimezone(ZoneInfo("UTC")), end_local.astimezone(ZoneInfo("UTC"))
 
 
-def _to_candidate_payload(row: RvolCandidate) -> ActiveRvolCandidate:
-    def _maybe_float(value):
-        if value is None:
-            return None
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return None
-
-    return ActiveRvolCandidate(
-        ticker=row.ticker,
-        name=row.name,
-        rvol=_maybe_float(row.rvol),
-        price=_maybe_float(row.price),
-        pct_change=_maybe_float(row.pct_change),
-        volume=row.volume,
-        market_cap=row.market_cap,
-        sector=row.sector,
-        analyst_rating=row.analyst_rating,
+def _parse_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(CANDIDATE_FIELDS)
+
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = sorted(set(selected) - CANDIDATE_FIELDS.keys())
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    # keep declaration order and drop duplicates
+    return [name for name in CANDIDATE_FIELDS if name in selected]
+
+
+def _active_batches_stmt(
+    fields: list[str],
+    start_utc: datetime,
+    end_utc: datetime,
+    limit: int,
+    after: tuple[datetime, UUID] | None,
+):
+    """Build one statement returning each batch as a ready-made JSON document.
+
+    Candidates are aggregated per batch with a lateral ``json_agg`` so Postgres
+    does all the serialization; Python only concatenates the per-batch strings.
+    """
+
+    batches = select(RvolBatch.id, RvolBatch.ingested_at).where(
+        RvolBatch.ingested_at >= start_utc, RvolBatch.ingested_at < end_utc
+    )
+    if after is not None:
+        after_ts, after_id = after
+        batches = batches.where(
+            tuple_(RvolBatch.ingested_at, RvolBatch.id)
+            < tuple_(
+                literal(after_ts, RvolBatch.ingested_at.type),
+                literal(after_id, RvolBatch.id.type),
+            )
+        )
+    batches = (
+        batches.order_by(RvolBatch.ingested_at.desc(), RvolBatch.id.desc())
+        .limit(limit)
+        .subquery("b")
+    )
+
+    item = func.json_build_object(
+        *[arg for name in fields for arg in (literal(name), CANDIDATE_FIELDS[name])]
+    )
+    items = (
+        select(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(item, RvolCandidate.rvol.desc())),
+                literal_column("'[]'::json"),
+            ).label("items")
+        )
+        .where(RvolCandidate.batch_id == batches.c.id)
+        .lateral("i")
+    )
+
+    document = func.json_build_object(
+        literal("batch_id"),
+        batches.c.id,
+        literal("ingested_at"),
+        batches.c.ingested_at,
+        literal("items"),
+        items.c["items"],
+    )
+
+    return (
+        select(batches.c.id, batches.c.ingested_at, cast(document, Text).label("doc"))
+        .select_from(batches.join(items, true()))
+        .order_by(batches.c.ingested_at.desc(), batches.c.id.desc())
     )
 
 
 @router.get("/active-batches", response_model=List[ActiveRvolBatch])
-def list_active_batches(
-    limit: int = 5,
+async def list_active_batches(
+    limit: int = Query(5, le=MAX_BATCHES_PER_PAGE),
     day: str | None = None,
     tz: str = "America/Santiago",
-    db: Session = Depends(get_db),
-) -> List[ActiveRvolBatch]:
-    """Return recently ingested RVOL batches with their filtered candidates."""
+    cursor: str | None = None,
+    fields: str | None = Query(
+        None, description="Comma-separated candidate fields to include."
+    ),
+    db: AsyncSession = Depends(get_async_db),
+) -> Response:
+    """Return recently ingested RVOL batches with their candidates.
+
+    Pages are keyed on ``(ingested_at, batch_id)``; when a page is full the
+    cursor for the next one is returned in the ``X-Next-Cursor`` header.
+    """
 
     if limit <= 0:
-        return []
+        return Response(content="[]", media_type="application/json")
 
+    selected = _parse_fields(fields)
+    after = decode_cursor(cursor, datetime, UUID) if cursor else None
     start_utc, end_utc = _day_bounds_utc(day, tz)
 
-    batches = (
-        db.query(RvolBatch)
-        .filter(RvolBatch.ingested_at >= start_utc, RvolBatch.ingested_at < end_utc)
-        .order_by(RvolBatch.ingested_at.desc())
-        .limit(limit)
-        .all()
+    result = await db.execute(
+        _active_batches_stmt(selected, start_utc, end_utc, limit, after)
     )
+    rows = result.all()
 
-    if not batches:
-        return []
-
-    batch_ids = [batch.id for batch in batches]
+    headers = {}
+    if len(rows) == limit:
+        last = rows[-1]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(last.ingested_at, last.id)
 
-    items: Dict[UUID, List[ActiveRvolCandidate]] = {batch_id: [] for batch_id in batch_ids}
-
-    for row in (
-        db.query(RvolCandidate)
-        .filter(RvolCandidate.batch_id.in_(batch_ids))
-        .order_by(RvolCandidate.batch_id.desc(), RvolCandidate.rvol.desc())
-    ):
-        items.setdefault(row.batch_id, []).append(_to_candidate_payload(row))
-
-    return [
-        ActiveRvolBatch(
-            batch_id=batch.id,
-            ingested_at=batch.ingested_at,
-            items=items.get(batch.id, []),
-        )
-        for batch in batches
-    ]
+    body = "[" + ",".join(row.doc for row in rows) + "]"
+    return Response(content=body, media_type="application/json", headers=headers)
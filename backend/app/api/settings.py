@@ -4,13 +4,21 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from ..db import get_db
-from ..schemas import AppSettingsResponse, AppSettingsUpdate
+from ..models import Regime
+from ..schemas import AppSettingsResponse, AppSettingsUpdate, RegimeOut, RegimeUpdate
 from ..services.app_settings import load_app_settings, save_app_settings
+from ..services.regime import (
+    REGIME_PROFILES_KEY,
+    merge_profiles,
+    regime_profiles,
+    session_date,
+    set_regime,
+)
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 
 
-def _format_response(config: Dict[str, Any]) -> AppSettingsResponse:
+def _format_response(config: Dict[str, Any], regime: Regime) -> AppSettingsResponse:
     theme_config = config.get("theme")
 
     if not isinstance(theme_config, dict):
@@ -30,13 +38,15 @@ def _format_response(config: Dict[str, Any]) -> AppSettingsResponse:
             "mode": theme_mode,
             "primary_color": primary_color,
         },
+        regime=regime.value,
+        profiles={r.value: p for r, p in merge_profiles(config).items()},
     )
 
 
 @router.get("", response_model=AppSettingsResponse)
 def get_settings(db: Session = Depends(get_db)) -> AppSettingsResponse:
     config = load_app_settings(db)
-    return _format_response(config)
+    return _format_response(config, regime_profiles.state(db).regime)
 
 
 @router.put("", response_model=AppSettingsResponse)
@@ -61,8 +71,40 @@ def update_settings(
         if "primary_color" in theme_data:
             updates["theme_primary"] = theme_data["primary_color"]
 
+    if data.get("profiles"):
+        stored = load_app_settings(db).get(REGIME_PROFILES_KEY)
+        profiles = dict(stored) if isinstance(stored, dict) else {}
+        for regime, values in data["profiles"].items():
+            changes = {k: v for k, v in values.items() if v is not None}
+            profiles[regime] = {**profiles.get(regime, {}), **changes}
+        updates[REGIME_PROFILES_KEY] = profiles
+
     if not updates:
         raise HTTPException(status_code=400, detail="No settings provided for update")
 
     config = save_app_settings(db, updates)
-    return _format_response(config)
+    regime_profiles.invalidate()
+    return _format_response(config, regime_profiles.state(db).regime)
+
+
+def _regime_out(db: Session) -> RegimeOut:
+    state = regime_profiles.state(db)
+    return RegimeOut(
+        for_date=state.day,
+        regime=state.regime.value,
+        source=state.source,
+        profile=state.config,
+    )
+
+
+@router.get("/regime", response_model=RegimeOut)
+def get_regime(db: Session = Depends(get_db)) -> RegimeOut:
+    """Today's market regime and the filter profile it selects."""
+
+    return _regime_out(db)
+
+
+@router.put("/regime", response_model=RegimeOut)
+def update_regime(payload: RegimeUpdate, db: Session = Depends(get_db)) -> RegimeOut:
+    set_regime(db, payload.for_date or session_date(), Regime(payload.regime), payload.notes)
+    return _regime_out(db)
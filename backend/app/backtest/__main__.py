@@ -0,0 +1,170 @@
+"""Backtest filter settings and alert thresholds against stored batches.
+
+Take a snapshot while the database is reachable, then sweep offline:
+
+    python -m app.backtest snapshot --start 2025-01-02 --end 2025-02-01 --out jan.npz
+    python -m app.backtest run --snapshot jan.npz --workers 8 --out jan.csv
+    python -m app.backtest optimize --snapshot jan.npz --workers 8 --write
+
+``--grid`` points at a JSON object mapping filter keys (``price_min``,
+``price_max``, ``min_rvol``, ``min_pct_change``, ``volume_cap``, ``topN``)
+and ``target_pct`` / ``stop_pct`` to lists of values.  Keys left out fall
+back to a spread around the settings captured in the snapshot.
+
+``optimize`` scores the grid per market regime, caches results by config
+hash and, with ``--write``, stores the best settings per regime as the
+``proposed_profiles`` app setting for review.
+
+``snapshot`` keeps only the candidate rows the enabled rule sets in
+``filters`` pass (``--no-rules`` keeps them all); the swept profile rules are
+applied on top.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+import pandas as pd
+
+from .data import load_history, load_snapshot, save_snapshot
+from .engine import outcomes
+from .grid import default_grid, expand_grid
+from .optimize import DEFAULT_CACHE_DIR, best_per_regime, build_proposal, optimize
+from .pool import sweep
+
+
+def _parse_day(value: str) -> datetime:
+    day = datetime.fromisoformat(value)
+    return day if day.tzinfo else day.replace(tzinfo=timezone.utc)
+
+
+def cmd_snapshot(args: argparse.Namespace) -> None:
+    from ..db import WorkerSessionLocal
+    from ..rules import compile_rule
+    from ..services.app_settings import load_app_settings
+    from ..services.filter_rules import enabled_rule_sets
+
+    db = WorkerSessionLocal()
+    try:
+        rule_sets = enabled_rule_sets(db).expression
+        rule = compile_rule(rule_sets) if rule_sets and not args.no_rules else None
+        history, prices = load_history(
+            db, _parse_day(args.start), _parse_day(args.end), rule
+        )
+        current = load_app_settings(db)
+    finally:
+        db.close()
+    save_snapshot(args.out, history, prices, current)
+    if rule is not None:
+        print(f"rule sets applied: {rule.expression}")
+    print(
+        f"saved {len(history)} candidate rows, {history.batch.max(initial=-1) + 1} "
+        f"batches and {len(prices.ts)} price observations to {args.out}"
+    )
+
+
+def _load_grid(args: argparse.Namespace, current: dict) -> dict:
+    grid = default_grid(current)
+    if args.grid:
+        with open(args.grid) as fh:
+            grid.update(json.load(fh))
+    return grid
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    history, prices, current = load_snapshot(args.snapshot)
+    configs, alerts = expand_grid(_load_grid(args, current))
+
+    started = time.perf_counter()
+    out = outcomes(history, prices, alerts)
+    prepared = time.perf_counter()
+    report = sweep(history, out, configs, workers=args.workers)
+    finished = time.perf_counter()
+    print(
+        f"{len(configs)} filter configs x {len(alerts)} alert pairs over "
+        f"{len(history)} rows: outcomes {prepared - started:.1f}s, "
+        f"sweep {finished - prepared:.1f}s"
+    )
+
+    if args.out:
+        report.to_csv(args.out, index=False)
+        print(f"wrote {len(report)} rows to {args.out}")
+
+    ranked = report[report["entries"] >= args.min_entries].sort_values(
+        args.sort, ascending=False
+    )
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(ranked.head(args.top).to_string(index=False))
+
+
+def cmd_optimize(args: argparse.Namespace) -> None:
+    _, _, current = load_snapshot(args.snapshot)
+    started = time.perf_counter()
+    results, cache, evaluated = optimize(
+        args.snapshot, _load_grid(args, current), args.cache_dir, args.workers
+    )
+    print(
+        f"{results['config_hash'].nunique()} configs, {evaluated} evaluated "
+        f"in {time.perf_counter() - started:.1f}s (cache: {cache.directory})"
+    )
+
+    best = best_per_regime(results, args.objective, args.min_entries)
+    if not best:
+        print(f"no config reached {args.min_entries} entries in any regime")
+        return
+    proposal = build_proposal(best, args.objective, cache.snapshot_digest)
+    print(json.dumps(proposal, indent=2))
+
+    if args.write:
+        from ..db import WorkerSessionLocal
+        from ..services.app_settings import PROPOSED_PROFILES_KEY, save_app_settings
+
+        db = WorkerSessionLocal()
+        try:
+            save_app_settings(db, {PROPOSED_PROFILES_KEY: proposal})
+        finally:
+            db.close()
+        print(f"stored as app setting {PROPOSED_PROFILES_KEY!r}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.backtest", description=__doc__.splitlines()[0]
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    snap = sub.add_parser("snapshot", help="dump batches and price history to .npz")
+    snap.add_argument("--start", required=True, help="ISO date/time, UTC if naive")
+    snap.add_argument("--end", required=True, help="ISO date/time, exclusive")
+    snap.add_argument("--out", required=True)
+    snap.add_argument(
+        "--no-rules", action="store_true", help="ignore the enabled rule sets in filters"
+    )
+    snap.set_defaults(func=cmd_snapshot)
+
+    run = sub.add_parser("run", help="sweep a parameter grid over a snapshot")
+    run.add_argument("--snapshot", required=True)
+    run.add_argument("--grid", help="JSON file with parameter lists")
+    run.add_argument("--workers", type=int, default=None)
+    run.add_argument("--out", help="CSV file for the full report")
+    run.add_argument("--sort", default="avg_alert_return")
+    run.add_argument("--min-entries", type=int, default=20)
+    run.add_argument("--top", type=int, default=15)
+    run.set_defaults(func=cmd_run)
+
+    opt = sub.add_parser("optimize", help="best settings per market regime")
+    opt.add_argument("--snapshot", required=True)
+    opt.add_argument("--grid", help="JSON file with parameter lists")
+    opt.add_argument("--workers", type=int, default=None)
+    opt.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    opt.add_argument("--objective", default="avg_alert_return")
+    opt.add_argument("--min-entries", type=int, default=20)
+    opt.add_argument("--write", action="store_true", help="save the proposal to app_settings")
+    opt.set_defaults(func=cmd_optimize)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Columnar snapshots of stored batches and price history for backtests.
+
+Everything the backtest needs is pulled out of Postgres once into flat NumPy
+arrays, which can be saved to a ``.npz`` file so later runs work fully
+offline (no database connection at all).
+"""
+
+import json
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import Float, cast, func, select, union_all
+from sqlalchemy.orm import Session
+
+from ..models import MarketRegime, PriceQuote, Regime, RvolBatch, RvolCandidate, Symbol
+from ..rules import Rule
+
+REGIMES = [regime.value for regime in Regime]
+SESSION_TZ = ZoneInfo("America/New_York")  # market_regime.for_date is a session date
+
+
+@dataclass
+class BatchHistory:
+    """One row per stored ``rvol_candidates`` row.
+
+    Rows are ordered by batch time, then by score (RVOL) descending inside the
+    batch, so the top-N of a batch is simply its first N passing rows.
+    ``pct_change`` is NaN where the screener reported none.  ``regime`` is
+    the session's ``market_regime`` entry (``hot`` when none was recorded).
+    """
+
+    batch: np.ndarray  # int32, dense batch index in time order
+    ts: np.ndarray  # int64, batch ingest time (epoch seconds)
+    ticker: np.ndarray  # int32, index into ``tickers``
+    price: np.ndarray  # float64
+    rvol: np.ndarray  # float64
+    pct_change: np.ndarray  # float64
+    volume: np.ndarray  # float64, 0 where unknown
+    tickers: np.ndarray  # str, ticker symbols (in symbol id order)
+    regime: np.ndarray  # int8, index into ``REGIMES``
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+
+@dataclass
+class PriceHistory:
+    """Per-ticker price series in CSR layout.
+
+    Observations for ``tickers[k]`` live in ``ts[offsets[k]:offsets[k + 1]]``
+    (sorted by time) with prices in the same slice of ``price``.
+    """
+
+    offsets: np.ndarray  # int64, len(tickers) + 1
+    ts: np.ndarray  # int64 epoch seconds
+    price: np.ndarray  # float64
+
+    def series(self, ticker: int) -> tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.offsets[ticker], self.offsets[ticker + 1]
+        return self.ts[lo:hi], self.price[lo:hi]
+
+
+def load_history(
+    db: Session, start: datetime, end: datetime, rule: Rule | None = None
+) -> tuple[BatchHistory, PriceHistory]:
+    """Read batches and price observations in ``[start, end)`` from the DB.
+
+    With ``rule`` (an ``app.rules`` rule, usually the enabled rule sets) only
+    candidate rows it passes are read, as if the others were never ingested.
+    """
+
+    where = [RvolBatch.ingested_at >= start, RvolBatch.ingested_at < end]
+    if rule is not None:
+        where.append(rule.where({name: getattr(RvolCandidate, name) for name in rule.columns}))
+    rows = db.execute(
+        select(
+            RvolBatch.id,
+            func.extract("epoch", RvolBatch.ingested_at).label("ts"),
+            RvolCandidate.symbol_id,
+            cast(RvolCandidate.price, Float),
+            cast(RvolCandidate.rvol, Float),
+            cast(RvolCandidate.pct_change, Float),
+            RvolCandidate.volume,
+        )
+        .join(RvolBatch, RvolBatch.id == RvolCandidate.batch_id)
+        .where(*where)
+        .order_by(RvolBatch.ingested_at, RvolBatch.id, RvolCandidate.rvol.desc())
+    ).all()
+
+    symbol_list = sorted({r[2] for r in rows})
+    names = dict(
+        db.execute(
+            select(Symbol.id, Symbol.ticker).where(Symbol.id.in_(symbol_list))
+        ).all()
+    )
+    tickers = np.array([names[s] for s in symbol_list], dtype=str)
+    ticker_index = {s: i for i, s in enumerate(symbol_list)}
+
+    regimes = {
+        for_date: REGIMES.index(Regime(regime).value)
+        for for_date, regime in db.execute(
+            select(MarketRegime.for_date, MarketRegime.regime)
+        )
+    }
+    default_regime = REGIMES.index(Regime.hot.value)
+
+    batch_index: dict = {}
+    history = BatchHistory(
+        batch=np.array(
+            [batch_index.setdefault(r[0], len(batch_index)) for r in rows],
+            dtype=np.int32,
+        ),
+        ts=np.array([int(r[1]) for r in rows], dtype=np.int64),
+        ticker=np.array([ticker_index[r[2]] for r in rows], dtype=np.int32),
+        price=np.array([r[3] for r in rows], dtype=np.float64),
+        rvol=np.array([r[4] for r in rows], dtype=np.float64),
+        pct_change=np.array(
+            [np.nan if r[5] is None else r[5] for r in rows], dtype=np.float64
+        ),
+        volume=np.array([r[6] or 0 for r in rows], dtype=np.float64),
+        tickers=tickers,
+        regime=np.array(
+            [
+                regimes.get(
+                    datetime.fromtimestamp(int(r[1]), SESSION_TZ).date(),
+                    default_regime,
+                )
+                for r in rows
+            ],
+            dtype=np.int8,
+        ),
+    )
+
+    # Poller quotes plus the prices the screener reported at each batch.
+    observations = union_all(
+        select(
+            PriceQuote.symbol_id.label("symbol_id"),
+            PriceQuote.quoted_at.label("at"),
+            cast(PriceQuote.price, Float).label("price"),
+        ).where(PriceQuote.symbol_id.in_(symbol_list)),
+        select(
+            RvolCandidate.symbol_id,
+            RvolBatch.ingested_at,
+            cast(RvolCandidate.price, Float),
+        ).join(RvolBatch, RvolBatch.id == RvolCandidate.batch_id),
+    ).subquery()
+    price_rows = db.execute(
+        select(
+            observations.c.symbol_id,
+            func.extract("epoch", observations.c.at),
+            observations.c.price,
+        )
+        .where(observations.c.at >= start, observations.c.symbol_id.in_(symbol_list))
+        .order_by(observations.c.symbol_id, observations.c.at)
+    ).all()
+
+    counts = np.zeros(len(tickers) + 1, dtype=np.int64)
+    for r in price_rows:
+        counts[ticker_index[r[0]] + 1] += 1
+    prices = PriceHistory(
+        offsets=np.cumsum(counts),
+        ts=np.array([int(r[1]) for r in price_rows], dtype=np.int64),
+        price=np.array([r[2] for r in price_rows], dtype=np.float64),
+    )
+    return history, prices
+
+
+def save_snapshot(
+    path: str,
+    history: BatchHistory,
+    prices: PriceHistory,
+    app_settings: Dict[str, Any],
+) -> None:
+    """Write a snapshot, including the settings that were live when taken."""
+
+    arrays = {f"batch_{f.name}": getattr(history, f.name) for f in fields(history)}
+    arrays.update({f"price_{f.name}": getattr(prices, f.name) for f in fields(prices)})
+    arrays["app_settings"] = np.array(json.dumps(app_settings, default=str))
+    np.savez_compressed(path, **arrays)
+
+
+def load_snapshot(path: str) -> tuple[BatchHistory, PriceHistory, Dict[str, Any]]:
+    with np.load(path, allow_pickle=False) as data:
+        app_settings = json.loads(str(data["app_settings"]))
+        history = BatchHistory(
+            **{f.name: data[f"batch_{f.name}"] for f in fields(BatchHistory)}
+        )
+        prices = PriceHistory(
+            **{f.name: data[f"price_{f.name}"] for f in fields(PriceHistory)}
+        )
+    return history, prices, app_settings
@@ -0,0 +1,201 @@
+"""Vectorized replay of the filter, scoring and alert pipeline.
+
+The work is split in two:
+
+* ``outcomes`` runs once per snapshot and, for every stored candidate row,
+  computes what happened to the price afterwards: forward returns at fixed
+  horizons and, for every (target %, stop %) alert pair, which of the two
+  ``should_trigger`` conditions fired first.  None of this depends on the
+  filter settings.
+* ``evaluate`` takes a chunk of filter configurations, builds a
+  configs x rows pick matrix with the same profile rules as
+  ``filter_and_score`` (``rules.profile_expression``) and reduces it
+  against the outcomes with a few matrix products.  ``pool.sweep`` spreads
+  the chunks over worker processes.  The enabled rule sets in ``filters``
+  do not vary with the config, so ``data.load_history`` applies them in SQL.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from .data import BatchHistory, PriceHistory
+
+FILTER_KEYS = ("price_min", "price_max", "min_rvol", "min_pct_change", "volume_cap", "topN")
+
+DEFAULT_HORIZONS = (3600, 4 * 3600, 24 * 3600)  # seconds after the batch
+DEFAULT_MAX_HOLD = 5 * 24 * 3600  # alerts not fired by then count as still open
+MARKET_DAY_TZ = "America/Santiago"  # the "today" used by filter_and_score
+
+# Upper bound on configs x rows cells materialised per chunk.
+CHUNK_CELLS = 5_000_000
+
+
+@dataclass
+class Outcomes:
+    horizons: np.ndarray  # (H,) seconds
+    forward: np.ndarray  # (N, H) return at each horizon, NaN if unknown
+    alerts: np.ndarray  # (A, 2) target %, stop %
+    target_hit: np.ndarray  # (N, A) bool, target fired before the stop
+    stop_hit: np.ndarray  # (N, A) bool, stop fired before the target
+    alert_return: np.ndarray  # (N, A) return at exit (or end of hold), NaN if unknown
+    group: np.ndarray  # (N,) dense (market day, ticker) id
+    batch_start: np.ndarray  # (N,) index of the first row of the row's batch
+
+
+def outcomes(
+    history: BatchHistory,
+    prices: PriceHistory,
+    alerts: Sequence[tuple[float, float]],
+    horizons: Sequence[int] = DEFAULT_HORIZONS,
+    max_hold: int = DEFAULT_MAX_HOLD,
+) -> Outcomes:
+    """Price outcomes of every candidate row, independent of filter settings.
+
+    Entry is the price the screener reported in the batch.  A target fires at
+    the first observation with ``(price - entry) / entry * 100 >= target`` and
+    a stop at the first with ``price <= entry * (1 - stop / 100)``, i.e. the
+    ``target_pct`` and ``stop`` rules of ``should_trigger`` with the stop
+    placed ``stop`` percent under entry.  Same-observation ties go to the stop.
+    """
+
+    n = len(history)
+    horizon_arr = np.asarray(horizons, dtype=np.int64)
+    alert_arr = np.asarray(alerts, dtype=np.float64).reshape(-1, 2)
+    a = len(alert_arr)
+
+    forward = np.full((n, len(horizon_arr)), np.nan)
+    target_hit = np.zeros((n, a), dtype=bool)
+    stop_hit = np.zeros((n, a), dtype=bool)
+    alert_return = np.full((n, a), np.nan)
+    target_mult = 1.0 + alert_arr[:, 0] / 100.0
+    stop_mult = 1.0 - alert_arr[:, 1] / 100.0
+
+    for i in range(n):
+        entry = history.price[i]
+        if not entry > 0:
+            continue
+        ts, px = prices.series(history.ticker[i])
+        lo = np.searchsorted(ts, history.ts[i], side="right")
+        hi = np.searchsorted(ts, history.ts[i] + max_hold, side="right")
+        if lo >= hi:
+            continue
+        ts, px = ts[lo:hi], px[lo:hi]
+
+        at = np.searchsorted(ts, history.ts[i] + horizon_arr, side="left")
+        known = at < len(ts)
+        forward[i, known] = px[at[known]] / entry - 1.0
+
+        # First crossing of each threshold via the running max / min.
+        first_up = np.searchsorted(np.maximum.accumulate(px), entry * target_mult)
+        first_down = np.searchsorted(-np.minimum.accumulate(px), -entry * stop_mult)
+        stopped = (first_down < len(px)) & (first_down <= first_up)
+        targeted = (first_up < len(px)) & ~stopped
+        exit_at = np.where(stopped, first_down, np.where(targeted, first_up, len(px) - 1))
+        stop_hit[i] = stopped
+        target_hit[i] = targeted
+        alert_return[i] = px[exit_at] / entry - 1.0
+
+    days = (
+        pd.to_datetime(history.ts, unit="s", utc=True)
+        .tz_convert(MARKET_DAY_TZ)
+        .strftime("%Y-%m-%d")
+    )
+    group, _ = pd.factorize(pd.MultiIndex.from_arrays([days, history.ticker]))
+    first = np.r_[True, history.batch[1:] != history.batch[:-1]]
+    batch_start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+
+    return Outcomes(
+        horizons=horizon_arr,
+        forward=forward,
+        alerts=alert_arr,
+        target_hit=target_hit,
+        stop_hit=stop_hit,
+        alert_return=alert_return,
+        group=group.astype(np.int64),
+        batch_start=batch_start,
+    )
+
+
+def _rank_within(mask: np.ndarray, start: np.ndarray) -> np.ndarray:
+    """1-based running count of ``mask`` since each row's segment ``start``."""
+
+    counts = np.cumsum(mask, axis=1, dtype=np.int32)
+    before = np.where(start > 0, counts[:, start - 1], 0)
+    return counts - before
+
+
+def pick_matrix(history: BatchHistory, out: Outcomes, configs: pd.DataFrame) -> np.ndarray:
+    """(K, N) mask of the rows each config would have *newly* surfaced.
+
+    A row is picked when it passes the profile's rules and ranks inside the
+    batch's ``topN`` by score (RVOL, so the snapshot's row order already is
+    the score order).  Like ``filter_and_score``, a ticker only counts once
+    per market day; later picks of the same ticker just refresh the existing
+    candidate and are not counted as new entries.
+    """
+
+    col = {key: configs[key].to_numpy(dtype=np.float64)[:, None] for key in FILTER_KEYS}
+    passed = (
+        (history.price >= col["price_min"])
+        & (history.price <= col["price_max"])
+        & (history.rvol >= col["min_rvol"])
+        & (history.volume <= col["volume_cap"])
+        & (history.pct_change >= col["min_pct_change"])  # NaN never passes
+    )
+    picked = passed & (_rank_within(passed, out.batch_start) <= col["topN"])
+
+    order = np.argsort(out.group, kind="stable")
+    grouped = out.group[order]
+    first = np.r_[True, grouped[1:] != grouped[:-1]]
+    group_start = np.maximum.accumulate(np.where(first, np.arange(len(grouped)), 0))
+    sorted_picks = picked[:, order]
+    new = sorted_picks & (_rank_within(sorted_picks, group_start) == 1)
+    entries = np.empty_like(new)
+    entries[:, order] = new
+    return entries
+
+
+def aggregate(picks: np.ndarray, out: Outcomes, configs: pd.DataFrame) -> pd.DataFrame:
+    """Reduce a (K, N) pick mask to hit rates and returns per (config, alert pair).
+
+    Every column of ``configs`` is carried over to the report.
+    """
+
+    picks = picks.astype(np.float64)
+    entries = picks.sum(axis=1)
+
+    fwd_known = ~np.isnan(out.forward)
+    fwd = np.nan_to_num(out.forward)
+    fwd_n = picks @ fwd_known
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fwd_mean = (picks @ fwd) / fwd_n
+        fwd_win = (picks @ (fwd > 0)) / fwd_n
+
+        ret_known = ~np.isnan(out.alert_return)
+        ret_n = picks @ ret_known
+        target_rate = (picks @ out.target_hit) / ret_n
+        stop_rate = (picks @ out.stop_hit) / ret_n
+        alert_mean = (picks @ np.nan_to_num(out.alert_return)) / ret_n
+
+    k, a = len(configs), len(out.alerts)
+    report = configs.loc[configs.index.repeat(a)].reset_index(drop=True)
+    report["target_pct"] = np.tile(out.alerts[:, 0], k)
+    report["stop_pct"] = np.tile(out.alerts[:, 1], k)
+    report["entries"] = np.repeat(entries, a).astype(np.int64)
+    report["target_rate"] = target_rate.ravel()
+    report["stop_rate"] = stop_rate.ravel()
+    report["avg_alert_return"] = alert_mean.ravel()
+    for h, horizon in enumerate(out.horizons):
+        label = f"{horizon // 3600}h" if horizon % 3600 == 0 else f"{horizon}s"
+        report[f"fwd_return_{label}"] = np.repeat(fwd_mean[:, h], a)
+        report[f"win_rate_{label}"] = np.repeat(fwd_win[:, h], a)
+    return report
+
+
+def evaluate(history: BatchHistory, out: Outcomes, configs: pd.DataFrame) -> pd.DataFrame:
+    """Hit rates and returns for a chunk of filter configs over all rows."""
+
+    return aggregate(pick_matrix(history, out, configs), out, configs)
@@ -0,0 +1,37 @@
+"""Parameter grids for backtests and the optimizer."""
+
+import itertools
+from typing import Any, Dict
+
+import pandas as pd
+
+from .engine import FILTER_KEYS
+
+
+def default_grid(current: Dict[str, Any]) -> Dict[str, list]:
+    price_min = float(current["price_min"])
+    price_max = float(current["price_max"])
+    min_rvol = float(current["min_rvol"])
+    min_pct = float(current["min_pct_change"])
+    volume_cap = int(current["volume_cap"])
+    top_n = int(current["topN"])
+    return {
+        "price_min": [price_min * f for f in (0.5, 1, 2)],
+        "price_max": [price_max * f for f in (0.5, 1, 2)],
+        "min_rvol": [min_rvol * f for f in (0.5, 0.75, 1, 1.5, 2)],
+        "min_pct_change": [min_pct + d for d in (-5, 0, 5, 10)],
+        "volume_cap": [int(volume_cap * f) for f in (0.25, 0.5, 1, 2)],
+        "topN": sorted({1, max(1, top_n // 2), top_n, top_n * 2}),
+        "target_pct": [5.0, 10.0, 20.0],
+        "stop_pct": [3.0, 5.0, 10.0],
+    }
+
+
+def expand_grid(grid: Dict[str, list]) -> tuple[pd.DataFrame, list[tuple[float, float]]]:
+    configs = pd.DataFrame(
+        list(itertools.product(*(grid[key] for key in FILTER_KEYS))),
+        columns=list(FILTER_KEYS),
+    ).drop_duplicates(ignore_index=True)
+    configs = configs[configs["price_min"] <= configs["price_max"]].reset_index(drop=True)
+    alerts = list(itertools.product(grid["target_pct"], grid["stop_pct"]))
+    return configs, alerts
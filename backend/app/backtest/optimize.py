@@ -0,0 +1,187 @@
+"""Grid search for the best filter settings per market regime.
+
+Every filter config is scored separately on the sessions marked ``hot`` and
+``cold`` in ``market_regime``.  Results are cached on disk by config hash,
+under a key made of the snapshot contents and the alert/horizon settings, so
+re-running with a widened grid only evaluates the new configs.  The
+outcome arrays of that key are kept next to the results and memory-mapped by
+the pool workers.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+from .data import REGIMES, load_snapshot
+from .engine import (
+    DEFAULT_HORIZONS,
+    DEFAULT_MAX_HOLD,
+    FILTER_KEYS,
+    aggregate,
+    outcomes,
+    pick_matrix,
+)
+from .grid import expand_grid
+from .pool import attach, is_published, publish, sweep
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/stockscreener/backtest")
+INTEGER_KEYS = ("volume_cap", "topN")
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    values = [float(config[key]) for key in FILTER_KEYS]
+    return hashlib.sha1(json.dumps(values).encode()).hexdigest()[:16]
+
+
+def evaluate_by_regime(history, out, configs: pd.DataFrame) -> pd.DataFrame:
+    """``engine.evaluate`` split by the regime of each row's session.
+
+    The regime is fixed for a whole session, so masking the picks afterwards
+    gives the same result as replaying each regime's sessions on their own.
+    """
+
+    picks = pick_matrix(history, out, configs)
+    frames = []
+    for code, name in enumerate(REGIMES):
+        rows = np.asarray(history.regime) == code
+        if rows.any():
+            report = aggregate(picks & rows, out, configs)
+            report.insert(0, "regime", name)
+            frames.append(report)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        directory: str,
+        snapshot: str,
+        alerts: list[tuple[float, float]],
+        horizons=DEFAULT_HORIZONS,
+        max_hold: int = DEFAULT_MAX_HOLD,
+    ):
+        self.snapshot_digest = file_digest(snapshot)
+        key = json.dumps(
+            {
+                "snapshot": self.snapshot_digest,
+                "alerts": [list(map(float, pair)) for pair in alerts],
+                "horizons": list(map(int, horizons)),
+                "max_hold": int(max_hold),
+            }
+        )
+        self.directory = os.path.join(
+            directory, hashlib.sha1(key.encode()).hexdigest()[:16]
+        )
+        self.arrays_dir = os.path.join(self.directory, "arrays")
+        self.results_path = os.path.join(self.directory, "results.csv")
+
+    def load(self) -> pd.DataFrame:
+        if not os.path.exists(self.results_path):
+            return pd.DataFrame(columns=["config_hash"])
+        return pd.read_csv(self.results_path, dtype={"config_hash": str})
+
+    def append(self, results: pd.DataFrame) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        exists = os.path.exists(self.results_path)
+        results.to_csv(self.results_path, mode="a", header=not exists, index=False)
+
+
+def optimize(
+    snapshot: str,
+    grid: Dict[str, list],
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    workers: int | None = None,
+) -> tuple[pd.DataFrame, ResultCache, int]:
+    """Evaluate ``grid`` per regime, reusing cached results where possible.
+
+    Returns the results for every config in the grid, the cache they came
+    from and how many configs had to be evaluated on this run.
+    """
+
+    configs, alerts = expand_grid(grid)
+    configs["config_hash"] = [config_hash(row) for row in configs.to_dict("records")]
+
+    cache = ResultCache(cache_dir, snapshot, alerts)
+    cached = cache.load()
+    todo = configs[~configs["config_hash"].isin(cached["config_hash"])]
+
+    frames = [cached]
+    if not todo.empty:
+        if is_published(cache.arrays_dir):
+            history, out = attach(cache.arrays_dir)
+        else:
+            history, prices, _ = load_snapshot(snapshot)
+            out = outcomes(history, prices, alerts)
+            publish(cache.arrays_dir, history, out)
+        fresh = sweep(
+            history,
+            out,
+            todo.reset_index(drop=True),
+            workers=workers,
+            task=evaluate_by_regime,
+            shared_dir=cache.arrays_dir,
+        )
+        cache.append(fresh)
+        frames.append(fresh)
+
+    frames = [f for f in frames if not f.empty]
+    results = (
+        pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=cached.columns)
+    )
+    results = results[results["config_hash"].isin(configs["config_hash"])]
+    return results.reset_index(drop=True), cache, len(todo)
+
+
+def best_per_regime(
+    results: pd.DataFrame, objective: str, min_entries: int
+) -> Dict[str, Dict[str, Any]]:
+    if results.empty:
+        return {}
+    eligible = results[(results["entries"] >= min_entries) & results[objective].notna()]
+    best: Dict[str, Dict[str, Any]] = {}
+    for regime, rows in eligible.groupby("regime"):
+        top = rows.loc[rows[objective].idxmax()]
+        best[regime] = {
+            key: (value.item() if isinstance(value, np.generic) else value)
+            for key, value in top.items()
+        }
+    return best
+
+
+def build_proposal(
+    best: Dict[str, Dict[str, Any]], objective: str, snapshot_digest: str
+) -> Dict[str, Any]:
+    """The ``proposed_profiles`` value stored in ``app_settings``."""
+
+    profiles = {}
+    metrics = {}
+    for regime, row in best.items():
+        profiles[regime] = {
+            key: int(row[key]) if key in INTEGER_KEYS else float(row[key])
+            for key in FILTER_KEYS
+        }
+        metrics[regime] = {
+            key: None if pd.isna(row[key]) else float(row[key])
+            for key in row
+            if key not in FILTER_KEYS and key not in ("regime", "config_hash")
+        }
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "objective": objective,
+        "snapshot": snapshot_digest,
+        "profiles": profiles,
+        "metrics": metrics,
+    }
@@ -0,0 +1,107 @@
+"""Fan config chunks out over a process pool sharing memory-mapped arrays.
+
+``publish`` writes every array of the history and outcomes as a ``.npy`` file
+in a directory; workers ``attach`` to them read-only with ``mmap_mode``, so
+they all share the page-cache copy instead of each unpickling their own.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import fields
+from functools import partial
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from .data import BatchHistory
+from .engine import CHUNK_CELLS, Outcomes, evaluate
+
+Task = Callable[[BatchHistory, Outcomes, pd.DataFrame], pd.DataFrame]
+
+_PARTS = (("history", BatchHistory), ("outcomes", Outcomes))
+
+
+def _path(directory: str, prefix: str, name: str) -> str:
+    return os.path.join(directory, f"{prefix}_{name}.npy")
+
+
+def publish(directory: str, history: BatchHistory, out: Outcomes) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for (prefix, _), obj in zip(_PARTS, (history, out)):
+        for f in fields(obj):
+            np.save(_path(directory, prefix, f.name), getattr(obj, f.name))
+
+
+def is_published(directory: str) -> bool:
+    return all(
+        os.path.exists(_path(directory, prefix, f.name))
+        for prefix, cls in _PARTS
+        for f in fields(cls)
+    )
+
+
+def attach(directory: str) -> tuple[BatchHistory, Outcomes]:
+    history, out = (
+        cls(
+            **{
+                f.name: np.load(_path(directory, prefix, f.name), mmap_mode="r")
+                for f in fields(cls)
+            }
+        )
+        for prefix, cls in _PARTS
+    )
+    return history, out
+
+
+_worker_state: tuple[BatchHistory, Outcomes] | None = None
+
+
+def _init_worker(directory: str) -> None:
+    global _worker_state
+    _worker_state = attach(directory)
+
+
+def _run_chunk(task: Task, configs: pd.DataFrame) -> pd.DataFrame:
+    history, out = _worker_state
+    return task(history, out, configs)
+
+
+def sweep(
+    history: BatchHistory,
+    out: Outcomes,
+    configs: pd.DataFrame,
+    workers: int | None = None,
+    task: Task = evaluate,
+    shared_dir: str | None = None,
+) -> pd.DataFrame:
+    """Run ``task`` over ``configs`` in chunks on ``workers`` processes.
+
+    ``shared_dir`` names a directory already filled by ``publish``; without
+    one the arrays are published to a temporary directory for this call.
+    """
+
+    if configs.empty:
+        return task(history, out, configs)
+
+    workers = workers or os.cpu_count() or 1
+    per_chunk = max(1, CHUNK_CELLS // max(1, len(history)))
+    per_chunk = min(per_chunk, -(-len(configs) // workers))
+    chunks = [configs.iloc[i : i + per_chunk] for i in range(0, len(configs), per_chunk)]
+
+    if workers == 1 or len(chunks) == 1:
+        return pd.concat([task(history, out, chunk) for chunk in chunks], ignore_index=True)
+
+    with ExitStack() as stack:
+        if shared_dir is None:
+            shared_dir = stack.enter_context(tempfile.TemporaryDirectory())
+            publish(shared_dir, history, out)
+        pool = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(shared_dir,)
+            )
+        )
+        results = list(pool.map(partial(_run_chunk, task), chunks))
+    return pd.concat(results, ignore_index=True)
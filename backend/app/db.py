@@ -1,11 +1,60 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 
 from .config import settings
+from .db_metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+def _engine_options(name: str, pool_size: int, max_overflow: int) -> dict:
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        )
+    return {
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_logging_name": name,
+        "connect_args": connect_args,
+    }
+
+
+# Request handlers and background workers get separate pools so a slow poller
+# cycle or batch filter can never starve the API of connections.
+engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    **_engine_options("api", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Read-heavy endpoints run on the event loop instead of Starlette's thread pool.
+async_engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    **_engine_options("api_async", settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW),
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+worker_engine = create_engine(
+    settings.DATABASE_URL,
+    poolclass=TimedQueuePool,
+    **_engine_options(
+        "worker", settings.DB_WORKER_POOL_SIZE, settings.DB_WORKER_MAX_OVERFLOW
+    ),
+)
+WorkerSessionLocal = sessionmaker(bind=worker_engine, autocommit=False, autoflush=False)
+
+instrument_engine(engine, "api")
+instrument_engine(async_engine.sync_engine, "api_async")
+instrument_engine(worker_engine, "worker")
+
 
 class Base(DeclarativeBase):
     pass
@@ -17,3 +66,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
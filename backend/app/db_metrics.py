@@ -0,0 +1,144 @@
+"""Connection-pool and query instrumentation for the SQLAlchemy engines.
+
+Each engine is built with a timed pool class named after its role (``api``,
+``api_async``, ``worker``) so checkout wait is measured per pool, and cursor
+events add every statement to the pool totals and to the ``QueryStats`` of
+whatever unit of work is currently tracked (an HTTP request or a worker job).
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryStats:
+    label: str
+    count: int = 0
+    seconds: float = 0.0
+
+
+class PoolMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.checkout_wait_max = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += waited
+            self.checkout_wait_max = max(self.checkout_wait_max, waited)
+
+    def record_query(self, elapsed: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += elapsed
+
+
+POOLS: dict[str, PoolMetrics] = {}
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "db_query_stats", default=None
+)
+
+
+def pool_metrics(name: str) -> PoolMetrics:
+    metrics = POOLS.get(name)
+    if metrics is None:
+        metrics = POOLS.setdefault(name, PoolMetrics(name))
+    return metrics
+
+
+class _TimedCheckout:
+    # ``logging_name`` survives Pool.recreate(), so it keys the metrics.
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics(self.logging_name or "default").record_checkout(
+                time.perf_counter() - start
+            )
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Attach query timing listeners to a (sync) engine."""
+
+    metrics = pool_metrics(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        metrics.record_query(elapsed)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.seconds += elapsed
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryStats]:
+    """Count the queries issued inside the block, warning on likely N+1s."""
+
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        threshold = settings.DB_QUERY_WARN_THRESHOLD
+        if threshold and stats.count > threshold:
+            logger.warning(
+                "%s issued %d queries (%.1f ms); possible N+1",
+                label,
+                stats.count,
+                stats.seconds * 1e3,
+            )
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.seconds * 1e3:.2f};desc="queries={stats.count}"'
+
+
+def render_prometheus() -> str:
+    lines = []
+    series = [
+        ("db_pool_checkouts_total", "counter", "checkouts"),
+        ("db_pool_checkout_wait_seconds_total", "counter", "checkout_wait_seconds"),
+        ("db_pool_checkout_wait_seconds_max", "gauge", "checkout_wait_max"),
+        ("db_queries_total", "counter", "queries"),
+        ("db_query_seconds_total", "counter", "query_seconds"),
+    ]
+    for metric, kind, attr in series:
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, metrics in sorted(POOLS.items()):
+            lines.append(f'{metric}{{pool="{name}"}} {getattr(metrics, attr)}')
+    return "\n".join(lines) + "\n"
@@ -1,21 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from .api import (
     internal,
     candidates,
     positions,
     alerts,
+    export,
+    filters,
     settings as settings_api,
     portfolio,
+    quotes,
     rvol,
 )
-from .workers.poller import run_price_poller
+from .services.changes import change_feed
 import threading
-from .db import engine, Base
+from .db import async_engine
+from .config import settings
+from .db_metrics import server_timing, track_queries
+from .tracing import span_from_traceparent
+from .serialization import ORJSONResponse
+from .api.pagination import NEXT_CURSOR_HEADER
 
-Base.metadata.create_all(engine)  # DEV ONLY; use Alembic later
+app = FastAPI(title="RVOL Screener", default_response_class=ORJSONResponse)
 
-app = FastAPI(title="RVOL Screener")
+if settings.GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
 
 app.add_middleware(
     CORSMiddleware,
@@ -26,15 +36,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+
+@app.middleware("http")
+async def track_request_queries(request: Request, call_next):
+    label = f"{request.method} {request.url.path}"
+    with span_from_traceparent(request.headers.get("traceparent"), label) as s:
+        with track_queries(label) as stats:
+            response = await call_next(request)
+        s.set(
+            status_code=response.status_code,
+            db_queries=stats.count,
+            db_ms=round(stats.seconds * 1e3, 3),
+        )
+    if settings.DB_DEBUG_HEADERS:
+        response.headers["Server-Timing"] = server_timing(stats)
+    return response
+
+
 app.include_router(internal.router)
 app.include_router(candidates.router)
 app.include_router(positions.router)
 app.include_router(alerts.router)
+app.include_router(filters.router)
 app.include_router(settings_api.router)
 app.include_router(portfolio.router)
+app.include_router(quotes.router)
 app.include_router(rvol.router)
+app.include_router(export.router)
 # in app/main.py
 ENABLE_POLLER = True
 
@@ -42,6 +73,20 @@ ENABLE_POLLER = True
 # Start background price poller (simple thread for MVP)
 @app.on_event("startup")
 def startup():
+    change_feed.start()
     if ENABLE_POLLER:
+        # imported here: the poller pulls in httpx and the quote client
+        from .workers.poller import run_price_poller
+
         t = threading.Thread(target=run_price_poller, daemon=True)
         t.start()
+    if ENABLE_POLLER and settings.NEWS_POLL_SECONDS > 0:
+        from .workers.news import run_news_poller
+
+        threading.Thread(target=run_news_poller, name="news-poller", daemon=True).start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    change_feed.stop()
+    await async_engine.dispose()
@@ -0,0 +1,110 @@
+"""Schema management, run as a deploy step instead of at API import.
+
+    python -m app.migrate           # create/upgrade the schema
+    python -m app.migrate --status  # list applied and pending migrations
+
+An empty database gets the tables from the SQLAlchemy models (what the API
+used to do at import).  Then every ``sql/migrations/*.sql`` file not yet
+listed in ``schema_migrations`` is applied in name order, each in its own
+transaction.  Migrations are written to be idempotent (``IF NOT EXISTS``,
+``CREATE OR REPLACE``), so databases created before migrations were
+tracked are brought up to date by applying all of them once.  A
+session-level advisory lock keeps concurrent deploys from racing.
+"""
+
+import argparse
+import os
+import sys
+
+from sqlalchemy import Connection, create_engine, inspect, text
+from sqlalchemy.pool import NullPool
+
+from .config import settings
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "sql", "migrations")
+LOCK_KEY = 0x5C2EE7  # pg_advisory_lock key for this tool
+
+
+def migration_files() -> list[str]:
+    return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+
+
+def _applied(conn: Connection) -> set[str]:
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version text PRIMARY KEY,"
+            " applied_at timestamptz NOT NULL DEFAULT now())"
+        )
+    )
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def _run_script(conn: Connection, path: str) -> None:
+    with open(path) as fh:
+        sql = fh.read()
+    # straight to the driver: no parameter parsing, several statements per file
+    conn.connection.dbapi_connection.cursor().execute(sql)
+
+
+def migrate(url: str | None = None, out=sys.stdout) -> list[str]:
+    """Create missing tables and apply pending migrations; returns their names."""
+
+    from .db import Base
+    from . import models  # noqa: F401  (registers the tables on Base.metadata)
+
+    engine = create_engine(url or settings.DATABASE_URL, poolclass=NullPool)
+    applied_now = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            if not inspect(conn).has_table("app_settings"):
+                print("empty database: creating tables from the models", file=out)
+                Base.metadata.create_all(conn)
+            applied = _applied(conn)
+            conn.commit()
+            for name in migration_files():
+                if name in applied:
+                    continue
+                print(f"applying {name}", file=out)
+                _run_script(conn, os.path.join(MIGRATIONS_DIR, name))
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version) VALUES (:v)"), {"v": name}
+                )
+                conn.commit()
+                applied_now.append(name)
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+            conn.commit()
+    engine.dispose()
+    return applied_now
+
+
+def status(url: str | None = None, out=sys.stdout) -> None:
+    engine = create_engine(url or settings.DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as conn:
+        if inspect(conn).has_table("schema_migrations"):
+            applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+        else:
+            applied = set()
+    engine.dispose()
+    for name in migration_files():
+        print(f"{'applied' if name in applied else 'pending'}  {name}", file=out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.migrate", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--status", action="store_true", help="list migrations only")
+    args = parser.parse_args()
+    if args.status:
+        status()
+        return
+    applied = migrate()
+    print(f"{len(applied)} migration(s) applied" if applied else "schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -23,6 +24,13 @@ class AlertKind(str, enum.Enum):
     target_abs = "target_abs"
     stop = "stop"
     price_cross = "price_cross"
+    trailing_pct = "trailing_pct"
+    trailing_abs = "trailing_abs"
+
+
+class AlertState(str, enum.Enum):
+    armed = "armed"
+    fired = "fired"
 
 
 class Channel(str, enum.Enum):
@@ -50,6 +58,19 @@ class AppSetting(Base):
     updated_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class FilterRule(Base):
+    """A named rule set: an ``app.rules`` expression over candidate columns."""
+
+    __tablename__ = "filters"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, unique=True, nullable=False)
+    expression = Column(Text, nullable=False)
+    enabled = Column(Boolean, nullable=False, default=True)
+    version = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class MarketRegime(Base):
     __tablename__ = "market_regime"
     id = Column(Integer, primary_key=True)
@@ -59,15 +80,40 @@ class MarketRegime(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class Symbol(Base):
+    """Ticker master table; other tables reference it by integer id."""
+
+    __tablename__ = "symbols"
+    id = Column(Integer, primary_key=True)
+    ticker = Column(String, unique=True, nullable=False)
+    name = Column(Text)
+    exchange = Column(Text)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RuleSnapshot(Base):
+    """The filter rules a batch was scored with, stored once per distinct content."""
+
+    __tablename__ = "rule_snapshots"
+    id = Column(Integer, primary_key=True)
+    hash = Column(Text, unique=True, nullable=False)  # md5 of rules_json::text
+    rules_json = Column(JSONB, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 class RvolBatch(Base):
     __tablename__ = "rvol_batches"
+    __table_args__ = (Index("ix_rvol_batches_ingested_at", "ingested_at", "id"),)
     id = Column(UUID(as_uuid=True), primary_key=True)
     ingested_at = Column(DateTime(timezone=True), server_default=func.now())
     source_hash = Column(Text)
+    rule_snapshot_id = Column(Integer, ForeignKey("rule_snapshots.id"))
 
 
 class RvolCandidate(Base):
     __tablename__ = "rvol_candidates"
+    __table_args__ = (Index("ix_rvol_candidates_batch_id", "batch_id"),)
     id = Column(BigInteger, primary_key=True)
     batch_id = Column(
         UUID(as_uuid=True),
@@ -75,6 +121,7 @@ class RvolCandidate(Base):
         nullable=False,
     )
     ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=False)
     name = Column(Text)
     rvol = Column(Numeric(10, 2), nullable=False)
     price = Column(Numeric(12, 4), nullable=False)
@@ -98,17 +145,35 @@ class CandidateFiltered(Base):
         nullable=False,
     )
     ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=False)
     score = Column(Numeric(12, 6), nullable=False, default=0)
-    reasons_json = Column(JSONB)
+    # metrics the row was last scored on; rules via rule_snapshot_id
+    price = Column(Numeric(12, 4))
+    rvol = Column(Numeric(12, 4))  # may be the in-house RVOL, not the screener's
+    pct_change = Column(Numeric(7, 3))
+    volume = Column(BigInteger)
+    rule_snapshot_id = Column(Integer, ForeignKey("rule_snapshots.id"))
+    reasons_json = Column(JSONB)  # row-specific extras only (screener_rvol, news_count)
     first_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
     notified_topn = Column(Boolean, nullable=False, default=False)
 
 
+# Serves the DISTINCT ON (symbol_id) "latest row per ticker" scan in list_candidates.
+Index(
+    "ix_candidates_filtered_symbol_latest",
+    CandidateFiltered.symbol_id,
+    CandidateFiltered.last_seen_at.desc(),
+    CandidateFiltered.id.desc(),
+    postgresql_include=["score"],
+)
+
+
 class Position(Base):
     __tablename__ = "positions"
     id = Column(BigInteger, primary_key=True)
     ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=False)
     side = Column(String, nullable=False)  # "long"/"short"
     qty = Column(Numeric(18, 4), nullable=False)
     entry_price = Column(Numeric(12, 4), nullable=False)
@@ -123,12 +188,47 @@ class PriceAlert(Base):
     __tablename__ = "price_alerts"
     id = Column(BigInteger, primary_key=True)
     ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=False)
     kind = Column(Enum(AlertKind), nullable=False)
     threshold_value = Column(Numeric(12, 4), nullable=False)
     trailing = Column(Boolean, nullable=False, default=False)
     active = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_triggered_at = Column(DateTime(timezone=True))
+    # trailing_* kinds: peak (long) or trough (short) price since activation,
+    # checkpointed by the price poller
+    water_mark = Column(Numeric(12, 4))
+    water_mark_at = Column(DateTime(timezone=True))
+    # fired alerts re-arm once rearm_after has passed and the price is back
+    # at/above (rearm_above) or at/below rearm_price
+    state = Column(
+        Enum(AlertState, name="alert_state"),
+        nullable=False,
+        default=AlertState.armed,
+        server_default=AlertState.armed.value,
+    )
+    rearm_price = Column(Numeric(12, 4))
+    rearm_above = Column(Boolean)
+    rearm_after = Column(DateTime(timezone=True))
+    # per-alert overrides of ALERT_COOLDOWN_SECONDS / ALERT_REARM_BAND_PCT
+    cooldown_seconds = Column(Integer)
+    rearm_band_pct = Column(Numeric(6, 3))
+
+
+class PriceQuote(Base):
+    """Every quote the poller fetches; the price history used by backtests."""
+
+    __tablename__ = "price_quotes"
+    __table_args__ = (
+        Index("ix_price_quotes_symbol_quoted_at", "symbol_id", "quoted_at"),
+    )
+    id = Column(BigInteger, primary_key=True)
+    ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"), nullable=False)
+    price = Column(Numeric(12, 4), nullable=False)
+    day_high = Column(Numeric(12, 4))
+    day_low = Column(Numeric(12, 4))
+    quoted_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
 class Notification(Base):
@@ -136,8 +236,27 @@ class Notification(Base):
     id = Column(BigInteger, primary_key=True)
     channel = Column(Enum(Channel), nullable=False)
     ticker = Column(String)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"))
     message = Column(Text, nullable=False)
     dedupe_key = Column(Text, nullable=False, unique=True)
     sent_at = Column(DateTime(timezone=True))
     status = Column(Enum(NotifyStatus), nullable=False)
     error = Column(Text)
+
+
+class NewsItem(Base):
+    """Headlines fetched for Top-N and watchlist tickers (``services.news``)."""
+
+    __tablename__ = "news_cache"
+    __table_args__ = (
+        Index("ix_news_cache_symbol_published", "symbol_id", "published_at"),
+    )
+    id = Column(BigInteger, primary_key=True)
+    ticker = Column(String, nullable=False)
+    symbol_id = Column(Integer, ForeignKey("symbols.id"))
+    headline = Column(Text, nullable=False)
+    url = Column(Text)
+    provider = Column(Text)
+    published_at = Column(DateTime(timezone=True), nullable=False)
+    hash = Column(Text, nullable=False, unique=True)  # see news.content_hash
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,48 @@
+"""On-demand sampling profiler for the running process.
+
+``sample_stacks`` snapshots every thread's Python stack with
+``sys._current_frames()`` at a fixed interval and counts identical stacks.
+The result is in the "folded" format (``thread;outer;...;inner count`` per
+line) read by flamegraph.pl, inferno and speedscope.  Nothing runs between
+captures.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+MAX_SECONDS = 60.0
+MIN_INTERVAL = 0.001
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.01) -> Counter:
+    """Sample all other threads for ``seconds``; returns folded stack counts."""
+
+    me = threading.get_ident()
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + min(seconds, MAX_SECONDS)
+    interval = max(interval, MIN_INTERVAL)
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(labels))] += 1
+        time.sleep(interval)
+    return stacks
+
+
+def render_folded(stacks: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
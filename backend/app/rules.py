@@ -0,0 +1,403 @@
+"""Filter rules: a small expression language over candidate columns.
+
+    rvol >= 5 and 5 <= price <= 20 and (volume == None or volume <= 20e6)
+    sector in ("Technology", "Health Care") and analyst_rating != "Sell"
+
+Expressions are Python syntax, parsed with ``ast`` and limited to ``and`` /
+``or`` / ``not``, comparisons (chained ones too) between a column and a
+literal or another column, ``in`` / ``not in`` against a list of literals
+and ``== None`` / ``!= None`` for missing values.  Anything else is a
+``RuleError``.
+
+``compile_rule`` turns an expression into a ``Rule`` once (cached by text):
+``mask`` evaluates it over whole columns with NumPy in one pass, ``where``
+renders the same condition as a SQLAlchemy clause.  Both read missing values
+(NaN, None, NULL) the same way: every comparison touching one is false, so
+``!=`` and ``not in`` never let a missing value through.  ``not`` negates
+that result and does: ``not (price > 10)`` keeps rows without a price,
+``price <= 10`` doesn't.
+
+This module imports nothing from the app, so ``scripts/ingest_rvol.py`` can
+compile the rules the API hands it.  Compiling and ``where`` don't need
+numpy either; it is imported on the first ``mask``, keeping it off the
+API's start-up path.
+"""
+
+from __future__ import annotations
+
+import ast
+import functools
+import math
+import operator
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, NamedTuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+NUMBER = "number"
+TEXT = "text"
+
+# candidate columns rules may use, by type
+COLUMNS = {
+    "ticker": TEXT,
+    "name": TEXT,
+    "sector": TEXT,
+    "analyst_rating": TEXT,
+    "price": NUMBER,
+    "rvol": NUMBER,
+    "pct_change": NUMBER,
+    "volume": NUMBER,
+    "market_cap": NUMBER,
+}
+
+MAX_LENGTH = 4000
+# nesting levels of the parsed expression (``not``, unary minus, brackets)
+MAX_DEPTH = 100
+
+_COMPARE = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+_ORDERING = (ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_SWAPPED = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE}
+
+
+class RuleError(ValueError):
+    """The expression is not a valid filter rule."""
+
+
+class Column(NamedTuple):
+    name: str
+
+
+class Rule:
+    """A compiled filter expression."""
+
+    def __init__(self, expression: str, mask: Callable, where: Callable, columns: frozenset):
+        self.expression = expression
+        self.columns = columns
+        self._mask = mask
+        self._where = where
+
+    def mask(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """Boolean mask over rows; ``columns`` maps names to equal-length arrays.
+
+        Number columns are float arrays with NaN for missing values, text
+        columns object arrays with None (or NaN) for missing values.
+        """
+
+        import numpy as np
+
+        missing = self.columns - columns.keys()
+        if missing:
+            raise RuleError(f"missing columns: {', '.join(sorted(missing))}")
+        return np.asarray(self._mask(_Batch(columns)), dtype=bool)
+
+    def where(self, columns: Mapping[str, Any]):
+        """The same condition as a SQLAlchemy clause over ``columns`` (name -> column)."""
+
+        return self._where(columns)
+
+    def __repr__(self) -> str:
+        return f"Rule({self.expression!r})"
+
+
+class _Batch:
+    """Column arrays for one ``mask`` call, with their missing values found once."""
+
+    def __init__(self, columns: Mapping[str, Any]) -> None:
+        self.columns = columns
+        self._values: Dict[str, np.ndarray] = {}
+        self._present: Dict[str, np.ndarray] = {}
+
+    def values(self, name: str) -> np.ndarray:
+        import numpy as np
+
+        values = self._values.get(name)
+        if values is None:
+            values = self._values[name] = np.asarray(self.columns[name])
+        return values
+
+    def present(self, name: str) -> np.ndarray:
+        import numpy as np
+
+        present = self._present.get(name)
+        if present is None:
+            values = self.values(name)
+            if values.dtype.kind == "f":
+                present = ~np.isnan(values)
+            else:  # None or NaN
+                present = ~(np.equal(values, None) | np.not_equal(values, values))
+            present = self._present[name] = present
+        return present
+
+
+def _present(batch: _Batch, *operands) -> np.ndarray | bool:
+    present = True
+    for operand in operands:
+        if isinstance(operand, Column):
+            present = present & batch.present(operand.name)
+    return present
+
+
+def _value(batch: _Batch, operand):
+    return batch.values(operand.name) if isinstance(operand, Column) else operand
+
+
+def _sql_value(columns, operand):
+    from sqlalchemy import literal
+
+    return columns[operand.name] if isinstance(operand, Column) else literal(operand)
+
+
+def _false_if_null(clause):
+    from sqlalchemy import false, func
+
+    return func.coalesce(clause, false())
+
+
+class _Compiler:
+    def __init__(self) -> None:
+        self.columns: set[str] = set()
+
+    def compile(self, node: ast.AST) -> tuple[Callable, Callable]:
+        if isinstance(node, ast.BoolOp):
+            parts = [self.compile(value) for value in node.values]
+            masks = [mask for mask, _ in parts]
+            wheres = [where for _, where in parts]
+            if isinstance(node.op, ast.And):
+                return (
+                    lambda c: functools.reduce(operator.and_, (m(c) for m in masks)),
+                    lambda c: _sql_and([w(c) for w in wheres]),
+                )
+            return (
+                lambda c: functools.reduce(operator.or_, (m(c) for m in masks)),
+                lambda c: _sql_or([w(c) for w in wheres]),
+            )
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            mask, where = self.compile(node.operand)
+            return lambda c: _invert(mask(c)), lambda c: _sql_not(where(c))
+        if isinstance(node, ast.Compare):
+            operands = [node.left, *node.comparators]
+            parts = [
+                self.comparison(left, op, right)
+                for left, op, right in zip(operands, node.ops, operands[1:])
+            ]
+            if len(parts) == 1:
+                return parts[0]
+            masks = [mask for mask, _ in parts]
+            wheres = [where for _, where in parts]
+            return (
+                lambda c: functools.reduce(operator.and_, (m(c) for m in masks)),
+                lambda c: _sql_and([w(c) for w in wheres]),
+            )
+        raise RuleError(f"unsupported expression: {ast.unparse(node)}")
+
+    def operand(self, node: ast.AST):
+        if isinstance(node, ast.Name):
+            if node.id not in COLUMNS:
+                raise RuleError(f"unknown column {node.id!r}; use one of {', '.join(COLUMNS)}")
+            self.columns.add(node.id)
+            return Column(node.id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            value = self.operand(node.operand)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return -value
+        if isinstance(node, ast.Constant) and (
+            node.value is None or isinstance(node.value, (int, float, str))
+        ) and not isinstance(node.value, bool):
+            return float(node.value) if isinstance(node.value, int) else node.value
+        raise RuleError(f"expected a column or a number/string literal: {ast.unparse(node)}")
+
+    def comparison(self, left_node, op, right_node) -> tuple[Callable, Callable]:
+        if isinstance(op, (ast.In, ast.NotIn)):
+            return self.membership(left_node, op, right_node)
+        if isinstance(op, (ast.Is, ast.IsNot)):
+            op = ast.Eq() if isinstance(op, ast.Is) else ast.NotEq()
+            if not (isinstance(right_node, ast.Constant) and right_node.value is None):
+                raise RuleError("'is' only compares with None")
+        if type(op) not in _COMPARE:
+            raise RuleError(f"unsupported comparison: {type(op).__name__}")
+        left, right = self.operand(left_node), self.operand(right_node)
+        if not isinstance(left, Column):
+            if not isinstance(right, Column):
+                raise RuleError("a comparison needs at least one column")
+            left, right, op = right, left, _SWAPPED.get(type(op), type(op))()
+        if right is None:
+            if not isinstance(op, (ast.Eq, ast.NotEq)):
+                raise RuleError("None only compares with == or !=")
+            return self.null_check(left, isinstance(op, ast.Eq))
+        self.check_types(left, op, right)
+        compare = _COMPARE[type(op)]
+
+        def mask(c):
+            return compare(_value(c, left), _value(c, right)) & _present(c, left, right)
+
+        def where(c):
+            return _false_if_null(compare(_sql_value(c, left), _sql_value(c, right)))
+
+        return mask, where
+
+    def null_check(self, column: Column, is_null: bool) -> tuple[Callable, Callable]:
+        def mask(c):
+            present = c.present(column.name)
+            return ~present if is_null else present
+
+        def where(c):
+            return c[column.name].is_(None) if is_null else c[column.name].isnot(None)
+
+        return mask, where
+
+    def membership(self, left_node, op, right_node) -> tuple[Callable, Callable]:
+        column = self.operand(left_node)
+        if not isinstance(column, Column):
+            raise RuleError("the left side of 'in' must be a column")
+        if not isinstance(right_node, (ast.Tuple, ast.List, ast.Set)) or not right_node.elts:
+            raise RuleError("'in' needs a non-empty list of literals")
+        values = [self.operand(element) for element in right_node.elts]
+        for value in values:
+            if isinstance(value, Column) or value is None:
+                raise RuleError("'in' lists hold number or string literals only")
+            self.check_types(column, ast.Eq(), value)
+        negate = isinstance(op, ast.NotIn)
+        text = COLUMNS[column.name] == TEXT
+        choices = frozenset(values) if text else values
+
+        def mask(c):
+            import numpy as np
+
+            column_values = c.values(column.name)
+            if not text:
+                found = np.isin(column_values, choices)
+            elif len(choices) <= 8:  # np.isin would sort, and None does not order against str
+                found = functools.reduce(operator.or_, (column_values == v for v in choices))
+            else:
+                found = np.fromiter(
+                    (v in choices for v in column_values), dtype=bool, count=len(column_values)
+                )
+            return (~found if negate else found) & c.present(column.name)
+
+        def where(c):
+            clause = c[column.name].in_(values)
+            return _false_if_null(~clause if negate else clause)
+
+        return mask, where
+
+    @staticmethod
+    def check_types(column: Column, op, other) -> None:
+        kind = COLUMNS[column.name]
+        other_kind = COLUMNS[other.name] if isinstance(other, Column) else (
+            TEXT if isinstance(other, str) else NUMBER
+        )
+        if kind != other_kind:
+            raise RuleError(f"{column.name} is a {kind} column, compared with a {other_kind}")
+        if kind == TEXT and isinstance(op, _ORDERING):
+            raise RuleError(f"{column.name} is text: use ==, != or in")
+
+
+def _invert(mask):
+    import numpy as np
+
+    return ~np.asarray(mask, dtype=bool)
+
+
+def _sql_and(clauses):
+    from sqlalchemy import and_
+
+    return and_(*clauses)
+
+
+def _sql_or(clauses):
+    from sqlalchemy import or_
+
+    return or_(*clauses)
+
+
+def _sql_not(clause):
+    from sqlalchemy import not_
+
+    return not_(clause)
+
+
+def _depth(node: ast.AST) -> int:
+    deepest, stack = 0, [(node, 1)]
+    while stack:
+        node, depth = stack.pop()
+        deepest = max(deepest, depth)
+        stack.extend((child, depth + 1) for child in ast.iter_child_nodes(node))
+    return deepest
+
+
+@functools.lru_cache(maxsize=256)
+def compile_rule(expression: str) -> Rule:
+    """Parse and compile ``expression``; raises ``RuleError`` when invalid."""
+
+    text = " ".join(expression.split())
+    if not text:
+        raise RuleError("empty rule")
+    if len(text) > MAX_LENGTH:
+        raise RuleError(f"rule longer than {MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(text, mode="eval")
+    except SyntaxError as exc:
+        raise RuleError(f"syntax error: {exc.msg}") from None
+    if _depth(tree.body) > MAX_DEPTH:
+        # the compiler and the closures it builds recurse once per level
+        raise RuleError(f"rule nested deeper than {MAX_DEPTH} levels")
+    compiler = _Compiler()
+    mask, where = compiler.compile(tree.body)
+    return Rule(text, mask, where, frozenset(compiler.columns))
+
+
+def combine(expressions) -> str:
+    """One expression requiring all of ``expressions``."""
+
+    parts = [f"({expression})" for expression in expressions if expression and expression.strip()]
+    return " and ".join(parts)
+
+
+def profile_expression(cfg: Mapping[str, Any]) -> str:
+    """The built-in price / RVOL / change / volume rules of a filter profile.
+
+    A missing volume passes the cap, a missing % change fails its minimum;
+    infinite bounds are left out.
+    """
+
+    def bound(value) -> float | None:
+        value = None if value is None else float(value)
+        return value if value is not None and math.isfinite(value) else None
+
+    price_min, price_max = bound(cfg.get("price_min")), bound(cfg.get("price_max"))
+    min_rvol, min_pct = bound(cfg.get("min_rvol")), bound(cfg.get("min_pct_change"))
+    cap = bound(cfg.get("volume_cap"))
+    # price and rvol always get a clause so rows without them never pass
+    parts = [
+        f"{price_min or 0.0!r} <= price" + (f" <= {price_max!r}" if price_max is not None else ""),
+        f"rvol >= {min_rvol or 0.0!r}",
+        "pct_change != None" if min_pct is None else f"pct_change >= {min_pct!r}",
+    ]
+    if cap is not None:
+        parts.append(f"(volume == None or volume <= {cap!r})")
+    return " and ".join(parts)
+
+
+def columns_from_records(records, names=None) -> Dict[str, np.ndarray]:
+    """Column arrays for ``mask`` from objects with candidate attributes."""
+
+    import numpy as np
+
+    records = list(records)
+    out = {}
+    for name in names or COLUMNS:
+        values = [getattr(record, name) for record in records]
+        if COLUMNS[name] == NUMBER:
+            out[name] = np.array(
+                [np.nan if v is None else float(v) for v in values], dtype=np.float64
+            )
+        else:
+            out[name] = np.array(values, dtype=object)
+    return out
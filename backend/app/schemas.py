@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import Optional, List, Any, Literal
+from typing import Optional, List, Any, Dict, Literal
 from uuid import UUID
-from datetime import datetime
+from datetime import date, datetime
 
 
 class RVOLItem(BaseModel):
@@ -49,6 +49,7 @@ class CandidateDTO(BaseModel):
     rvol: float
     score: float
     reasons: Any
+    last_seen_at: Optional[datetime] = None
 
 
 class PositionBase(BaseModel):
@@ -80,6 +81,14 @@ class PositionOut(PositionBase):
     unrealized_pct: Optional[float] = None
 
 
+class QuoteOut(BaseModel):
+    ticker: str
+    price: float
+    day_high: Optional[float] = None
+    day_low: Optional[float] = None
+    at: datetime
+
+
 class PortfolioPoint(BaseModel):
     timestamp: datetime
     label: str
@@ -103,6 +112,27 @@ class ThemeSettings(BaseModel):
     )
 
 
+RegimeName = Literal["hot", "cold"]
+
+
+class FilterProfile(BaseModel):
+    price_min: float
+    price_max: float
+    min_rvol: float
+    min_pct_change: float
+    volume_cap: int
+    topN: int
+
+
+class FilterProfileUpdate(BaseModel):
+    price_min: Optional[float] = Field(None, ge=0)
+    price_max: Optional[float] = Field(None, ge=0)
+    min_rvol: Optional[float] = Field(None, ge=0)
+    min_pct_change: Optional[float] = None
+    volume_cap: Optional[int] = Field(None, ge=0)
+    topN: Optional[int] = Field(None, ge=0)
+
+
 class AppSettingsResponse(BaseModel):
     price_min: float
     price_max: float
@@ -111,6 +141,8 @@ class AppSettingsResponse(BaseModel):
     volume_cap: int
     starting_capital: float
     theme: ThemeSettings
+    regime: RegimeName = "hot"
+    profiles: Dict[RegimeName, FilterProfile] = {}
 
 
 class AppSettingsUpdate(BaseModel):
@@ -121,6 +153,7 @@ class AppSettingsUpdate(BaseModel):
     volume_cap: Optional[int] = Field(None, ge=0)
     starting_capital: Optional[float] = Field(None, ge=0)
     theme: Optional[ThemeSettings]
+    profiles: Optional[Dict[RegimeName, FilterProfileUpdate]] = None
 
     @model_validator(mode="after")
     def validate_price_bounds(self):
@@ -135,15 +168,73 @@ class AppSettingsUpdate(BaseModel):
         return self
 
 
+class RegimeUpdate(BaseModel):
+    regime: RegimeName
+    for_date: Optional[date] = None  # defaults to today's session
+    notes: Optional[str] = None
+
+
+class RegimeOut(BaseModel):
+    for_date: date
+    regime: RegimeName
+    source: Literal["manual", "auto", "default"]
+    profile: FilterProfile
+
+
+class FilterRuleIn(BaseModel):
+    # app.rules expression, e.g. 'sector != "Financial" and market_cap >= 300e6'
+    expression: str = Field(min_length=1, max_length=4000)
+    enabled: bool = True
+
+
+class FilterRuleOut(FilterRuleIn):
+    id: int
+    name: str
+    version: int
+    updated_at: Optional[datetime] = None
+
+
+class EffectiveFilterOut(BaseModel):
+    # the active profile's rules ANDed with every enabled rule set
+    regime: RegimeName
+    expression: str
+    versions: Dict[str, int]  # enabled rule set name -> version
+
+
 class AlertIn(BaseModel):
     ticker: str
-    kind: str  # target_pct | target_abs | stop | price_cross
+    # target_pct | target_abs | stop | price_cross | trailing_pct | trailing_abs
+    # (trailing_*: threshold_value is the distance behind the peak, or above
+    # the trough for short positions, in percent or dollars)
+    kind: str
     threshold_value: float
     trailing: bool = False
+    # None: ALERT_COOLDOWN_SECONDS / ALERT_REARM_BAND_PCT
+    cooldown_seconds: Optional[int] = Field(default=None, ge=0)
+    rearm_band_pct: Optional[float] = Field(default=None, ge=0)
+
+
+class AlertOp(AlertIn):
+    # upsert: create if missing, else update cooldown/band only;
+    # activate: upsert, then make it active and armed; deactivate: switch off
+    op: Literal["upsert", "activate", "deactivate"]
+
+
+class BulkAlertsIn(BaseModel):
+    operations: List[AlertOp] = Field(min_length=1, max_length=500)
 
 
 class AlertOut(AlertIn):
     id: int
     active: bool
+    state: Literal["armed", "fired"] = "armed"
     created_at: datetime
     last_triggered_at: Optional[datetime]
+    rearm_after: Optional[datetime] = None
+    water_mark: Optional[float] = None
+    water_mark_at: Optional[datetime] = None
+
+
+class BulkAlertsOut(BaseModel):
+    # one entry per operation, in order; null for deactivating a missing alert
+    results: List[Optional[AlertOut]]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+from typing import Any, Iterable
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import Float, cast
+from sqlalchemy.engine import Row
+
+
+def _default(value: Any):
+    # orjson handles datetime/UUID/Enum natively; Numeric columns that were not
+    # cast in SQL still arrive as Decimal.
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; the app-wide default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+def as_float(column, name: str | None = None):
+    """Select a ``Numeric`` column as double precision so rows carry floats."""
+
+    return cast(column, Float).label(name or column.key)
+
+
+def rows_to_dicts(rows: Iterable[Row]) -> list[dict[str, Any]]:
+    """Turn SQLAlchemy ``Row`` tuples into plain dicts keyed by column label.
+
+    Column names are read once from the first row and zipped against the raw
+    tuples, which is several times cheaper than ``Row._asdict()`` per row.
+    """
+
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return []
+    # plain str: labels from CTEs/unions are str subclasses orjson rejects as keys
+    keys = tuple(map(str, first._fields))
+    out = [dict(zip(keys, first))]
+    out.extend(dict(zip(keys, row)) for row in rows)
+    return out
@@ -3,12 +3,17 @@ from __future__ import annotations
 from copy import deepcopy
 from typing import Any, Dict
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..config import settings as env_settings
 from ..models import AppSetting
+from .changes import change_feed
 
 APP_CONFIG_KEY = "app_config"
+# Per-regime filter settings suggested by ``python -m app.backtest optimize``.
+PROPOSED_PROFILES_KEY = "proposed_profiles"
 
 DEFAULT_PRIMARY_COLOR = "#1976d2"
 
@@ -29,12 +34,10 @@ def _query_all_settings(db: Session) -> list[AppSetting]:
     return db.query(AppSetting).all()
 
 
-def load_app_settings(db: Session) -> Dict[str, Any]:
-    """Return application settings merging DB overrides with defaults."""
-
+def _merge_settings(rows: list[AppSetting]) -> Dict[str, Any]:
     config: Dict[str, Any] = deepcopy(DEFAULT_SETTINGS)
 
-    for row in _query_all_settings(db):
+    for row in rows:
         value = row.value_json
         if isinstance(value, dict):
             config.update(value)
@@ -44,6 +47,49 @@ def load_app_settings(db: Session) -> Dict[str, Any]:
     return config
 
 
+# Merged settings, reused while the change feed is live to tell us when
+# ``app_settings`` changes.  The generation keeps a load that raced with an
+# invalidation from caching what it read before the change.
+_cached: Dict[str, Any] | None = None
+_generation = 0
+
+
+def invalidate_app_settings(*_: Any) -> None:
+    global _cached, _generation
+    _cached = None
+    _generation += 1
+
+
+change_feed.subscribe("app_settings", invalidate_app_settings)
+change_feed.on_reset(invalidate_app_settings)
+
+
+def _remember(config: Dict[str, Any], generation: int) -> Dict[str, Any]:
+    global _cached
+    if change_feed.live and generation == _generation:
+        _cached = deepcopy(config)
+    return config
+
+
+def load_app_settings(db: Session) -> Dict[str, Any]:
+    """Return application settings merging DB overrides with defaults."""
+
+    if _cached is not None and change_feed.live:
+        return deepcopy(_cached)
+    generation = _generation
+    return _remember(_merge_settings(_query_all_settings(db)), generation)
+
+
+async def load_app_settings_async(db: AsyncSession) -> Dict[str, Any]:
+    """``load_app_settings`` for request handlers on the async session."""
+
+    if _cached is not None and change_feed.live:
+        return deepcopy(_cached)
+    generation = _generation
+    rows = (await db.execute(select(AppSetting))).scalars().all()
+    return _remember(_merge_settings(list(rows)), generation)
+
+
 def save_app_settings(db: Session, updates: Dict[str, Any]) -> Dict[str, Any]:
     """Persist a set of updates and return the merged configuration."""
 
@@ -62,5 +108,6 @@ def save_app_settings(db: Session, updates: Dict[str, Any]) -> Dict[str, Any]:
     db.add(record)
     db.commit()
     db.refresh(record)
+    invalidate_app_settings()  # don't wait for the notification
 
     return load_app_settings(db)
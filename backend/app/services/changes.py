@@ -0,0 +1,114 @@
+"""Process-wide listener for the Postgres change feed.
+
+Triggers from ``sql/migrations/005_change_feed.sql`` send a JSON payload
+``{"table", "op", "id"}`` on ``CHANNEL`` when a write to a cached table
+commits.  ``change_feed`` holds one dedicated connection per process that
+``LISTEN``s on it from a daemon thread and hands each change to the handlers
+subscribed for that table, so caches apply single-row deltas instead of
+reloading on a timer.
+
+Notifications sent while the listener is disconnected are lost, so reset
+handlers run on every (re)connect and whenever the connection drops; caches
+drop everything then.  ``live`` is only true while listening on a database
+that has the triggers installed; callers keep their polling fallback
+otherwise.
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "screener_changes"
+RECONNECT_SECONDS = 5.0
+
+ChangeHandler = Callable[[str, Any], None]  # (op, row id)
+
+
+def _conninfo() -> str:
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+class ChangeFeed:
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[ChangeHandler]] = defaultdict(list)
+        self._reset_handlers: List[Callable[[], None]] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.live = False
+
+    def subscribe(self, table: str, handler: ChangeHandler) -> None:
+        self._handlers[table].append(handler)
+
+    def on_reset(self, handler: Callable[[], None]) -> None:
+        self._reset_handlers.append(handler)
+
+    def start(self) -> None:
+        if not settings.CHANGE_FEED or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="change-feed", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            table, op, row_id = change["table"], change["op"], change["id"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("ignoring malformed change payload %r", payload)
+            return
+        for handler in self._handlers.get(table, ()):
+            try:
+                handler(op, row_id)
+            except Exception:
+                logger.exception("change handler for %s failed", table)
+
+    def _reset(self) -> None:
+        for handler in self._reset_handlers:
+            try:
+                handler()
+            except Exception:
+                logger.exception("change feed reset handler failed")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(_conninfo(), autocommit=True) as conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    installed = conn.execute(
+                        "SELECT to_regproc('notify_change') IS NOT NULL"
+                    ).fetchone()[0]
+                    if not installed:
+                        logger.warning(
+                            "change feed triggers are not installed; "
+                            "apply sql/migrations/005_change_feed.sql"
+                        )
+                    self.live = installed
+                    self._reset()
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0):
+                            self.dispatch(notify.payload)
+            except Exception:
+                logger.exception("change feed connection lost")
+            finally:
+                if self.live:
+                    self.live = False
+                    self._reset()
+            self._stop.wait(RECONNECT_SECONDS)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,311 @@
+"""Columnar exports of stored data as Arrow IPC or Parquet.
+
+Each dataset is one SELECT over a time range with a fixed Arrow schema.
+Rows come off a server-side cursor ``batch_rows`` at a time; every chunk
+becomes one Arrow record batch (one Parquet row group), is serialized and
+handed to the response before the next chunk is fetched, so memory stays
+flat however long the range is.
+
+Columns are plain Arrow types with no per-batch dictionaries: numerics as
+float64, ids and volumes as integers, timestamps as UTC microseconds.  The
+``arrow`` format (the IPC file format, i.e. Feather v2) can be memory-mapped
+and read without copying::
+
+    pyarrow.ipc.open_file(pyarrow.memory_map("candidates.arrow")).read_all()
+    polars.read_ipc("candidates.arrow", memory_map=True)
+    pandas.read_feather("candidates.arrow")
+
+``arrows`` is the IPC stream format (readable while it downloads),
+``parquet`` is zstd-compressed Parquet.  pyarrow is an optional dependency
+(``pip install .[export]``), imported on first use.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from sqlalchemy import BigInteger, Float, Text, and_, cast, func, or_, select
+from sqlalchemy.sql import Select
+
+from ..db import engine
+from ..models import (
+    CandidateFiltered,
+    Position,
+    PriceQuote,
+    RuleSnapshot,
+    RvolBatch,
+    RvolCandidate,
+)
+
+# column kinds, mapped to Arrow types in ``_schema``
+STRING = "string"
+INT32 = "int32"
+INT64 = "int64"
+FLOAT64 = "float64"
+BOOL = "bool"
+TIMESTAMP = "timestamp"  # selected as epoch microseconds
+
+# format -> (media type, file extension)
+FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+    "arrows": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+class Dataset(NamedTuple):
+    columns: Tuple[Tuple[str, str], ...]  # (name, kind), in select order
+    query: Callable[[datetime, datetime], Select]
+
+
+def _micros(column):
+    return cast(func.extract("epoch", column) * 1_000_000, BigInteger)
+
+
+def _rvol_candidates(start: datetime, end: datetime) -> Select:
+    return (
+        select(
+            cast(RvolCandidate.batch_id, Text),
+            _micros(RvolBatch.ingested_at),
+            RvolCandidate.ticker,
+            RvolCandidate.symbol_id,
+            RvolCandidate.name,
+            cast(RvolCandidate.rvol, Float),
+            cast(RvolCandidate.price, Float),
+            cast(RvolCandidate.pct_change, Float),
+            RvolCandidate.volume,
+            RvolCandidate.market_cap,
+            RvolCandidate.sector,
+            RvolCandidate.analyst_rating,
+        )
+        .join(RvolBatch, RvolBatch.id == RvolCandidate.batch_id)
+        .where(RvolBatch.ingested_at >= start, RvolBatch.ingested_at < end)
+        .order_by(RvolBatch.ingested_at, RvolBatch.id, RvolCandidate.id)
+    )
+
+
+def _candidates_filtered(start: datetime, end: datetime) -> Select:
+    return (
+        select(
+            CandidateFiltered.id,
+            cast(CandidateFiltered.batch_id, Text),
+            CandidateFiltered.ticker,
+            CandidateFiltered.symbol_id,
+            cast(CandidateFiltered.score, Float),
+            cast(CandidateFiltered.price, Float),
+            cast(CandidateFiltered.rvol, Float),
+            cast(CandidateFiltered.pct_change, Float),
+            CandidateFiltered.volume,
+            CandidateFiltered.rule_snapshot_id,
+            _micros(CandidateFiltered.first_seen_at),
+            _micros(CandidateFiltered.last_seen_at),
+            CandidateFiltered.notified_topn,
+        )
+        .where(CandidateFiltered.last_seen_at >= start, CandidateFiltered.last_seen_at < end)
+        .order_by(CandidateFiltered.last_seen_at, CandidateFiltered.id)
+    )
+
+
+def _rule_snapshots(start: datetime, end: datetime) -> Select:
+    # small and referenced by id from candidates_filtered: always exported whole
+    return select(
+        RuleSnapshot.id,
+        RuleSnapshot.hash,
+        cast(RuleSnapshot.rules_json, Text),
+        _micros(RuleSnapshot.created_at),
+    ).order_by(RuleSnapshot.id)
+
+
+def _positions(start: datetime, end: datetime) -> Select:
+    # every position open at some point in the range
+    return (
+        select(
+            Position.id,
+            Position.ticker,
+            Position.symbol_id,
+            Position.side,
+            cast(Position.qty, Float),
+            cast(Position.entry_price, Float),
+            cast(Position.exit_price, Float),
+            _micros(Position.created_at),
+            _micros(Position.closed_at),
+            Position.notes,
+        )
+        .where(
+            Position.created_at < end,
+            or_(Position.closed_at.is_(None), Position.closed_at >= start),
+        )
+        .order_by(Position.created_at, Position.id)
+    )
+
+
+def _price_quotes(start: datetime, end: datetime) -> Select:
+    # per-symbol series, in ix_price_quotes_symbol_quoted_at order
+    return (
+        select(
+            PriceQuote.symbol_id,
+            PriceQuote.ticker,
+            _micros(PriceQuote.quoted_at),
+            cast(PriceQuote.price, Float),
+            cast(PriceQuote.day_high, Float),
+            cast(PriceQuote.day_low, Float),
+        )
+        .where(and_(PriceQuote.quoted_at >= start, PriceQuote.quoted_at < end))
+        .order_by(PriceQuote.symbol_id, PriceQuote.quoted_at)
+    )
+
+
+DATASETS: Dict[str, Dataset] = {
+    "rvol_candidates": Dataset(
+        (
+            ("batch_id", STRING),
+            ("ingested_at", TIMESTAMP),
+            ("ticker", STRING),
+            ("symbol_id", INT32),
+            ("name", STRING),
+            ("rvol", FLOAT64),
+            ("price", FLOAT64),
+            ("pct_change", FLOAT64),
+            ("volume", INT64),
+            ("market_cap", INT64),
+            ("sector", STRING),
+            ("analyst_rating", STRING),
+        ),
+        _rvol_candidates,
+    ),
+    "candidates_filtered": Dataset(
+        (
+            ("id", INT64),
+            ("batch_id", STRING),
+            ("ticker", STRING),
+            ("symbol_id", INT32),
+            ("score", FLOAT64),
+            ("price", FLOAT64),
+            ("rvol", FLOAT64),
+            ("pct_change", FLOAT64),
+            ("volume", INT64),
+            ("rule_snapshot_id", INT32),
+            ("first_seen_at", TIMESTAMP),
+            ("last_seen_at", TIMESTAMP),
+            ("notified_topn", BOOL),
+        ),
+        _candidates_filtered,
+    ),
+    "rule_snapshots": Dataset(
+        (("id", INT32), ("hash", STRING), ("rules_json", STRING), ("created_at", TIMESTAMP)),
+        _rule_snapshots,
+    ),
+    "positions": Dataset(
+        (
+            ("id", INT64),
+            ("ticker", STRING),
+            ("symbol_id", INT32),
+            ("side", STRING),
+            ("qty", FLOAT64),
+            ("entry_price", FLOAT64),
+            ("exit_price", FLOAT64),
+            ("created_at", TIMESTAMP),
+            ("closed_at", TIMESTAMP),
+            ("notes", STRING),
+        ),
+        _positions,
+    ),
+    "price_quotes": Dataset(
+        (
+            ("symbol_id", INT32),
+            ("ticker", STRING),
+            ("quoted_at", TIMESTAMP),
+            ("price", FLOAT64),
+            ("day_high", FLOAT64),
+            ("day_low", FLOAT64),
+        ),
+        _price_quotes,
+    ),
+}
+
+
+def _schema(dataset: Dataset):
+    import pyarrow as pa
+
+    types = {
+        STRING: pa.string(),
+        INT32: pa.int32(),
+        INT64: pa.int64(),
+        FLOAT64: pa.float64(),
+        BOOL: pa.bool_(),
+        TIMESTAMP: pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in dataset.columns])
+
+
+def _record_batch(rows: List[tuple], schema):
+    import pyarrow as pa
+
+    arrays = []
+    for values, field in zip(zip(*rows), schema):
+        if pa.types.is_timestamp(field.type):
+            arrays.append(pa.array(values, type=pa.int64()).view(field.type))
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _Sink:
+    """Write-only file object collecting what the Arrow writer emits."""
+
+    def __init__(self) -> None:
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _writer(fmt: str, sink, schema):
+    import pyarrow as pa
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(sink, schema, compression="zstd")
+    if fmt == "arrows":
+        return pa.ipc.new_stream(sink, schema)
+    return pa.ipc.new_file(sink, schema)
+
+
+def stream_export(
+    name: str, start: datetime, end: datetime, fmt: str, batch_rows: int
+) -> Iterator[bytes]:
+    """Serialized ``fmt`` bytes of dataset ``name`` over ``[start, end)``, chunk by chunk."""
+
+    import pyarrow as pa
+
+    dataset = DATASETS[name]
+    schema = _schema(dataset)
+    sink = _Sink()
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_rows).execute(
+            dataset.query(start, end)
+        )
+        writer = _writer(fmt, pa.PythonFile(sink, mode="w"), schema)
+        for rows in result.partitions():
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+        writer.close()
+    yield sink.drain()
@@ -1,28 +1,26 @@
+import orjson
+from sqlalchemy import Text, cast, func, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
 from sqlalchemy.orm import Session
-from ..models import RvolCandidate, CandidateFiltered
-from ..services.app_settings import load_app_settings
-from datetime import datetime, timedelta
+from ..config import settings
+from ..models import RvolBatch, RvolCandidate, CandidateFiltered, RuleSnapshot
+from .filter_rules import effective_rule, enabled_rule_sets
+from .regime import regime_profiles
+from ..rules import columns_from_records
+from ..tracing import traced
+from datetime import datetime, timedelta, timezone
+import itertools
 from typing import Dict
 from zoneinfo import ZoneInfo
 
 
-def passes_filters(row: RvolCandidate, cfg: Dict) -> bool:
-    price_ok = cfg["price_min"] <= float(row.price) <= cfg["price_max"]
-    rvol_ok = float(row.rvol) >= cfg["min_rvol"]
-    vol_ok = (row.volume or 0) <= cfg["volume_cap"]
-    try:
-        pct_change_value = float(row.pct_change)
-    except (TypeError, ValueError):
-        pct_change_value = None
-    pct_change_ok = (
-        pct_change_value is not None and pct_change_value >= cfg["min_pct_change"]
-    )
-    return price_ok and rvol_ok and vol_ok and pct_change_ok
-
-
-def score_row(row: RvolCandidate) -> float:
-    # MVP: simple score = RVOL (later: z-scores, liquidity, news boost, etc.)
-    return float(row.rvol)
+def score_row(row: RvolCandidate, news=None, rvol: float | None = None) -> float:
+    # MVP: simple score = RVOL (later: z-scores, liquidity, etc.), boosted
+    # when the ticker has recent headlines (news: services.news.NewsFeature)
+    score = float(row.rvol if rvol is None else rvol)
+    if news is not None and news.count:
+        score *= 1 + settings.NEWS_SCORE_BOOST
+    return score
 
 
 def day_bounds_utc(day: datetime | None, tz_str="America/Santiago"):
@@ -32,29 +30,119 @@ def day_bounds_utc(day: datetime | None, tz_str="America/Santiago"):
     end_local = start_local + timedelta(days=1)
     return start_local.astimezone(ZoneInfo("UTC")), end_local.astimezone(ZoneInfo("UTC"))
 
+def batch_rvols(db: Session, batch_id, rows: list[RvolCandidate]) -> Dict[int, float]:
+    """RVOL to filter and score each row by (row id -> value).
+
+    The screener's value, unless ``RVOL_ENGINE`` swaps in the in-house one
+    from ``services.volume_profile``: only where the screener's is missing
+    ("fill") or wherever the ticker has a profile ("replace").
+    """
+
+    rvols = {row.id: float(row.rvol) for row in rows}
+    if settings.RVOL_ENGINE not in ("fill", "replace") or not rows:
+        return rvols
+    from .market_calendar import MARKET_TZ
+    from .volume_profile import volume_profiles  # deferred: numpy
+
+    at = db.scalar(select(RvolBatch.ingested_at).where(RvolBatch.id == batch_id))
+    at = at or datetime.now(timezone.utc)
+    volume_profiles.ensure(db, at.astimezone(MARKET_TZ).date())
+    ours = volume_profiles.rvol(
+        (row.symbol_id for row in rows),
+        (float("nan") if row.volume is None else row.volume for row in rows),
+        at.timestamp(),
+    )
+    for row, value in zip(rows, ours.tolist()):
+        screener = rvols[row.id]
+        missing = not screener > 0  # also NaN
+        if value == value and (missing or settings.RVOL_ENGINE == "replace"):
+            rvols[row.id] = value
+    return rvols
+
+
+# rule_snapshots ids by canonical rules JSON; only ids whose insert was
+# committed go in, so a rolled back batch can't leave a dangling one
+_snapshot_ids: Dict[str, int] = {}
+MAX_CACHED_SNAPSHOTS = 256
+
+
+def rule_snapshot(db: Session, rules: Dict) -> tuple[str, int]:
+    """(canonical JSON, ``rule_snapshots`` id) for ``rules``, inserting it if new.
+
+    The hash is computed by Postgres over the ``jsonb`` text form, so the
+    same rules always land on one row whatever key order they came in.
+    """
+
+    key = orjson.dumps(rules, option=orjson.OPT_SORT_KEYS).decode()
+    snapshot_id = _snapshot_ids.get(key)
+    if snapshot_id is None:
+        doc = cast(literal(key), JSONB)
+        stmt = pg_insert(RuleSnapshot).values(hash=func.md5(cast(doc, Text)), rules_json=doc)
+        snapshot_id = db.scalar(
+            stmt.on_conflict_do_update(
+                index_elements=[RuleSnapshot.hash], set_={"hash": stmt.excluded.hash}
+            ).returning(RuleSnapshot.id)
+        )
+    return key, snapshot_id
+
+
+def _remember_snapshot(key: str, snapshot_id: int) -> None:
+    if len(_snapshot_ids) >= MAX_CACHED_SNAPSHOTS:
+        _snapshot_ids.clear()
+    _snapshot_ids[key] = snapshot_id
+
+
+@traced("filter_and_score")
 def filter_and_score(db: Session, batch_id) -> list[CandidateFiltered]:
     """Filter candidates for a batch and return the top scored ones.
 
-    Configuration comes from environment defaults (``settings``) with optional
-    overrides stored in the ``app_settings`` table.  Any keys found in the DB
-    that match our expected configuration fields will override the defaults.
+    Rules come from the active regime's profile (see ``services.regime``):
+    environment defaults, overridden by ``app_settings`` and per-regime
+    overrides, cached for the session day so no settings query runs per batch.
+    The enabled rule sets in ``filters`` (``services.filter_rules``) are
+    ANDed onto it and the whole rule is one NumPy mask over the batch.
+
+    The rules go to ``rule_snapshots`` once per distinct content and are
+    referenced from the batch and each kept row, next to the row's metrics
+    in typed columns.
     """
 
-    # Default configuration from environment variables
-    settings_cfg = load_app_settings(db)
-    cfg: Dict[str, float | int] = {
-        "price_min": float(settings_cfg.get("price_min", 0.0)),
-        "price_max": float(settings_cfg.get("price_max", 0.0)),
-        "min_rvol": float(settings_cfg.get("min_rvol", 0.0)),
-        "min_pct_change": float(settings_cfg.get("min_pct_change", 0.0)),
-        "volume_cap": int(settings_cfg.get("volume_cap", 0)),
-        "topN": int(settings_cfg.get("topN", 0)),
-    }
-    q = db.query(RvolCandidate).filter(RvolCandidate.batch_id == batch_id)
-    kept = [(row, score_row(row)) for row in q if passes_filters(row, cfg)]
+    import numpy as np  # deferred: only scoring a batch needs it
+
+    rows = db.query(RvolCandidate).filter(RvolCandidate.batch_id == batch_id).all()
+    rvols = batch_rvols(db, batch_id, rows)
+    columns = columns_from_records(rows)
+    columns["rvol"] = np.array([rvols[r.id] for r in rows], dtype=np.float64)
+    if settings.REGIME_AUTO:
+        regime_profiles.observe_batch(db, batch_id, columns["pct_change"], columns["rvol"])
+    regime, cfg = regime_profiles.active(db)
+
+    # the profile's rules and every enabled rule set, over the whole batch at once
+    rule = effective_rule(db, cfg)
+    passing = list(itertools.compress(rows, rule.mask(columns).tolist()))
+    news = {}
+    if settings.NEWS_SCORE_BOOST and passing:
+        from .news import news_features  # deferred: pulls in the Finnhub client
+
+        news = news_features(db, {row.symbol_id for row in passing})
+    kept = [(row, score_row(row, news.get(row.symbol_id), rvols[row.id])) for row in passing]
     kept.sort(key=lambda x: x[1], reverse=True)
     top = kept[: cfg["topN"]]
 
+    rules = {
+        "regime": regime.value,
+        "price_range": [cfg["price_min"], cfg["price_max"]],
+        "min_rvol": cfg["min_rvol"],
+        "min_pct_change": cfg["min_pct_change"],
+        "volume_cap": cfg["volume_cap"],
+        "expression": rule.expression,
+        "filters": enabled_rule_sets(db).versions,
+    }
+    rules_key, snapshot_id = rule_snapshot(db, rules)
+    db.execute(
+        update(RvolBatch).where(RvolBatch.id == batch_id).values(rule_snapshot_id=snapshot_id)
+    )
+
     start_utc, end_utc = day_bounds_utc(None)  # "today" in America/Santiago
     now = datetime.utcnow()
     results = []
@@ -63,25 +151,24 @@ def filter_and_score(db: Session, batch_id) -> list[CandidateFiltered]:
         # look for an existing candidate for THIS ticker TODAY
         existing = (db.query(CandidateFiltered)
                       .filter(
-                          CandidateFiltered.ticker == row.ticker,
+                          CandidateFiltered.symbol_id == row.symbol_id,
                           CandidateFiltered.first_seen_at >= start_utc,
                           CandidateFiltered.first_seen_at < end_utc,
                       )
                       .first())
 
-        reasons = {
-            "price": float(row.price),
-            "rvol": float(row.rvol),
-            "pct_change": float(row.pct_change)
-            if row.pct_change is not None
-            else None,
-            "volume": int(row.volume or 0),
-            "rules": {
-                "price_range": [cfg["price_min"], cfg["price_max"]],
-                "min_rvol": cfg["min_rvol"],
-                "min_pct_change": cfg["min_pct_change"],
-                "volume_cap": cfg["volume_cap"],
-            },
+        reasons = {}
+        if rvols[row.id] != float(row.rvol):
+            reasons["screener_rvol"] = float(row.rvol)
+        if row.symbol_id in news:
+            reasons["news_count"] = news[row.symbol_id].count
+        scored = {
+            "price": row.price,
+            "rvol": rvols[row.id],
+            "pct_change": row.pct_change,
+            "volume": row.volume,
+            "rule_snapshot_id": snapshot_id,
+            "reasons_json": reasons or None,
         }
 
         if existing:
@@ -89,21 +176,24 @@ def filter_and_score(db: Session, batch_id) -> list[CandidateFiltered]:
             existing.last_seen_at = now
             if float(sc) > float(existing.score):
                 existing.score = sc
-                existing.reasons_json = reasons
+                for key, value in scored.items():
+                    setattr(existing, key, value)
             db.add(existing)
             results.append(existing)
         else:
             cf = CandidateFiltered(
                 batch_id=batch_id,
                 ticker=row.ticker,
+                symbol_id=row.symbol_id,
                 score=sc,
-                reasons_json=reasons,
                 first_seen_at=now,
                 last_seen_at=now,
                 notified_topn=False,
+                **scored,
             )
             db.add(cf)
             results.append(cf)
 
     db.commit()
+    _remember_snapshot(rules_key, snapshot_id)
     return results
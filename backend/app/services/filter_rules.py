@@ -0,0 +1,82 @@
+"""Enabled rule sets from the ``filters`` table, compiled once.
+
+Every enabled row's expression is ANDed into one ``app.rules`` expression.
+``filter_and_score`` adds the regime profile's own rules in front of it and
+evaluates the lot as a single mask per batch; the backtest pushes it into
+its SQL instead.
+
+The combined expression is kept, with the version of every rule set that
+went into it, until the change feed announces a write to ``filters``.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, List, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..models import FilterRule
+from ..rules import Rule, RuleError, combine, compile_rule, profile_expression
+from .changes import change_feed
+
+logger = logging.getLogger(__name__)
+
+
+class RuleSets(NamedTuple):
+    expression: str  # "" when no rule set is enabled
+    versions: Dict[str, int]  # name -> version of each enabled rule set
+
+
+_cached: RuleSets | None = None
+_generation = 0
+
+
+def invalidate_rule_sets(*_: Any) -> None:
+    global _cached, _generation
+    _cached = None
+    _generation += 1
+
+
+change_feed.subscribe("filters", invalidate_rule_sets)
+change_feed.on_reset(invalidate_rule_sets)
+
+
+def _load(db: Session) -> RuleSets:
+    rows: List[FilterRule] = []
+    for row in db.execute(
+        select(FilterRule).where(FilterRule.enabled).order_by(FilterRule.name)
+    ).scalars():
+        try:
+            compile_rule(row.expression)
+        except RuleError as exc:  # written around the API; don't fail every batch
+            logger.error("skipping filter %r: %s", row.name, exc)
+            continue
+        rows.append(row)
+    return RuleSets(
+        combine(row.expression for row in rows), {row.name: row.version for row in rows}
+    )
+
+
+def enabled_rule_sets(db: Session) -> RuleSets:
+    """The enabled rule sets combined into one expression."""
+
+    global _cached
+    if _cached is not None and change_feed.live:
+        return _cached
+    generation = _generation
+    loaded = _load(db)
+    if change_feed.live and generation == _generation:
+        _cached = loaded
+    return loaded
+
+
+def effective_expression(db: Session, cfg: Dict[str, Any]) -> str:
+    """The profile ``cfg``'s rules and the enabled rule sets as one expression."""
+
+    return combine([profile_expression(cfg), enabled_rule_sets(db).expression])
+
+
+def effective_rule(db: Session, cfg: Dict[str, Any]) -> Rule:
+    return compile_rule(effective_expression(db, cfg))
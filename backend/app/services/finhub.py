@@ -1,13 +1,40 @@
+from datetime import date
+
 import httpx
 from ..config import settings
+from ..tracing import span
+from .rates import TokenBucket
+
+# one budget for every Finnhub call this process makes
+rate_budget = TokenBucket(settings.FINNHUB_RATE_PER_MIN)
 
 
 def get_quote(ticker: str) -> dict:
     # Finnhub free tier: 60 req/min
-    url = "https://finnhub.io/api/v1/quote"
-    with httpx.Client(timeout=8) as client:
+    url = f"{settings.FINNHUB_BASE_URL}/quote"
+    with span("finnhub.quote", ticker=ticker) as s, httpx.Client(timeout=8) as client:
         r = client.get(
             url, params={"symbol": ticker, "token": settings.FINNHUB_API_KEY}
         )
+        s.set(status_code=r.status_code)
         r.raise_for_status()
         return r.json()  # { c, d, dp, h, l, o, pc, t }
+
+
+async def get_company_news(
+    client: httpx.AsyncClient, ticker: str, start: date, end: date
+) -> list[dict]:
+    url = f"{settings.FINNHUB_BASE_URL}/company-news"
+    with span("finnhub.company_news", ticker=ticker) as s:
+        r = await client.get(
+            url,
+            params={
+                "symbol": ticker,
+                "from": start.isoformat(),
+                "to": end.isoformat(),
+                "token": settings.FINNHUB_API_KEY,
+            },
+        )
+        s.set(status_code=r.status_code)
+        r.raise_for_status()
+        return r.json()  # [{ category, datetime, headline, id, related, source, summary, url }]
@@ -0,0 +1,228 @@
+"""US equity (NYSE/Nasdaq) trading calendar, precomputed per year.
+
+Holidays and early closes follow the exchange rules (weekend holidays move
+to Friday/Monday, except a Saturday New Year's Day, which is not made up;
+early 13:00 closes on July 3rd, the day after Thanksgiving and Christmas
+Eve).  One-off closures go in ``SPECIAL_CLOSURES`` or
+``MARKET_EXTRA_HOLIDAYS``.
+
+Sessions are built a few years at a time into flat lists indexed by day, so
+``phase``, ``next_open`` and ``next_change`` are a date conversion plus a
+list lookup.
+"""
+
+from datetime import date, datetime, time, timedelta
+from threading import Lock
+from typing import List, NamedTuple
+from zoneinfo import ZoneInfo
+
+from ..config import settings
+
+MARKET_TZ = ZoneInfo("America/New_York")
+PRE_OPEN = time(4, 0)
+OPEN = time(9, 30)
+CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+POST_CLOSE = time(20, 0)
+EARLY_POST_CLOSE = time(17, 0)
+
+# closures outside the usual rules (national days of mourning and the like)
+SPECIAL_CLOSURES = {date(2025, 1, 9)}
+
+# phases of the trading day
+PRE = "pre"
+REGULAR = "regular"
+POST = "post"
+CLOSED = "closed"
+
+
+class Session(NamedTuple):
+    day: date
+    pre_open: float  # epoch seconds
+    open: float
+    close: float
+    post_close: float
+
+
+def _easter(year: int) -> date:
+    # anonymous Gregorian algorithm
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def holidays(year: int) -> set[date]:
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),
+    }
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:  # a Saturday New Year's Day is not made up
+        days.add(_observed(new_year))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    days.update(day for day in SPECIAL_CLOSURES if day.year == year)
+    days.update(day for day in _extra_holidays() if day.year == year)
+    return days
+
+
+def early_closes(year: int) -> set[date]:
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}  # day after Thanksgiving
+    for day in (date(year, 7, 3), date(year, 12, 24)):
+        if day.weekday() < 4:  # Mon-Thu; on a Friday it is the observed holiday
+            days.add(day)
+    return days - holidays(year)
+
+
+def _extra_holidays() -> set[date]:
+    return {
+        date.fromisoformat(day.strip())
+        for day in settings.MARKET_EXTRA_HOLIDAYS.split(",")
+        if day.strip()
+    }
+
+
+def _at(day: date, clock: time) -> float:
+    return datetime.combine(day, clock, MARKET_TZ).timestamp()
+
+
+def sessions(first_year: int, last_year: int) -> List[Session]:
+    out = []
+    for year in range(first_year, last_year + 1):
+        closed = holidays(year)
+        early = early_closes(year)
+        day = date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < 5 and day not in closed:
+                half = day in early
+                out.append(
+                    Session(
+                        day,
+                        _at(day, PRE_OPEN),
+                        _at(day, OPEN),
+                        _at(day, EARLY_CLOSE if half else CLOSE),
+                        _at(day, EARLY_POST_CLOSE if half else POST_CLOSE),
+                    )
+                )
+            day += timedelta(days=1)
+    return out
+
+
+class MarketCalendar:
+    """Session lookups over a precomputed range that grows on demand."""
+
+    def __init__(self, years_ahead: int = 2) -> None:
+        self.years_ahead = years_ahead
+        self._lock = Lock()
+        self._first = date.max
+        self._last = date.min
+        self._sessions: List[Session] = []
+        self._next: List[int] = []  # per day from _first: first session on/after it
+
+    def _covers(self, day: date) -> bool:
+        # at least a year of sessions beyond ``day``, so next_* never runs out
+        return self._first <= day and day.year + 1 <= self._last.year
+
+    def _build(self, day: date) -> None:
+        with self._lock:
+            if self._covers(day):
+                return
+            first_year = min(day.year, self._first.year) if self._sessions else day.year - 1
+            last_year = max(day.year + self.years_ahead, self._last.year if self._sessions else 0)
+            built = sessions(first_year, last_year)
+            first = date(first_year, 1, 1)
+            last = date(last_year, 12, 31)
+            nxt, i = [], 0
+            for offset in range((last - first).days + 1):
+                current = first + timedelta(days=offset)
+                while i < len(built) and built[i].day < current:
+                    i += 1
+                nxt.append(i)
+            self._sessions, self._next, self._first, self._last = built, nxt, first, last
+
+    def _index(self, ts: float) -> tuple[date, int]:
+        """Local date of ``ts`` and the index of the first session on/after it."""
+
+        day = datetime.fromtimestamp(ts, MARKET_TZ).date()
+        if not self._covers(day):
+            self._build(day)
+        return day, self._next[(day - self._first).days]
+
+    def session(self, day: date) -> Session | None:
+        """The session trading on ``day``; None on weekends and holidays."""
+
+        _, i = self._index(_at(day, time(12, 0)))
+        found = self._sessions[i]
+        return found if found.day == day else None
+
+    def previous_sessions(self, day: date, n: int) -> List[Session]:
+        """The ``n`` sessions before ``day``, oldest first."""
+
+        self._index(_at(day - timedelta(days=2 * n + 7), time(12, 0)))  # builds that far back
+        _, i = self._index(_at(day, time(12, 0)))
+        return self._sessions[max(i - n, 0) : i]
+
+    def phase(self, ts: float) -> str:
+        day, i = self._index(ts)
+        current = self._sessions[i]
+        if current.day != day or ts < current.pre_open or ts >= current.post_close:
+            return CLOSED
+        if ts < current.open:
+            return PRE
+        if ts < current.close:
+            return REGULAR
+        return POST
+
+    def next_open(self, ts: float, extended: bool = False) -> float:
+        """Start of the next regular session (pre-market with ``extended``) after ``ts``."""
+
+        _, i = self._index(ts)
+        start = self._sessions[i].pre_open if extended else self._sessions[i].open
+        if start <= ts:
+            i += 1
+            start = self._sessions[i].pre_open if extended else self._sessions[i].open
+        return start
+
+    def next_change(self, ts: float) -> float:
+        """The next phase boundary after ``ts``."""
+
+        _, i = self._index(ts)
+        for current in self._sessions[i : i + 2]:
+            for boundary in current[1:]:
+                if boundary > ts:
+                    return boundary
+        return self._sessions[i + 2].pre_open
+
+
+market_calendar = MarketCalendar()
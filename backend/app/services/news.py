@@ -0,0 +1,159 @@
+"""Company headlines for the tickers we care about, cached in ``news_cache``.
+
+``NewsCache.refresh`` takes ``symbol_id -> ticker`` (today's Top-N plus the
+watchlist, see ``workers.news``), skips tickers fetched within
+``NEWS_TTL_SECONDS`` and fetches the rest concurrently: at most
+``NEWS_CONCURRENCY`` requests in flight, each paid for from the shared
+Finnhub ``rate_budget``.  A refresh fetches at most ``NEWS_MAX_PER_CYCLE``
+tickers and leaves ``NEWS_RATE_RESERVE`` tokens in the budget, so quote
+polling never waits on news; tickers left over stay due for the next round.
+Headlines are keyed by ``content_hash`` and written with one
+``INSERT ... ON CONFLICT DO NOTHING``, so refetching a ticker only adds
+what is new.
+
+``news_features`` is the scorer's side: headline count and latest publish
+time per symbol in one grouped query.
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, NamedTuple
+
+import httpx
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import NewsItem
+from .finhub import get_company_news, rate_budget
+
+logger = logging.getLogger(__name__)
+
+INSERT_CHUNK = 1000
+
+
+class NewsFeature(NamedTuple):
+    count: int
+    latest: datetime
+
+
+def content_hash(ticker: str, headline: str, url: str | None) -> str:
+    # same story from the same link is one row per ticker, however often it is fetched
+    text = "\n".join((ticker, " ".join(headline.split()).lower(), url or ""))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def news_rows(symbol_id: int, ticker: str, items: list[dict]) -> list[dict]:
+    rows = []
+    for item in items:
+        headline = (item.get("headline") or "").strip()
+        published = item.get("datetime")
+        if not headline or not published:
+            continue
+        url = item.get("url") or None
+        rows.append(
+            {
+                "ticker": ticker,
+                "symbol_id": symbol_id,
+                "headline": headline,
+                "url": url,
+                "provider": item.get("source") or None,
+                "published_at": datetime.fromtimestamp(published, timezone.utc),
+                "hash": content_hash(ticker, headline, url),
+            }
+        )
+    return rows
+
+
+class NewsCache:
+    def __init__(self) -> None:
+        self._fetched_at: Dict[int, float] = {}
+
+    def due(self, symbols: Dict[int, str]) -> Dict[int, str]:
+        """The tickers not fetched within ``NEWS_TTL_SECONDS``, stalest first."""
+
+        cutoff = time.monotonic() - settings.NEWS_TTL_SECONDS
+        stale = [
+            (self._fetched_at.get(symbol_id, 0.0), symbol_id)
+            for symbol_id in symbols
+            if self._fetched_at.get(symbol_id, 0.0) <= cutoff
+        ]
+        return {symbol_id: symbols[symbol_id] for _, symbol_id in sorted(stale)}
+
+    def refresh(self, db: Session, symbols: Dict[int, str]) -> int:
+        """Fetch due tickers and store new headlines; returns rows inserted.
+
+        The caller commits.
+        """
+
+        due = self.due(symbols)
+        if not due:
+            return 0
+        fetched = asyncio.run(self._fetch_all(due))
+        rows = [
+            row
+            for symbol_id, items in fetched.items()
+            for row in news_rows(symbol_id, due[symbol_id], items)
+        ]
+        inserted = 0
+        for start in range(0, len(rows), INSERT_CHUNK):
+            result = db.execute(
+                pg_insert(NewsItem)
+                .values(rows[start : start + INSERT_CHUNK])
+                .on_conflict_do_nothing(index_elements=[NewsItem.hash])
+                .returning(NewsItem.id)
+            )
+            inserted += len(result.all())
+        return inserted
+
+    async def _fetch_all(self, due: Dict[int, str]) -> Dict[int, list[dict]]:
+        end = datetime.now(timezone.utc).date()
+        start = end - timedelta(days=settings.NEWS_LOOKBACK_DAYS)
+        gate = asyncio.Semaphore(max(settings.NEWS_CONCURRENCY, 1))
+        results: Dict[int, list[dict]] = {}
+
+        async def fetch(client: httpx.AsyncClient, symbol_id: int, ticker: str) -> None:
+            async with gate:
+                try:
+                    results[symbol_id] = await get_company_news(client, ticker, start, end)
+                except Exception:
+                    logger.warning("news fetch failed for %s", ticker, exc_info=True)
+                    return
+            self._fetched_at[symbol_id] = time.monotonic()
+
+        async with httpx.AsyncClient(timeout=8) as client:
+            tasks = []
+            for symbol_id, ticker in due.items():
+                if len(tasks) >= settings.NEWS_MAX_PER_CYCLE or not rate_budget.take(
+                    1, reserve=settings.NEWS_RATE_RESERVE
+                ):
+                    break  # out of this round's share; the rest stay due
+                tasks.append(fetch(client, symbol_id, ticker))
+            await asyncio.gather(*tasks)
+        return results
+
+
+def news_features(
+    db: Session, symbol_ids, hours: float | None = None
+) -> Dict[int, NewsFeature]:
+    """Headline count and latest publish time per symbol over the last ``hours``."""
+
+    symbol_ids = list(symbol_ids)
+    if not symbol_ids:
+        return {}
+    since = datetime.now(timezone.utc) - timedelta(
+        hours=settings.NEWS_RECENT_HOURS if hours is None else hours
+    )
+    rows = db.execute(
+        select(NewsItem.symbol_id, func.count(), func.max(NewsItem.published_at))
+        .where(NewsItem.symbol_id.in_(symbol_ids), NewsItem.published_at >= since)
+        .group_by(NewsItem.symbol_id)
+    )
+    return {symbol_id: NewsFeature(count, latest) for symbol_id, count, latest in rows}
+
+
+news_cache = NewsCache()
@@ -1,6 +1,8 @@
-import httpx
 from sqlalchemy.orm import Session
 from ..models import Notification, Channel, NotifyStatus
+from .symbols import symbol_ids
+from ..config import settings
+from ..tracing import span
 from datetime import datetime
 
 
@@ -20,14 +22,16 @@ def notify_telegram(
     if existing:
         return
 
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    url = f"{settings.TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
     status = NotifyStatus.sent
     error = None
     try:
+        import httpx  # deferred so API workers don't load it at boot
+
         payload = {"chat_id": chat_id, "text": message}
         if parse_mode:
             payload["parse_mode"] = parse_mode
-        with httpx.Client(timeout=10) as client:
+        with span("telegram.send", ticker=ticker), httpx.Client(timeout=10) as client:
             client.post(url, json=payload)
     except Exception as e:
         status = NotifyStatus.error
@@ -37,6 +41,7 @@ def notify_telegram(
         Notification(
             channel=Channel.telegram,
             ticker=ticker,
+            symbol_id=symbol_ids.resolve(db, ticker) if ticker else None,
             message=message,
             dedupe_key=dedupe_key,
             sent_at=datetime.utcnow(),
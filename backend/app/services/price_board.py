@@ -0,0 +1,290 @@
+"""Live prices in a shared memory-mapped file, readable by every API worker.
+
+The price poller is the only writer; uvicorn workers map the same file and
+read it without locks or DB queries.  Layout is fixed: a header followed by
+``PRICE_BOARD_SLOTS`` 64-byte slots, each holding one ticker::
+
+    seq u64 | ticker 16s | price f64 | at f64 | day_high f64 | day_low f64 | pad
+
+Tickers are placed by a stable hash with linear probing and never move, so
+readers can cache where a ticker lives.  Every slot is a seqlock: the
+writer bumps ``seq`` to odd, writes the fields and bumps it back to even;
+readers retry while ``seq`` is odd or changed under them.  Only one process
+may write (an exclusive ``flock`` on the file), so extra pollers in other
+workers leave the board alone instead of tearing it.
+
+A mapped file is never resized: when the writer needs another layout it
+builds a new file, renames it over the old one and stamps the old header
+``RETIRED``, which sends readers to the new file on their next lookup.
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PXB1"
+RETIRED = b"PXB0"  # replaced by a newer file at the same path
+HEADER = struct.Struct("<4sII")  # magic, slot count, slot size
+HEADER_SIZE = 64
+SEQ = struct.Struct("<Q")
+SLOT = struct.Struct("<Q16sdddd8x")
+BODY = struct.Struct("<16sdddd")
+TICKER_BYTES = 16
+EMPTY = bytes(TICKER_BYTES)
+READ_RETRIES = 100
+
+
+class Quote(NamedTuple):
+    ticker: str
+    price: float
+    at: float  # epoch seconds the poller read it
+    day_high: Optional[float]
+    day_low: Optional[float]
+
+
+def board_path() -> str:
+    if settings.PRICE_BOARD_PATH:
+        return settings.PRICE_BOARD_PATH
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "screener-price-board")
+
+
+def _key(ticker: str) -> bytes | None:
+    raw = ticker.encode()
+    return raw.ljust(TICKER_BYTES, b"\0") if 0 < len(raw) <= TICKER_BYTES else None
+
+
+def _nan_to_none(value: float) -> Optional[float]:
+    return None if value != value else value
+
+
+class PriceBoard:
+    def __init__(self, path: str | None = None, slots: int | None = None) -> None:
+        self.path = path
+        self.slots = slots
+        self._map: mmap.mmap | None = None
+        self._fd: int | None = None
+        self._writer: bool | None = None  # None: not tried yet
+        self._index: Dict[bytes, int] = {}  # ticker -> slot, for this process
+        self._full_warned = False
+
+    def _open_writer(self) -> bool:
+        path = self.path or board_path()
+        slots = self.slots or settings.PRICE_BOARD_SLOTS
+        size = HEADER_SIZE + slots * SLOT.size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            logger.info("price board %s has another writer; not publishing", path)
+            return False
+        if os.fstat(fd).st_ino != os.stat(path).st_ino:
+            os.close(fd)  # another writer replaced the file after we opened it
+            logger.info("price board %s has another writer; not publishing", path)
+            return False
+        layout = (MAGIC, slots, SLOT.size)
+        if os.fstat(fd).st_size != size or HEADER.unpack(os.pread(fd, HEADER.size, 0)) != layout:
+            fd = _replace(path, fd, slots, size)
+        board = mmap.mmap(fd, size)
+        # A read-only mapping from before is left to the garbage collector:
+        # request threads may still be reading it.
+        self._index.clear()
+        self._fd, self._map, self.slots = fd, board, slots  # the fd holds the writer lock
+        return True
+
+    def _open_reader(self) -> bool:
+        try:
+            fd = os.open(self.path or board_path(), os.O_RDONLY)
+        except FileNotFoundError:
+            return False  # no poller has published yet
+        try:
+            if os.fstat(fd).st_size < HEADER_SIZE:
+                return False
+            board = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        magic, slots, slot_size = HEADER.unpack_from(board)
+        if magic != MAGIC or slot_size != SLOT.size or len(board) < HEADER_SIZE + slots * SLOT.size:
+            board.close()
+            return False
+        self._index.clear()
+        self._map = board
+        return True
+
+    def _board(self) -> mmap.mmap | None:
+        board = self._map
+        if board is not None and self._fd is None and board[:4] == RETIRED:
+            board = None  # the writer moved to a new file
+        if board is None and self._open_reader():
+            board = self._map
+        return board
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)  # releases the writer lock
+            self._fd = None
+        self._writer = None
+        self._index.clear()
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * SLOT.size
+
+    def _probe(self, board, key: bytes, claim: bool) -> int | None:
+        slot = self._index.get(key)
+        if slot is not None and board[self._offset(slot) + 8 : self._offset(slot) + 24] == key:
+            return slot
+        slots = _slot_count(board)
+        start = zlib.crc32(key) % slots
+        for step in range(slots):
+            slot = (start + step) % slots
+            found = board[self._offset(slot) + 8 : self._offset(slot) + 24]
+            if found == key or (claim and found == EMPTY):
+                self._index[key] = slot
+                return slot
+            if found == EMPTY:
+                return None
+        return None
+
+    def publish(self, quotes: Iterable[Quote]) -> int:
+        """Write quotes to the board; returns how many were stored.
+
+        A no-op in processes that can't take the writer lock.
+        """
+
+        if self._writer is None:
+            self._writer = self._open_writer()
+        if not self._writer:
+            return 0
+        board = self._map
+        stored = 0
+        for quote in quotes:
+            key = _key(quote.ticker)
+            slot = self._probe(board, key, claim=True) if key else None
+            if slot is None:
+                if key and not self._full_warned:
+                    logger.warning("price board full (%d slots); raise PRICE_BOARD_SLOTS", self.slots)
+                    self._full_warned = True
+                continue
+            offset = self._offset(slot)
+            (seq,) = SEQ.unpack_from(board, offset)
+            SEQ.pack_into(board, offset, seq + 1)
+            BODY.pack_into(
+                board,
+                offset + 8,
+                key,
+                quote.price,
+                quote.at,
+                float("nan") if quote.day_high is None else quote.day_high,
+                float("nan") if quote.day_low is None else quote.day_low,
+            )
+            SEQ.pack_into(board, offset, seq + 2)
+            stored += 1
+        return stored
+
+    def _read(self, board, slot: int) -> Quote | None:
+        offset = self._offset(slot)
+        for _ in range(READ_RETRIES):
+            seq, key, price, at, high, low = SLOT.unpack_from(board, offset)
+            if seq & 1 or SEQ.unpack_from(board, offset)[0] != seq:
+                continue  # mid-write; try again
+            if seq == 0:
+                return None
+            return Quote(key.rstrip(b"\0").decode(), price, at, _nan_to_none(high), _nan_to_none(low))
+        return None
+
+    def get(self, ticker: str, max_age: float | None = None) -> Quote | None:
+        """The latest quote for ``ticker``; None if absent or older than ``max_age``."""
+
+        board = self._board()
+        key = _key(ticker)
+        if board is None or key is None:
+            return None
+        slot = self._probe(board, key, claim=False)
+        quote = self._read(board, slot) if slot is not None else None
+        if quote is None or (max_age is not None and quote.at < time.time() - max_age):
+            return None
+        return quote
+
+    def many(self, tickers: Iterable[str], max_age: float | None = None) -> Dict[str, Quote]:
+        found = {}
+        for ticker in tickers:
+            quote = self.get(ticker, max_age)
+            if quote is not None:
+                found[ticker] = quote
+        return found
+
+    def snapshot(self, max_age: float | None = None) -> List[Quote]:
+        """Every quote on the board, ticker order."""
+
+        board = self._board()
+        if board is None:
+            return []
+        cutoff = None if max_age is None else time.time() - max_age
+        quotes = []
+        for slot in range(_slot_count(board)):
+            if board[self._offset(slot) + 8 : self._offset(slot) + 24] == EMPTY:
+                continue
+            quote = self._read(board, slot)
+            if quote is not None and (cutoff is None or quote.at >= cutoff):
+                quotes.append(quote)
+        quotes.sort()
+        return quotes
+
+
+def _slot_count(board) -> int:
+    # from the mapping itself: self.slots may already describe a newer file
+    return HEADER.unpack_from(board)[1]
+
+
+def _replace(path: str, old_fd: int, slots: int, size: int) -> int:
+    """Put an empty ``slots`` board at ``path``; returns its fd, locked.
+
+    The old file is retired rather than truncated, so processes that still
+    have it mapped never read past its end.
+    """
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".price-board-")
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # locked before it has a name
+        os.fchmod(fd, 0o644)
+        os.ftruncate(fd, size)  # zero-filled
+        os.pwrite(fd, HEADER.pack(MAGIC, slots, SLOT.size), 0)
+        os.replace(tmp, path)
+    except BaseException:
+        os.close(fd)
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+    if os.fstat(old_fd).st_size >= HEADER_SIZE:
+        os.pwrite(old_fd, RETIRED, 0)
+    os.close(old_fd)
+    logger.info("price board %s laid out for %d slots", path, slots)
+    return fd
+
+
+price_board = PriceBoard()
+
+
+def live_price(ticker: str, stored) -> float | None:
+    """The board's price for ``ticker`` if fresh, else the ``stored`` one."""
+
+    quote = price_board.get(ticker, settings.PRICE_BOARD_MAX_AGE_SECONDS)
+    if quote is not None:
+        return quote.price
+    return float(stored) if stored is not None else None
@@ -9,7 +9,9 @@ class TokenBucket:
         self.last = time.time()
         self.lock = Lock()
 
-    def take(self, n=1) -> bool:
+    def take(self, n=1, reserve=0) -> bool:
+        """Take ``n`` tokens if at least ``reserve`` would be left afterwards."""
+
         with self.lock:
             now = time.time()
             elapsed = now - self.last
@@ -18,7 +20,7 @@ class TokenBucket:
             if refill > 0:
                 self.tokens = min(self.capacity, self.tokens + refill)
                 self.last = now
-            if self.tokens >= n:
+            if self.tokens - n >= reserve:
                 self.tokens -= n
                 return True
             return False
@@ -0,0 +1,255 @@
+"""Per-regime filter profiles and the day's market regime.
+
+``filter_and_score`` runs for every ingested batch, so the merged filter
+profiles and today's ``market_regime`` row are loaded once per session day
+and kept in a process-wide cache; picking the active profile is then a dict
+lookup.  Writers of settings or regimes call ``regime_profiles.invalidate()``;
+with the change feed live, writes from other processes invalidate it too.
+
+With ``REGIME_AUTO`` enabled the regime is derived from breadth across the
+day's batches (share of advancers and average RVOL).  Running totals are
+seeded from the DB when the day is loaded and then updated from each batch's
+rows in one vectorized pass, so no extra query is needed per batch.  If the
+change feed announces a batch this process never observed (ingested by
+another worker), the totals are re-read from the DB at the next batch.
+Regimes set by hand are never overwritten.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import TYPE_CHECKING, Any, Dict
+
+from sqlalchemy import Float, and_, cast, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from zoneinfo import ZoneInfo
+
+from ..config import settings
+from ..models import MarketRegime, Regime, RvolBatch, RvolCandidate
+from .app_settings import load_app_settings
+from .changes import change_feed
+
+if TYPE_CHECKING:  # numpy is only imported once REGIME_AUTO sees a batch
+    import numpy as np
+
+SESSION_TZ = ZoneInfo("America/New_York")  # market_regime.for_date is a session date
+REGIME_PROFILES_KEY = "regime_profiles"
+AUTO_NOTE_PREFIX = "auto:"
+
+FILTER_KEYS = ("price_min", "price_max", "min_rvol", "min_pct_change", "volume_cap", "topN")
+INTEGER_KEYS = ("volume_cap", "topN")
+
+# Built-in differences from the base settings (docs: hot < 20M, cold < 10M).
+DEFAULT_PROFILE_OVERRIDES: Dict[Regime, Dict[str, Any]] = {
+    Regime.hot: {},
+    Regime.cold: {"volume_cap": settings.VOLUME_CAP_COLD},
+}
+
+
+def session_date(now: datetime | None = None) -> date:
+    return (now or datetime.now(SESSION_TZ)).astimezone(SESSION_TZ).date()
+
+
+def merge_profiles(config: Dict[str, Any]) -> Dict[Regime, Dict[str, float | int]]:
+    """Filter config per regime: base settings, built-in and stored overrides."""
+
+    stored = config.get(REGIME_PROFILES_KEY)
+    stored = stored if isinstance(stored, dict) else {}
+    profiles = {}
+    for regime in Regime:
+        merged = {key: config.get(key, 0) for key in FILTER_KEYS}
+        merged.update(DEFAULT_PROFILE_OVERRIDES[regime])
+        overrides = stored.get(regime.value)
+        if isinstance(overrides, dict):
+            merged.update({k: v for k, v in overrides.items() if k in FILTER_KEYS})
+        profiles[regime] = {
+            key: int(merged[key]) if key in INTEGER_KEYS else float(merged[key])
+            for key in FILTER_KEYS
+        }
+    return profiles
+
+
+@dataclass
+class Breadth:
+    rows: int = 0
+    advancers: int = 0
+    rvol_sum: float = 0.0
+
+    def add(self, pct_change: np.ndarray, rvol: np.ndarray) -> None:
+        import numpy as np
+
+        self.rows += len(rvol)
+        self.advancers += int(np.count_nonzero(pct_change > 0))  # NaN counts as not up
+        self.rvol_sum += float(np.nansum(rvol))
+
+    def regime(self) -> Regime | None:
+        if self.rows < settings.REGIME_AUTO_MIN_ROWS:
+            return None
+        hot = (
+            self.advancers / self.rows >= settings.REGIME_HOT_MIN_ADVANCERS
+            and self.rvol_sum / self.rows >= settings.REGIME_HOT_MIN_AVG_RVOL
+        )
+        return Regime.hot if hot else Regime.cold
+
+    def note(self) -> str:
+        rows = max(self.rows, 1)
+        return (
+            f"{AUTO_NOTE_PREFIX} advancers={self.advancers / rows:.2f} "
+            f"avg_rvol={self.rvol_sum / rows:.2f} rows={self.rows}"
+        )
+
+
+@dataclass
+class DayState:
+    day: date
+    regime: Regime
+    source: str  # "manual", "auto" or "default"
+    profiles: Dict[Regime, Dict[str, float | int]]
+    breadth: Breadth
+    observed: set[str] = field(default_factory=set)  # batch ids folded in here
+    unseen: set[str] = field(default_factory=set)  # announced, not observed
+
+    @property
+    def config(self) -> Dict[str, float | int]:
+        return self.profiles[self.regime]
+
+
+def _day_breadth(db: Session, day: date) -> Breadth:
+    start = datetime.combine(day, time.min, SESSION_TZ)
+    row = db.execute(
+        select(
+            func.count(),
+            func.count().filter(RvolCandidate.pct_change > 0),
+            func.coalesce(func.sum(cast(RvolCandidate.rvol, Float)), 0.0),
+        )
+        .select_from(RvolCandidate)
+        .join(RvolBatch, RvolBatch.id == RvolCandidate.batch_id)
+        .where(
+            and_(
+                RvolBatch.ingested_at >= start,
+                RvolBatch.ingested_at < start + timedelta(days=1),
+            )
+        )
+    ).one()
+    return Breadth(rows=row[0], advancers=row[1], rvol_sum=float(row[2]))
+
+
+class RegimeProfiles:
+    def __init__(self) -> None:
+        self._state: DayState | None = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self, *_: Any) -> None:
+        self._state = None
+        self._generation += 1
+
+    def batch_announced(self, op: str, batch_id: Any) -> None:
+        with self._lock:
+            state = self._state
+            if state is not None and str(batch_id) not in state.observed:
+                state.unseen.add(str(batch_id))
+
+    def _load(self, db: Session, day: date) -> DayState:
+        profiles = merge_profiles(load_app_settings(db))
+        row = db.execute(
+            select(MarketRegime.regime, MarketRegime.notes).where(
+                MarketRegime.for_date == day
+            )
+        ).first()
+        if row is None:
+            regime, source = Regime.hot, "default"
+        else:
+            regime = Regime(row.regime)
+            auto = (row.notes or "").startswith(AUTO_NOTE_PREFIX)
+            source = "auto" if auto else "manual"
+        breadth = Breadth()
+        if settings.REGIME_AUTO and source != "manual":
+            breadth = _day_breadth(db, day)
+        return DayState(day, regime, source, profiles, breadth)
+
+    def _current(self, db: Session) -> tuple[DayState, bool]:
+        day = session_date()
+        state = self._state
+        if state is not None and state.day == day:
+            return state, False
+        with self._lock:
+            state = self._state
+            if state is None or state.day != day:
+                generation = self._generation
+                state = self._load(db, day)
+                if generation == self._generation:  # not invalidated meanwhile
+                    self._state = state
+                return state, True
+        return state, False
+
+    def state(self, db: Session) -> DayState:
+        return self._current(db)[0]
+
+    def active(self, db: Session) -> tuple[Regime, Dict[str, float | int]]:
+        state = self.state(db)
+        return state.regime, state.config
+
+    def observe_batch(
+        self, db: Session, batch_id: Any, pct_change: np.ndarray, rvol: np.ndarray
+    ) -> Regime:
+        """Fold a batch into today's breadth and re-derive the regime.
+
+        The batch must already be stored: a day loaded (or re-read) by this
+        call has its totals read from the DB, which then include the batch.
+        """
+
+        state, loaded = self._current(db)
+        if not settings.REGIME_AUTO or state.source == "manual":
+            return state.regime
+        with self._lock:
+            state.observed.add(str(batch_id))
+            state.unseen.discard(str(batch_id))
+            if state.unseen:
+                state.breadth = _day_breadth(db, state.day)
+                state.unseen.clear()
+            elif not loaded:
+                state.breadth.add(pct_change, rvol)
+            derived = state.breadth.regime()
+            if derived is None or (derived == state.regime and state.source == "auto"):
+                return state.regime
+            state.regime, state.source = derived, "auto"
+        _store_auto_regime(db, state.day, derived, state.breadth.note())
+        return derived
+
+
+def _store_auto_regime(db: Session, day: date, regime: Regime, note: str) -> None:
+    stmt = insert(MarketRegime).values(for_date=day, regime=regime, notes=note)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[MarketRegime.for_date],
+            set_={"regime": stmt.excluded.regime, "notes": stmt.excluded.notes},
+            where=MarketRegime.notes.like(f"{AUTO_NOTE_PREFIX}%"),
+        )
+    )
+
+
+def set_regime(db: Session, day: date, regime: Regime, notes: str | None) -> MarketRegime:
+    """Set a day's regime by hand; auto-derivation leaves it alone afterwards."""
+
+    record = db.query(MarketRegime).filter(MarketRegime.for_date == day).first()
+    if record is None:
+        record = MarketRegime(for_date=day)
+    record.regime = regime
+    record.notes = notes
+    db.add(record)
+    db.commit()
+    db.refresh(record)
+    regime_profiles.invalidate()
+    return record
+
+
+regime_profiles = RegimeProfiles()
+
+change_feed.subscribe("app_settings", regime_profiles.invalidate)
+change_feed.subscribe("market_regime", regime_profiles.invalidate)
+change_feed.subscribe("rvol_batches", regime_profiles.batch_announced)
+change_feed.on_reset(regime_profiles.invalidate)
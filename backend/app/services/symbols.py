@@ -0,0 +1,76 @@
+"""Ticker normalization and the process-wide ticker -> ``symbols.id`` map.
+
+Tables reference tickers through integer ``symbol_id`` columns.  Resolving
+a ticker is a dict lookup once it has been seen by this process; unknown
+tickers of a whole batch are created/fetched together in two statements.
+The ``ticker`` text columns are still written alongside for display.
+"""
+
+import threading
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from ..models import Symbol
+
+
+def normalize_ticker(ticker: str) -> str:
+    return ticker.strip().upper()
+
+
+class SymbolMap:
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+
+    def resolve_many(self, db: Session, tickers: Iterable[str]) -> Dict[str, int]:
+        """Map normalized tickers to symbol ids, creating missing symbols.
+
+        New symbols are committed on their own connection, so the ids cached
+        here stay valid even if the caller's transaction rolls back.
+        """
+
+        wanted = {normalize_ticker(t) for t in tickers}
+        missing = [t for t in wanted if t not in self._ids]
+        if missing:
+            with db.get_bind().connect() as conn:
+                conn.execute(
+                    insert(Symbol)
+                    .values([{"ticker": t} for t in missing])
+                    .on_conflict_do_nothing(index_elements=[Symbol.ticker])
+                )
+                found = conn.execute(
+                    select(Symbol.ticker, Symbol.id).where(Symbol.ticker.in_(missing))
+                ).all()
+                conn.commit()
+            with self._lock:
+                self._ids.update({ticker: symbol_id for ticker, symbol_id in found})
+        return {t: self._ids[t] for t in wanted}
+
+    def resolve(self, db: Session, ticker: str) -> int:
+        return self.resolve_many(db, [ticker])[normalize_ticker(ticker)]
+
+    def lookup_many(self, db: Session, tickers: Iterable[str]) -> Dict[str, int]:
+        """Like ``resolve_many`` for tickers that already exist; unknown ones are left out."""
+
+        wanted = {normalize_ticker(t) for t in tickers}
+        missing = [t for t in wanted if t not in self._ids]
+        if missing:
+            found = db.execute(
+                select(Symbol.ticker, Symbol.id).where(Symbol.ticker.in_(missing))
+            ).all()
+            with self._lock:
+                self._ids.update({ticker: symbol_id for ticker, symbol_id in found})
+        return {t: self._ids[t] for t in wanted if t in self._ids}
+
+    def lookup(self, db: Session, ticker: str) -> int | None:
+        return self.lookup_many(db, [ticker]).get(normalize_ticker(ticker))
+
+
+symbol_ids = SymbolMap()
@@ -0,0 +1,164 @@
+"""In-house RVOL from time-of-day volume profiles.
+
+Every ingested batch reports each ticker's cumulative volume so far today.
+For the last ``RVOL_PROFILE_DAYS`` sessions those observations are turned
+into cumulative volume curves sampled every ``RVOL_PROFILE_BIN_MINUTES`` of
+the regular session (linear between observations, unknown outside them) and
+kept in one float32 ring of shape ``(symbols, days, bins + 1)``.  The
+expected curve per symbol is the median across days with data, needing at
+least ``RVOL_PROFILE_MIN_DAYS`` of them.
+
+Live RVOL is then cumulative volume now divided by the expected curve
+interpolated at the current minute, computed for a whole batch at once.
+
+The ring is filled from ``rvol_candidates`` when first used and then rolls
+one session at a time: when the session day changes, only the sessions
+since the last roll are read back (one query, which also picks up batches
+other workers ingested) and the expected curves are recomputed.
+"""
+
+import warnings
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, Iterable, List
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import RvolBatch, RvolCandidate
+from .market_calendar import MARKET_TZ, Session as MarketSession, market_calendar
+
+MIN_CAPACITY = 256
+
+
+class VolumeProfiles:
+    def __init__(
+        self,
+        days: int | None = None,
+        bin_minutes: int | None = None,
+        min_days: int | None = None,
+    ) -> None:
+        self.days = days or settings.RVOL_PROFILE_DAYS
+        self.bin_minutes = bin_minutes or settings.RVOL_PROFILE_BIN_MINUTES
+        self.min_days = min_days or settings.RVOL_PROFILE_MIN_DAYS
+        self.edges = np.arange(0, 390 + self.bin_minutes, self.bin_minutes, dtype=np.float64)
+        self._lock = Lock()
+        self._rows: Dict[int, int] = {}  # symbol_id -> row
+        self._history = self._empty((MIN_CAPACITY, self.days, len(self.edges)))
+        self._expected = self._empty((MIN_CAPACITY, len(self.edges)))
+        self._cursor = 0  # ring slot the next session goes to
+        self._through: date | None = None  # last session folded into the ring
+
+    @staticmethod
+    def _empty(shape) -> np.ndarray:
+        return np.full(shape, np.nan, dtype=np.float32)
+
+    def _row(self, symbol_id: int) -> int:
+        row = self._rows.get(symbol_id)
+        if row is None:
+            row = self._rows[symbol_id] = len(self._rows)
+            if row >= len(self._history):
+                grown = self._empty((2 * len(self._history), *self._history.shape[1:]))
+                grown[: len(self._history)] = self._history
+                self._history = grown
+                expected = self._empty((len(grown), len(self.edges)))
+                expected[: len(self._expected)] = self._expected
+                self._expected = expected
+        return row
+
+    def ensure(self, db: Session, today: date) -> None:
+        """Bring the ring up to the sessions before ``today``."""
+
+        with self._lock:
+            sessions = market_calendar.previous_sessions(today, self.days)
+            if self._through is not None:
+                sessions = [s for s in sessions if s.day > self._through]
+            if not sessions:
+                return
+            self._fold(db, sessions)
+            self._through = sessions[-1].day
+            self._recompute()
+
+    def _fold(self, db: Session, sessions: List[MarketSession]) -> None:
+        rows = db.execute(
+            select(RvolCandidate.symbol_id, RvolBatch.ingested_at, RvolCandidate.volume)
+            .join(RvolBatch, RvolBatch.id == RvolCandidate.batch_id)
+            .where(
+                RvolBatch.ingested_at >= datetime.fromtimestamp(sessions[0].open, MARKET_TZ),
+                RvolBatch.ingested_at < datetime.fromtimestamp(sessions[-1].close, MARKET_TZ),
+                RvolCandidate.volume.isnot(None),
+            )
+        ).all()
+        if rows:
+            symbol_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+            at = np.fromiter((r[1].timestamp() for r in rows), dtype=np.float64, count=len(rows))
+            volumes = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+        else:
+            symbol_ids = np.empty(0, dtype=np.int64)
+            at = volumes = np.empty(0, dtype=np.float64)
+        opens = np.array([s.open for s in sessions])
+        # which session each observation falls in
+        day_of = np.searchsorted(opens, at, side="right") - 1
+        for index, market_session in enumerate(sessions):
+            slot = self._cursor
+            self._cursor = (self._cursor + 1) % self.days
+            self._history[:, slot, :] = np.nan
+            mask = (day_of == index) & (at < market_session.close)
+            self._fill(slot, market_session, symbol_ids[mask], at[mask], volumes[mask])
+
+    def _fill(self, slot: int, market_session: MarketSession, symbol_ids, at, volumes) -> None:
+        if not len(symbol_ids):
+            return
+        minutes = (at - market_session.open) / 60.0
+        order = np.lexsort((minutes, symbol_ids))
+        symbol_ids, minutes, volumes = symbol_ids[order], minutes[order], volumes[order]
+        # one cumulative curve per symbol, linear between its observations
+        bounds = np.r_[np.flatnonzero(np.r_[True, symbol_ids[1:] != symbol_ids[:-1]]), len(symbol_ids)]
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            row = self._row(int(symbol_ids[start]))
+            self._history[row, slot, :] = np.interp(
+                self.edges, minutes[start:end], volumes[start:end], left=np.nan, right=np.nan
+            )
+
+    def _recompute(self) -> None:
+        used = len(self._rows)
+        history = self._history[:used]
+        enough = np.count_nonzero(~np.isnan(history), axis=1) >= self.min_days
+        expected = self._empty(self._expected.shape)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows: not enough days
+            expected[:used] = np.where(enough, np.nanmedian(history, axis=1), np.nan)
+        self._expected = expected
+
+    def rvol(self, symbol_ids: Iterable[int], volumes: Iterable[float], at: float) -> np.ndarray:
+        """RVOL per symbol at epoch ``at``; NaN where there is no profile yet.
+
+        Undefined (all NaN) outside the regular session and in its first bin,
+        where the expected volume is too small to divide by.
+        """
+
+        symbol_ids = list(symbol_ids)
+        volumes = np.asarray(list(volumes), dtype=np.float64)
+        out = np.full(len(symbol_ids), np.nan)
+        market_session = market_calendar.session(datetime.fromtimestamp(at, MARKET_TZ).date())
+        if market_session is None or not len(symbol_ids):
+            return out
+        minute = (at - market_session.open) / 60.0
+        position = minute / self.bin_minutes
+        if position < 1 or at >= market_session.close:
+            return out
+        index = min(int(position), len(self.edges) - 2)
+        frac = min(position - index, 1.0)
+        with self._lock:
+            rows = np.array([self._rows.get(symbol_id, -1) for symbol_id in symbol_ids])
+            expected = self._expected
+        known = rows >= 0
+        curve = expected[rows[known], index] * (1 - frac) + expected[rows[known], index + 1] * frac
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[known] = np.where(curve > 0, volumes[known] / curve, np.nan)
+        return out
+
+
+volume_profiles = VolumeProfiles()
@@ -0,0 +1,223 @@
+"""Lightweight spans for requests, poller cycles, quotes, filtering and sends.
+
+Spans follow the OpenTelemetry data model (trace/span ids, parent, start/end
+in unix nanoseconds, attributes, error status) without the SDK.  Finished
+spans are queued and written by a background thread, either as one OTLP/JSON
+span per line to ``TRACE_FILE`` or in OTLP/HTTP JSON batches to
+``TRACE_OTLP_ENDPOINT`` (e.g. a local collector on
+``http://localhost:4318/v1/traces``).
+
+Tracing is off unless ``TRACE_EXPORTER`` is ``file`` or ``otlp``.  Then
+``traced`` hands back the undecorated function and ``span`` returns a shared
+no-op, so the instrumented code paths cost nothing beyond that call.
+
+Incoming ``traceparent`` headers (W3C) are honoured, so a client such as
+``scripts/ingest_rvol.py`` can tie its request to the server-side spans.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, TypeVar
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "stockscreener"
+EXPORT_INTERVAL_SECONDS = 1.0
+EXPORT_BATCH = 512
+QUEUE_LIMIT = 10_000  # spans beyond this are dropped rather than blocking
+
+ENABLED = settings.TRACE_EXPORTER in ("file", "otlp")
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes", "error", "_token")
+
+    def __init__(self, name: str, attributes: dict, trace_id: str | None = None, parent_id: str | None = None):
+        parent = _current.get()
+        self.name = name
+        self.trace_id = trace_id or (parent.trace_id if parent else os.urandom(16).hex())
+        self.parent_id = parent_id or (parent.span_id if parent else None)
+        self.span_id = os.urandom(8).hex()
+        self.attributes = attributes
+        self.error: str | None = None
+        self.start = self.end = 0
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        self.start = time.time_ns()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end = time.time_ns()
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _exporter.submit(self)
+
+    def to_otlp(self) -> dict:
+        out = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+                if value is not None
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            out["parentSpanId"] = self.parent_id
+        return out
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Context manager timing the block as a child of the current span."""
+
+    if not ENABLED:
+        return NOOP_SPAN
+    return Span(name, attributes)
+
+
+def span_from_traceparent(header: str | None, name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Root span for an incoming request, continuing the caller's trace."""
+
+    if not ENABLED:
+        return NOOP_SPAN
+    parts = (header or "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return Span(name, attributes, trace_id=parts[1], parent_id=parts[2])
+    return Span(name, attributes)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of ``span``; a no-op when tracing is off."""
+
+    def decorate(func: F) -> F:
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class _Exporter:
+    def __init__(self) -> None:
+        self._queue: queue.Queue[Span] = queue.Queue(QUEUE_LIMIT)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, finished: Span) -> None:
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="trace-exporter", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _drain(self) -> list[Span]:
+        spans = []
+        while len(spans) < EXPORT_BATCH:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return spans
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(EXPORT_INTERVAL_SECONDS)
+            self.flush()
+
+    def flush(self) -> None:
+        while spans := self._drain():
+            try:
+                self._write([s.to_otlp() for s in spans])
+            except Exception:
+                logger.exception("exporting %d spans failed", len(spans))
+
+    def _write(self, spans: list[dict]) -> None:
+        if settings.TRACE_EXPORTER == "file":
+            with open(settings.TRACE_FILE, "a") as fh:
+                fh.writelines(json.dumps(s) + "\n" for s in spans)
+            return
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": _otlp_value(SERVICE_NAME)}
+                        ]
+                    },
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+        import httpx  # only needed by this exporter
+
+        httpx.post(settings.TRACE_OTLP_ENDPOINT, json=body, timeout=5).raise_for_status()
+
+
+_exporter = _Exporter()
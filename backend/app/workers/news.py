@@ -0,0 +1,49 @@
+import logging
+import time
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..db import WorkerSessionLocal
+from ..db_metrics import track_queries
+from ..models import CandidateFiltered, Position, PriceAlert, Symbol
+from ..services.filter import day_bounds_utc
+from ..services.news import news_cache
+from ..tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+def news_symbols(db: Session) -> dict[int, str]:
+    """symbol_id -> ticker for today's Top-N picks, active alerts and open positions."""
+
+    start_utc, _ = day_bounds_utc(None)
+    wanted = union(
+        select(CandidateFiltered.symbol_id).where(CandidateFiltered.last_seen_at >= start_utc),
+        select(PriceAlert.symbol_id).where(PriceAlert.active.is_(True)),
+        select(Position.symbol_id).where(Position.closed_at.is_(None)),
+    ).subquery()
+    rows = db.execute(select(Symbol.id, Symbol.ticker).where(Symbol.id.in_(select(wanted))))
+    return dict(rows.all())
+
+
+@traced("news.cycle")
+@track_queries("news cycle")
+def poll_news_once() -> int:
+    db: Session = WorkerSessionLocal()
+    try:
+        inserted = news_cache.refresh(db, news_symbols(db))
+        db.commit()
+        return inserted
+    finally:
+        db.close()
+
+
+def run_news_poller():
+    while True:
+        try:
+            poll_news_once()
+        except Exception:
+            logger.exception("news cycle failed")
+        time.sleep(settings.NEWS_POLL_SECONDS)
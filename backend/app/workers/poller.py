@@ -1,170 +1,335 @@
+import logging
 import time
-from datetime import datetime
+from datetime import timedelta
 
+from sqlalchemy import delete, func, insert
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import WorkerSessionLocal
+from ..db_metrics import track_queries
+from ..tracing import traced
 
-from ..models import PriceAlert, Position
-from app.services.finhub import get_quote
+from ..models import PriceQuote
+from app.services.finhub import get_quote, rate_budget
 from ..services.rates import TokenBucket
+from ..services.market_calendar import CLOSED, REGULAR, market_calendar
 from ..services.notify import notify_telegram
+from ..services.price_board import Quote, price_board
 from ..config import settings
+from .watchlist import TRAILING_KINDS, watchlist, write_position_prices
 
+# alert kinds that fire without an open position in the symbol
+STANDALONE_KINDS = {"price_cross", *TRAILING_KINDS}
 
-def should_trigger(
+REGULAR_CYCLE_SECONDS = 60
+# longest single sleep while the market is closed, so clock changes are noticed
+MAX_IDLE_SECONDS = 900
+PRUNE_EVERY_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
+
+def trailing_stop(kind: str, mark: float, threshold: float, short: bool) -> float:
+    """Stop level ``threshold`` percent/dollars behind the water mark."""
+
+    distance = mark * threshold / 100.0 if kind == "trailing_pct" else threshold
+    return mark + distance if short else mark - distance
+
+
+def trigger_level(
     kind: str,
     entry: float | None,
-    price: float,
     threshold: float | None,
     trailing: bool,
-) -> bool:
+    mark: float | None = None,
+    short: bool = False,
+) -> tuple[float, bool] | None:
+    """The price an alert fires at and whether it fires at/above it.
+
+    None when the alert can't fire yet (no threshold, entry or water mark).
+    """
+
+    if threshold is None:
+        return None
+    if kind in TRAILING_KINDS:
+        if mark is None:
+            return None
+        return trailing_stop(kind, mark, threshold, short), short
     if kind == "price_cross":
-        if threshold is None:
-            return False
-        if trailing:
-            return price <= threshold
-        return price >= threshold
+        return threshold, not trailing
+    if entry is None:
+        return None
     if kind == "target_pct":
-        if threshold is None:
-            return False
-        if entry is None:
-            return False
-        return ((price - entry) / entry) * 100.0 >= threshold
+        return entry * (1 + threshold / 100.0), True
     if kind == "target_abs":
-        if threshold is None:
-            return False
-        if entry is None:
-            return False
-        return (price - entry) >= threshold
+        return entry + threshold, True
     if kind == "stop":
-        if threshold is None:
-            return False
-        if entry is None:
-            return False
-        return price <= threshold
-    return False
+        return threshold, False
+    return None
 
 
-def run_price_poller():
-    bucket = TokenBucket(60)
-    while True:
-        db: Session = SessionLocal()
-        try:
-            # Build watchlist from active alerts + positions
-            alerts = db.query(PriceAlert).filter(PriceAlert.active.is_(True)).all()
-            positions = db.query(Position).all()
-            open_positions = [p for p in positions if p.closed_at is None]
-            positions_by_ticker = {p.ticker: p for p in open_positions}
-
-            tickers = sorted(
-                set([a.ticker for a in alerts] + [p.ticker for p in open_positions])
-            )[:60]
-
-            prices = {}
-            for t in tickers:
-                if bucket.take(1):
-                    try:
-                        q = get_quote(t)
-                        current = q.get("c")
-                        if current in (None, 0):
-                            current = q.get("pc")
-                        prices[t] = float(current) if current is not None else None
-                    except Exception:
-                        pass
-                else:
-                    time.sleep(0.5)  # wait for tokens
-
-            for position in open_positions:
-                px = prices.get(position.ticker)
-                if px is not None:
-                    position.current_price = px
-                    db.add(position)
-
-            # Evaluate alerts
-            for a in alerts:
-                px = prices.get(a.ticker)
-                if px is None:
-                    continue
-                kind_value = (
-                    a.kind.value if hasattr(a.kind, "value") else str(a.kind)
-                )
+def crossed(price: float, level: float, above: bool) -> bool:
+    return price >= level if above else price <= level
+
+
+def should_trigger(
+    kind: str,
+    entry: float | None,
+    price: float,
+    threshold: float | None,
+    trailing: bool,
+    mark: float | None = None,
+    short: bool = False,
+) -> bool:
+    level = trigger_level(kind, entry, threshold, trailing, mark, short)
+    return level is not None and crossed(price, *level)
+
+
+@traced("poller.cycle")
+@track_queries("price poller cycle")
+def poll_once(bucket: TokenBucket, changed_only: bool = False, sweep: bool = False) -> None:
+    """Quote the watchlist and fire alerts.
+
+    With ``changed_only`` only symbols whose alerts/positions just changed
+    are quoted, so new alerts are evaluated without waiting for the next
+    full cycle.  A ``sweep`` quotes the whole watchlist rather than the
+    first 60 symbols, waiting for rate budget instead of skipping symbols.
+    """
+
+    db: Session = WorkerSessionLocal()
+    try:
+        # Apply alert/position changes since the last cycle
+        touched = watchlist.refresh(db)
+        watched = watchlist.symbols()
+        if changed_only:
+            symbols = sorted(touched & watched.keys(), key=watched.get)
+            if not symbols:
+                return
+        elif sweep:
+            symbols = sorted(watched, key=watched.get)
+        else:
+            symbols = sorted(watched, key=watched.get)[:60]
 
-                position = positions_by_ticker.get(a.ticker)
-                if position is None and kind_value not in {"price_cross"}:
-                    continue
-
-                entry = None
-                if position is not None and position.entry_price is not None:
-                    entry = float(position.entry_price)
-                threshold = (
-                    float(a.threshold_value)
-                    if a.threshold_value is not None
-                    else None
+        prices = {}
+        quote_rows = []
+        for symbol_id in symbols:
+            t = watched[symbol_id]
+            if _take_token(bucket, wait=sweep):
+                try:
+                    q = get_quote(t)
+                    current = q.get("c")
+                    if current in (None, 0):
+                        current = q.get("pc")
+                    prices[symbol_id] = float(current) if current is not None else None
+                    if current:
+                        quote_rows.append(
+                            {
+                                "ticker": t,
+                                "symbol_id": symbol_id,
+                                "price": current,
+                                "day_high": q.get("h") or None,
+                                "day_low": q.get("l") or None,
+                            }
+                        )
+                except Exception:
+                    pass
+
+        # keep the price history for backtests
+        if quote_rows:
+            db.execute(insert(PriceQuote), quote_rows)
+            # and the latest quote for the API workers, no DB round trip
+            quoted_at = time.time()
+            price_board.publish(
+                Quote(
+                    row["ticker"],
+                    float(row["price"]),
+                    quoted_at,
+                    float(row["day_high"]) if row["day_high"] is not None else None,
+                    float(row["day_low"]) if row["day_low"] is not None else None,
                 )
-                if should_trigger(
-                    kind_value,
-                    entry,
-                    px,
-                    threshold,
-                    bool(a.trailing),
-                ):
-                    dedupe = f"alert-{a.id}-{time.strftime('%Y%m%d-%H%M')}"
-                    qty = (
-                        float(position.qty)
-                        if position is not None and position.qty is not None
-                        else None
-                    )
-                    side = (
-                        (position.side or "long").lower()
-                        if position is not None and position.side
-                        else "long"
+                for row in quote_rows
+            )
+
+        write_position_prices(
+            db,
+            {
+                position.id: prices[position.symbol_id]
+                for position in watchlist.positions.values()
+                if prices.get(position.symbol_id) is not None
+            },
+        )
+
+        # Evaluate armed alerts; fired ones sit out until re-armed
+        now = time.time()
+        for a in list(watchlist.alerts.values()):
+            px = prices.get(a.symbol_id)
+            if px is None:
+                continue
+            kind_value = a.kind
+
+            position = watchlist.positions_by_symbol.get(a.symbol_id)
+            if position is None and kind_value not in STANDALONE_KINDS:
+                continue
+
+            entry = position.entry if position is not None else None
+            threshold = a.threshold
+            short = position is not None and position.side == "short"
+            if kind_value in TRAILING_KINDS:
+                watchlist.track_price(a, px, short)
+            level = trigger_level(kind_value, entry, threshold, a.trailing, a.mark, short)
+            if level is not None and crossed(px, *level):
+                dedupe = f"alert-{a.id}-{time.strftime('%Y%m%d-%H%M')}"
+                qty = position.qty if position is not None else None
+                side = position.side if position is not None else "long"
+                pnl_abs = None
+                pnl_pct = None
+                if entry is not None and qty is not None:
+                    if side == "short":
+                        delta = entry - px
+                    else:
+                        delta = px - entry
+                    pnl_abs = delta * qty
+                    if entry != 0:
+                        pnl_pct = (delta / entry) * 100
+
+                lines = [f"*Alert Triggered* `{a.ticker}`"]
+                if entry is not None:
+                    lines.append(f"Entry: ${entry:.2f}")
+                lines.append(f"Current: ${px:.2f}")
+                if pnl_abs is not None and pnl_pct is not None:
+                    lines.append(
+                        f"PnL: ${pnl_abs:+.2f} ({pnl_pct:+.2f}%)"
                     )
-                    pnl_abs = None
-                    pnl_pct = None
-                    if entry is not None and qty is not None:
-                        if side == "short":
-                            delta = entry - px
-                        else:
-                            delta = px - entry
-                        pnl_abs = delta * qty
-                        if entry != 0:
-                            pnl_pct = (delta / entry) * 100
-
-                    lines = [f"*Alert Triggered* `{a.ticker}`"]
-                    if entry is not None:
-                        lines.append(f"Entry: ${entry:.2f}")
-                    lines.append(f"Current: ${px:.2f}")
-                    if pnl_abs is not None and pnl_pct is not None:
+                if threshold is not None:
+                    if kind_value == "price_cross":
+                        direction = (
+                            "≤" if a.trailing else "≥"
+                        )
                         lines.append(
-                            f"PnL: ${pnl_abs:+.2f} ({pnl_pct:+.2f}%)"
+                            f"Alert: price {direction} ${threshold:.2f}"
+                        )
+                    elif kind_value in TRAILING_KINDS:
+                        stop = trailing_stop(kind_value, a.mark, threshold, short)
+                        distance = (
+                            f"{threshold:g}%" if kind_value == "trailing_pct" else f"${threshold:.2f}"
+                        )
+                        lines.append(
+                            f"Alert: trailing stop ${stop:.2f}"
+                            f" ({distance} off {'low' if short else 'high'} ${a.mark:.2f})"
                         )
-                    if threshold is not None:
-                        if kind_value == "price_cross":
-                            direction = (
-                                "≤" if bool(a.trailing) else "≥"
-                            )
-                            lines.append(
-                                f"Alert: price {direction} ${threshold:.2f}"
-                            )
-                        else:
-                            lines.append(f"Alert: `{kind_value}` @ {threshold:.2f}")
                     else:
-                        lines.append(f"Alert: `{kind_value}`")
-                    msg = "\n".join(lines)
-                    notify_telegram(
-                        db,
-                        settings.TELEGRAM_CHAT_ID,
-                        settings.TELEGRAM_BOT_TOKEN,
-                        msg,
-                        dedupe,
-                        a.ticker,
-                        parse_mode="Markdown",
-                    )
-                    a.last_triggered_at = datetime.utcnow()
-                    db.add(a)
-            db.commit()
+                        lines.append(f"Alert: `{kind_value}` @ {threshold:.2f}")
+                else:
+                    lines.append(f"Alert: `{kind_value}`")
+                msg = "\n".join(lines)
+                notify_telegram(
+                    db,
+                    settings.TELEGRAM_CHAT_ID,
+                    settings.TELEGRAM_BOT_TOKEN,
+                    msg,
+                    dedupe,
+                    a.ticker,
+                    parse_mode="Markdown",
+                )
+                watchlist.fire(a, *level, now)
+
+        # Re-arm fired alerts past their cooldown once the price is back
+        # through the hysteresis band
+        for a in watchlist.rearm_due(now):
+            px = prices.get(a.symbol_id)
+            if px is not None and a.cleared(px):
+                watchlist.rearm(a)
+
+        watchlist.save_states(db)
+        watchlist.checkpoint_marks(db)
+        db.commit()
+
+    finally:
+        db.close()
+
+
+def _take_token(bucket: TokenBucket, wait: bool) -> bool:
+    """Pay for one quote; with ``wait`` block until the budget refills."""
+
+    while not bucket.take(1):
+        time.sleep(0.5)  # wait for tokens
+        if not wait:
+            return False
+    return True
+
+
+def cycle_seconds(phase: str) -> int | None:
+    """Seconds between full cycles in a market phase; None to stay asleep."""
+
+    if not settings.POLL_MARKET_HOURS or phase == REGULAR:
+        return REGULAR_CYCLE_SECONDS
+    if phase == CLOSED or settings.POLL_EXTENDED_CYCLE_SECONDS <= 0:
+        return None
+    return settings.POLL_EXTENDED_CYCLE_SECONDS
+
+
+@traced("poller.prune")
+@track_queries("price quote pruning")
+def prune_price_quotes(days: int | None = None) -> int:
+    """Delete quotes older than ``PRICE_QUOTES_RETENTION_DAYS``; returns how many."""
+
+    days = settings.PRICE_QUOTES_RETENTION_DAYS if days is None else days
+    if days <= 0:
+        return 0
+    db: Session = WorkerSessionLocal()
+    try:
+        result = db.execute(
+            delete(PriceQuote).where(PriceQuote.quoted_at < func.now() - timedelta(days=days))
+        )
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
+
+
+def run_price_poller():
+    """Poll at the full rate in regular hours, slower in pre/post-market.
+
+    Outside both the poller sleeps, so the rate budget is full again for the
+    warm-up sweep of the whole watchlist ``POLL_WARMUP_SECONDS`` before each
+    open.
+    """
+
+    bucket = rate_budget
+    warmed_for = None  # the open the last warm-up sweep was for
+    next_prune = time.monotonic()
+    while True:
+        if time.monotonic() >= next_prune:
+            next_prune = time.monotonic() + PRUNE_EVERY_SECONDS
+            try:
+                prune_price_quotes()
+            except Exception:
+                logger.exception("pruning price_quotes failed")
+        now = time.time()
+        phase, wake = REGULAR, None
+        swept = False
+        if settings.POLL_MARKET_HOURS:
+            phase = market_calendar.phase(now)
+            next_open = market_calendar.next_open(now)
+            warmup_at = next_open - settings.POLL_WARMUP_SECONDS
+            if settings.POLL_WARMUP_SECONDS > 0 and warmup_at <= now and warmed_for != next_open:
+                poll_once(bucket, sweep=True)
+                warmed_for = next_open
+                swept = True
+            wake = market_calendar.next_change(now)
+            if warmup_at > now:
+                wake = min(wake, warmup_at)
+        cycle = cycle_seconds(phase)
+        if cycle is None:
+            time.sleep(min(max(wake - time.time(), 0.0), MAX_IDLE_SECONDS))
+            continue
 
-        finally:
-            db.close()
-        time.sleep(60)
+        if not swept:  # a warm-up sweep just quoted everything and emptied the bucket
+            poll_once(bucket)
+        next_cycle = time.monotonic() + cycle
+        if wake is not None:
+            # switch pace right at the next phase change / warm-up
+            next_cycle = min(next_cycle, time.monotonic() + max(wake - time.time(), 0.0))
+        while (remaining := next_cycle - time.monotonic()) > 0:
+            if watchlist.wait_for_changes(remaining):
+                poll_once(bucket, changed_only=True)
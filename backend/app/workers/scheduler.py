@@ -1,23 +1,24 @@
-from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import WorkerSessionLocal
+from ..db_metrics import track_queries
+from ..tracing import traced
 from ..services.filter import filter_and_score
 from ..services.notify import notify_telegram
 from ..config import settings
 
-sched = BackgroundScheduler()
-
 
+@traced("on_new_batch")
+@track_queries("on_new_batch")
 def on_new_batch(batch_id):
-    db: Session = SessionLocal()
+    db: Session = WorkerSessionLocal()
     try:
         top = filter_and_score(db, batch_id)
         # Notify Top-N once (dedupe per batch/ticker)
         for cf in top:
-            reasons = cf.reasons_json or {}
-            price = reasons.get("price")
-            rvol = reasons.get("rvol")
-            msg = f"TOP PICK {cf.ticker}: Px {price} RVOL {rvol} Score {float(cf.score):.2f}"
+            msg = (
+                f"TOP PICK {cf.ticker}: Px {float(cf.price)} RVOL {float(cf.rvol):.2f} "
+                f"Score {float(cf.score):.2f}"
+            )
             dedupe = f"topN-{batch_id}-{cf.ticker}"
             notify_telegram(
                 db,
@@ -35,5 +36,7 @@ def on_new_batch(batch_id):
 
 
 def start_schedules():
-    # You can add other cron jobs here if needed
+    # You can add other cron jobs here if needed.  Import APScheduler's
+    # BackgroundScheduler inside this function, not at module level, so API
+    # workers don't pay for it at boot.
     pass
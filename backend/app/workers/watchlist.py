@@ -0,0 +1,474 @@
+"""Long-lived, compact watchlist state for the price poller.
+
+The poller only needs a handful of fields per active alert and open
+position, so they are kept as ``__slots__`` records across cycles instead of
+reloading every ``PriceAlert``/``Position`` as ORM objects each minute.
+
+Changed alert and position ids are queued and the next ``refresh``
+re-reads just those rows.  They come from the change feed
+(``services.changes``) for writes made anywhere, and from session events for
+ORM writes in this process, which also covers running without the feed.
+Queuing a change wakes the poller (``wait_for_changes``) so new alerts are
+armed right away.  A full reload happens on first use, whenever the change
+feed (re)connects and, while the feed is not live, every
+``WATCHLIST_RESYNC_SECONDS``.
+
+Trailing stops keep their water mark (the peak price for longs, the trough
+for shorts) on the alert record.  ``track_price`` moves it in O(1) on every
+quote, and ``checkpoint_marks`` writes the marks that moved back to
+``price_alerts`` in one statement every ``TRAILING_CHECKPOINT_SECONDS``.
+Reloads start from the stored mark, but a mark still waiting for its
+checkpoint is kept over the older stored one.
+
+Alerts are either armed (``alerts``, evaluated on every quote) or fired
+(``fired``).  ``fire`` moves an alert out of the hot set with a re-arm
+price on the far side of its trigger level and a cooldown.  Its symbol is
+not quoted for it again until the cooldown has passed.  ``rearm_due`` lists
+fired alerts past their cooldown; once the price clears the re-arm level,
+``rearm`` moves them back.  Both transitions are written by ``save_states``
+in one statement each.  Their change-feed echo leaves the records as they
+are, so it does not trigger a re-quote.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable
+
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    DateTime,
+    Numeric,
+    column,
+    event,
+    func,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models import AlertState, Position, PriceAlert
+from ..services.changes import change_feed
+
+
+TRAILING_KINDS = frozenset({"trailing_pct", "trailing_abs"})
+
+
+def _enum_value(value) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+class AlertRecord:
+    __slots__ = (
+        "id",
+        "symbol_id",
+        "ticker",
+        "kind",
+        "threshold",
+        "trailing",
+        "mark",
+        "state",
+        "rearm_price",
+        "rearm_above",
+        "rearm_after",
+        "cooldown",
+        "band",
+        "fired_at",
+    )
+
+    def __init__(
+        self,
+        id,
+        symbol_id,
+        ticker,
+        kind,
+        threshold,
+        trailing,
+        water_mark,
+        state,
+        rearm_price,
+        rearm_above,
+        rearm_after,
+        cooldown_seconds,
+        rearm_band_pct,
+    ):
+        self.id = id
+        self.symbol_id = symbol_id
+        self.ticker = ticker
+        self.kind = _enum_value(kind)
+        self.threshold = float(threshold) if threshold is not None else None
+        self.trailing = bool(trailing)
+        self.mark = float(water_mark) if water_mark is not None else None
+        self.state = _enum_value(state)
+        self.rearm_price = float(rearm_price) if rearm_price is not None else None
+        self.rearm_above = bool(rearm_above)
+        self.rearm_after = rearm_after.timestamp() if rearm_after is not None else 0.0
+        self.cooldown = (
+            settings.ALERT_COOLDOWN_SECONDS if cooldown_seconds is None else cooldown_seconds
+        )
+        self.band = (
+            settings.ALERT_REARM_BAND_PCT if rearm_band_pct is None else float(rearm_band_pct)
+        )
+        self.fired_at = 0.0
+
+    def config(self) -> tuple:
+        # what evaluation depends on; a reload that leaves it equal changes nothing
+        return (
+            self.symbol_id,
+            self.kind,
+            self.threshold,
+            self.trailing,
+            self.state,
+            self.cooldown,
+            self.band,
+        )
+
+    def cleared(self, price: float) -> bool:
+        """Whether ``price`` is back past the re-arm level."""
+
+        if self.rearm_price is None:
+            return True
+        return price >= self.rearm_price if self.rearm_above else price <= self.rearm_price
+
+
+class PositionRecord:
+    __slots__ = ("id", "symbol_id", "ticker", "side", "qty", "entry")
+
+    def __init__(self, id, symbol_id, ticker, side, qty, entry_price):
+        self.id = id
+        self.symbol_id = symbol_id
+        self.ticker = ticker
+        self.side = (side or "long").lower()
+        self.qty = float(qty) if qty is not None else None
+        self.entry = float(entry_price) if entry_price is not None else None
+
+
+ALERT_COLUMNS = (
+    PriceAlert.id,
+    PriceAlert.symbol_id,
+    PriceAlert.ticker,
+    PriceAlert.kind,
+    PriceAlert.threshold_value,
+    PriceAlert.trailing,
+    PriceAlert.water_mark,
+    PriceAlert.state,
+    PriceAlert.rearm_price,
+    PriceAlert.rearm_above,
+    PriceAlert.rearm_after,
+    PriceAlert.cooldown_seconds,
+    PriceAlert.rearm_band_pct,
+)
+POSITION_COLUMNS = (
+    Position.id,
+    Position.symbol_id,
+    Position.ticker,
+    Position.side,
+    Position.qty,
+    Position.entry_price,
+)
+
+
+class Watchlist:
+    def __init__(self) -> None:
+        self.alerts: Dict[int, AlertRecord] = {}  # armed
+        self.fired: Dict[int, AlertRecord] = {}
+        self.positions: Dict[int, PositionRecord] = {}
+        self.positions_by_symbol: Dict[int, PositionRecord] = {}
+        self._pending_alerts: set[int] = set()
+        self._pending_positions: set[int] = set()
+        self._moved_marks: set[int] = set()
+        self._fired_now: Dict[int, AlertRecord] = {}
+        self._rearmed_now: set[int] = set()
+        self._checkpointed_at = time.monotonic()
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+
+    def mark_changed(self, alert_ids: Iterable[int] = (), position_ids: Iterable[int] = ()) -> None:
+        with self._lock:
+            self._pending_alerts.update(alert_ids)
+            self._pending_positions.update(position_ids)
+        self._changed.set()
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+        self._changed.set()
+
+    def wait_for_changes(self, timeout: float) -> bool:
+        """Block until changes are queued or ``timeout`` seconds pass."""
+
+        changed = self._changed.wait(timeout)
+        self._changed.clear()
+        return changed
+
+    def symbols(self) -> Dict[int, str]:
+        """symbol_id -> ticker for everything that needs a price."""
+
+        watched = {a.symbol_id: a.ticker for a in self.alerts.values()}
+        watched.update((a.symbol_id, a.ticker) for a in self.rearm_due())
+        watched.update((p.symbol_id, p.ticker) for p in self.positions.values())
+        return watched
+
+    def fire(self, alert: AlertRecord, level: float, above: bool, now: float) -> None:
+        """Take a triggered alert out of the hot set.
+
+        ``level``/``above`` describe what fired it (price at/above or at/below
+        ``level``); it re-arms ``band`` percent back on the other side.
+        """
+
+        band = level * alert.band / 100.0
+        alert.state = "fired"
+        alert.rearm_price = level - band if above else level + band
+        alert.rearm_above = not above
+        alert.fired_at = now
+        alert.rearm_after = now + alert.cooldown
+        self.alerts.pop(alert.id, None)
+        self.fired[alert.id] = alert
+        self._fired_now[alert.id] = alert
+        self._rearmed_now.discard(alert.id)
+
+    def rearm_due(self, now: float | None = None) -> list[AlertRecord]:
+        """Fired alerts whose cooldown is over."""
+
+        now = time.time() if now is None else now
+        return [a for a in self.fired.values() if a.rearm_after <= now]
+
+    def rearm(self, alert: AlertRecord) -> None:
+        alert.state = "armed"
+        alert.rearm_price = None
+        alert.rearm_after = 0.0
+        alert.mark = None  # trailing stops start over from the next quote
+        self._moved_marks.discard(alert.id)
+        self.fired.pop(alert.id, None)
+        self.alerts[alert.id] = alert
+        self._rearmed_now.add(alert.id)
+        self._fired_now.pop(alert.id, None)
+
+    def save_states(self, db: Session) -> None:
+        """Write this cycle's fire/re-arm transitions; the caller commits."""
+
+        fired, self._fired_now = list(self._fired_now.values()), {}
+        rearmed, self._rearmed_now = self._rearmed_now, set()
+        if fired:
+            rows = values(
+                column("id", BigInteger),
+                column("at", DateTime(timezone=True)),
+                column("price", Numeric(12, 4)),
+                column("above", Boolean),
+                column("after", DateTime(timezone=True)),
+                name="v",
+            ).data(
+                [
+                    (
+                        a.id,
+                        datetime.fromtimestamp(a.fired_at, timezone.utc),
+                        a.rearm_price,
+                        a.rearm_above,
+                        datetime.fromtimestamp(a.rearm_after, timezone.utc),
+                    )
+                    for a in fired
+                ]
+            )
+            db.execute(
+                update(PriceAlert)
+                .where(PriceAlert.id == rows.c.id)
+                .values(
+                    state=AlertState.fired,
+                    last_triggered_at=rows.c.at,
+                    rearm_price=rows.c.price,
+                    rearm_above=rows.c.above,
+                    rearm_after=rows.c.after,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        if rearmed:
+            db.execute(
+                update(PriceAlert)
+                .where(PriceAlert.id.in_(rearmed))
+                .values(
+                    state=AlertState.armed,
+                    rearm_price=None,
+                    rearm_above=None,
+                    rearm_after=None,
+                    water_mark=None,
+                    water_mark_at=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    def track_price(self, alert: AlertRecord, price: float, short: bool) -> None:
+        """Move a trailing alert's peak (or trough, for shorts) to ``price``."""
+
+        mark = alert.mark
+        if mark is None or (price < mark if short else price > mark):
+            alert.mark = price
+            self._moved_marks.add(alert.id)
+
+    def checkpoint_marks(self, db: Session, force: bool = False) -> int:
+        """Write marks that moved since the last checkpoint; returns how many.
+
+        Only runs every ``TRAILING_CHECKPOINT_SECONDS`` unless ``force``.  The
+        caller commits.
+        """
+
+        now = time.monotonic()
+        if not self._moved_marks or (
+            not force and now - self._checkpointed_at < settings.TRAILING_CHECKPOINT_SECONDS
+        ):
+            return 0
+        marks = [
+            (alert_id, self.alerts[alert_id].mark)
+            for alert_id in self._moved_marks
+            if alert_id in self.alerts
+        ]
+        self._moved_marks = set()
+        self._checkpointed_at = now
+        if not marks:
+            return 0
+        rows = values(
+            column("id", BigInteger), column("mark", Numeric(12, 4)), name="v"
+        ).data(marks)
+        db.execute(
+            update(PriceAlert)
+            .where(PriceAlert.id == rows.c.id)
+            .values(water_mark=rows.c.mark, water_mark_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        return len(marks)
+
+    def refresh(self, db: Session) -> set[int]:
+        """Apply queued changes; returns the symbol ids of the records touched.
+
+        A full reload returns nothing: the regular cycle quotes everything.
+        """
+
+        resync_due = self._loaded_at is None or (
+            not change_feed.live
+            and time.monotonic() - self._loaded_at >= settings.WATCHLIST_RESYNC_SECONDS
+        )
+        with self._lock:
+            alert_ids, self._pending_alerts = self._pending_alerts, set()
+            position_ids, self._pending_positions = self._pending_positions, set()
+
+        if resync_due:
+            self._load_all(db)
+            return set()
+        touched: set[int] = set()
+        if alert_ids:
+            touched |= self._reload_alerts(db, alert_ids)
+        if position_ids:
+            touched |= self._reload_positions(db, position_ids)
+        return touched
+
+    def _load_all(self, db: Session) -> None:
+        alerts = db.execute(select(*ALERT_COLUMNS).where(PriceAlert.active.is_(True)))
+        positions = db.execute(select(*POSITION_COLUMNS).where(Position.closed_at.is_(None)))
+        previous = {**self.alerts, **self.fired}
+        self.alerts, self.fired = {}, {}
+        for row in alerts:
+            self._place(AlertRecord(*row))
+        self._keep_moved_marks(previous)
+        self.positions = {row[0]: PositionRecord(*row) for row in positions}
+        self._index_positions()
+        self._loaded_at = time.monotonic()
+
+    def _reload_alerts(self, db: Session, ids: set[int]) -> set[int]:
+        rows = db.execute(
+            select(*ALERT_COLUMNS).where(
+                PriceAlert.id.in_(ids), PriceAlert.active.is_(True)
+            )
+        )
+        previous = {}
+        for alert_id in ids:
+            old = self.alerts.pop(alert_id, None) or self.fired.pop(alert_id, None)
+            if old is not None:
+                previous[alert_id] = old
+        fresh = [AlertRecord(*row) for row in rows]
+        for a in fresh:
+            self._place(a)
+        self._keep_moved_marks(previous)
+        # echoes of our own writes (state transitions) need no fresh quote
+        return {
+            a.symbol_id
+            for a in fresh
+            if a.id not in previous or previous[a.id].config() != a.config()
+        }
+
+    def _place(self, alert: AlertRecord) -> None:
+        (self.fired if alert.state == "fired" else self.alerts)[alert.id] = alert
+
+    def _keep_moved_marks(self, previous: Dict[int, AlertRecord]) -> None:
+        # a mark not checkpointed yet is newer than the one just read
+        for alert_id in list(self._moved_marks):
+            old, new = previous.get(alert_id), self.alerts.get(alert_id)
+            if old is None or new is None or new.kind not in TRAILING_KINDS:
+                self._moved_marks.discard(alert_id)
+            elif old is not new:
+                new.mark = old.mark
+
+    def _reload_positions(self, db: Session, ids: set[int]) -> set[int]:
+        rows = db.execute(
+            select(*POSITION_COLUMNS).where(
+                Position.id.in_(ids), Position.closed_at.is_(None)
+            )
+        )
+        for position_id in ids:
+            self.positions.pop(position_id, None)
+        fresh = [PositionRecord(*row) for row in rows]
+        self.positions.update((p.id, p) for p in fresh)
+        self._index_positions()
+        return {p.symbol_id for p in fresh}
+
+    def _index_positions(self) -> None:
+        # like the old per-cycle dict: the last open position per symbol wins
+        self.positions_by_symbol = {
+            p.symbol_id: p for _, p in sorted(self.positions.items())
+        }
+
+
+def write_position_prices(db: Session, prices: Dict[int, float]) -> None:
+    """Store ``current_price`` for many positions in one UPDATE ... FROM (VALUES)."""
+
+    if not prices:
+        return
+    rows = values(
+        column("id", BigInteger), column("price", Numeric(12, 4)), name="v"
+    ).data(list(prices.items()))
+    db.execute(
+        update(Position)
+        .where(Position.id == rows.c.id)
+        .values(current_price=rows.c.price)
+        .execution_options(synchronize_session=False)
+    )
+
+
+watchlist = Watchlist()
+
+change_feed.subscribe("price_alerts", lambda op, id: watchlist.mark_changed(alert_ids=[id]))
+change_feed.subscribe("positions", lambda op, id: watchlist.mark_changed(position_ids=[id]))
+change_feed.on_reset(watchlist.invalidate)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_watchlist_changes(session, flush_context):
+    changed = session.info.setdefault("watchlist_changes", (set(), set()))
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, PriceAlert):
+            changed[0].add(obj.id)
+        elif isinstance(obj, Position):
+            changed[1].add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_watchlist_changes(session):
+    changed = session.info.pop("watchlist_changes", None)
+    if changed and (changed[0] or changed[1]):
+        watchlist.mark_changed(*changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_watchlist_changes(session):
+    session.info.pop("watchlist_changes", None)
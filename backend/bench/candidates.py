@@ -0,0 +1,94 @@
+"""Latest-per-ticker query benchmark for /api/candidates.
+
+Seeds a month of ``candidates_filtered`` history into a scratch schema and
+times the previous ``GROUP BY`` + self-join query against the
+``DISTINCT ON (ticker)`` statement used by ``list_candidates``, including
+keyset pages past the first ``limit`` rows.  Needs a reachable Postgres
+(``DATABASE_URL``).
+
+    python -m bench.candidates [--days 21] [--per-batch 20] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import func, select
+
+from app.api.candidates import SORT_KEYS, latest_candidates_stmt, session_bounds_utc
+from app.models import CandidateFiltered
+from bench.db import scratch_schema
+from bench.seed import seed_candidates, trading_days
+
+
+def legacy_stmt(open_utc, close_utc, limit):
+    sub = (
+        select(
+            CandidateFiltered.ticker.label("ticker"),
+            func.max(CandidateFiltered.last_seen_at).label("max_last"),
+        )
+        .where(
+            CandidateFiltered.last_seen_at >= open_utc,
+            CandidateFiltered.last_seen_at < close_utc,
+        )
+        .group_by(CandidateFiltered.ticker)
+        .subquery()
+    )
+    return (
+        select(CandidateFiltered)
+        .join(
+            sub,
+            (CandidateFiltered.ticker == sub.c.ticker)
+            & (CandidateFiltered.last_seen_at == sub.c.max_last),
+        )
+        .order_by(CandidateFiltered.last_seen_at.desc(), CandidateFiltered.score.desc())
+        .limit(limit)
+    )
+
+
+def _median_ms(conn, stmt, repeat: int) -> tuple[float, list]:
+    samples = []
+    rows = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(stmt).all()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e3, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=21)
+    parser.add_argument("--per-batch", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with scratch_schema() as conn:
+        seeded = seed_candidates(conn, days=args.days, per_batch=args.per_batch)
+        conn.exec_driver_sql("ANALYZE")
+        print(f"seeded {seeded} candidates_filtered rows over {args.days} sessions")
+
+        day = trading_days(args.days)[-1].isoformat()
+        open_utc, close_utc = session_bounds_utc(day)
+
+        legacy_ms, legacy_rows = _median_ms(
+            conn, legacy_stmt(open_utc, close_utc, args.limit), args.repeat
+        )
+        print(f"{'legacy group-by':<28}{legacy_ms:>10.2f} ms  rows={len(legacy_rows)}")
+
+        for sort in SORT_KEYS:
+            after = None
+            for page in range(args.pages):
+                stmt = latest_candidates_stmt(open_utc, close_utc, sort, args.limit, after)
+                ms, rows = _median_ms(conn, stmt, args.repeat)
+                print(f"{f'distinct-on {sort} p{page + 1}':<28}{ms:>10.2f} ms  rows={len(rows)}")
+                if len(rows) < args.limit:
+                    break
+                last = rows[-1]._mapping
+                after = tuple(last[name] for name in SORT_KEYS[sort])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Throwaway Postgres schemas for benchmarks.
+
+Every run creates its own schema, builds the app tables inside it and drops
+it afterwards, so benchmarks can run against the development database
+without touching real data.
+"""
+
+from contextlib import contextmanager
+from typing import Iterator
+from uuid import uuid4
+
+from sqlalchemy import Connection, create_engine, event, text
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.db import Base
+import app.models  # noqa: F401  (registers the tables on Base.metadata)
+
+
+@contextmanager
+def scratch_schema(url: str | None = None, keep: bool = False) -> Iterator[Connection]:
+    """Yield a connection whose ``search_path`` points at a fresh schema.
+
+    The schema name is available as ``conn.info["schema"]``.
+    """
+
+    # NullPool: the connection carries a custom search_path and must never be
+    # handed back to a shared pool.
+    engine = create_engine(url or settings.DATABASE_URL, poolclass=NullPool)
+    schema = f"bench_{uuid4().hex[:8]}"
+    with engine.connect() as conn:
+        conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+        conn.execute(text(f'SET search_path TO "{schema}"'))
+        conn.info["schema"] = schema
+        Base.metadata.create_all(conn)
+        conn.commit()
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            if not keep:
+                conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+                conn.commit()
+    engine.dispose()
+
+
+def route_app_engines(schema: str) -> None:
+    """Point the app's own engines (API, async API, worker) at ``schema``.
+
+    Pools are replaced, so connections opened earlier (``create_all`` at
+    app import) are not reused; every new connection gets the
+    ``search_path`` set at connect time.
+    """
+
+    from app.db import async_engine, engine, worker_engine
+
+    def set_search_path(dbapi_connection, connection_record) -> None:
+        autocommit = dbapi_connection.autocommit
+        dbapi_connection.autocommit = True  # survive the pool's reset-on-return
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'SET SESSION search_path TO "{schema}"')
+        cursor.close()
+        dbapi_connection.autocommit = autocommit
+
+    for target in (engine, async_engine.sync_engine, worker_engine):
+        event.listen(target, "connect", set_search_path)
+        target.dispose(close=False)
@@ -0,0 +1,139 @@
+"""Local stand-ins for the Finnhub (quotes, company news) and Telegram HTTP APIs.
+
+Both fakes share one threaded HTTP server.  Every request sleeps for
+``latency_ms`` (plus up to ``jitter_ms``) and fails with a 500 at
+``error_rate``, so benchmarks can see how slow or flaky upstreams affect the
+poller and batch notifications.  Point the app at it with
+``settings.FINNHUB_BASE_URL = f"{base}/api/v1"`` and
+``settings.TELEGRAM_API_URL = base``.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeUpstreams(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        news_per_symbol: int = 3,
+    ):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.news_per_symbol = news_per_symbol
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.requests[key] += 1
+
+    def _delay_and_fail(self) -> bool:
+        with self._lock:
+            delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+            failed = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1e3)
+        return failed
+
+    def quote(self, symbol: str) -> dict:
+        # stable per symbol, moving a little between calls
+        base = 5 + (sum(map(ord, symbol)) % 150) / 10
+        with self._lock:
+            price = round(base * (1 + self._rng.uniform(-0.03, 0.03)), 4)
+        return {
+            "c": price,
+            "h": round(price * 1.02, 4),
+            "l": round(price * 0.98, 4),
+            "o": base,
+            "pc": base,
+            "t": int(time.time()),
+        }
+
+    def company_news(self, symbol: str) -> list[dict]:
+        # the same headlines on every call within an hour, so refetches dedupe
+        hour = int(time.time()) // 3600 * 3600
+        return [
+            {
+                "category": "company",
+                "datetime": hour - i * 600,
+                "headline": f"{symbol} headline {hour - i * 600}",
+                "id": hour - i * 600,
+                "related": symbol,
+                "source": "fake",
+                "summary": "",
+                "url": f"https://news.invalid/{symbol}/{hour - i * 600}",
+            }
+            for i in range(self.news_per_symbol)
+        ]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeUpstreams
+
+    def log_message(self, format, *args) -> None:  # keep benchmark output clean
+        pass
+
+    def _reply(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path not in ("/api/v1/quote", "/api/v1/company-news"):
+            return self._reply(404, {"error": "not found"})
+        self.server.count("finnhub")
+        if self.server._delay_and_fail():
+            self.server.count("finnhub_errors")
+            return self._reply(500, {"error": "injected failure"})
+        symbol = parse_qs(url.query).get("symbol", [""])[0]
+        if url.path == "/api/v1/company-news":
+            self.server.count("finnhub_news")
+            return self._reply(200, self.server.company_news(symbol))
+        self._reply(200, self.server.quote(symbol))
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if not self.path.endswith("/sendMessage"):
+            return self._reply(404, {"ok": False})
+        self.server.count("telegram")
+        if self.server._delay_and_fail():
+            self.server.count("telegram_errors")
+            return self._reply(500, {"ok": False, "description": "injected failure"})
+        self._reply(200, {"ok": True, "result": {"message_id": 1}})
+
+
+@contextmanager
+def fake_upstreams(**options) -> Iterator[FakeUpstreams]:
+    server = FakeUpstreams(**options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
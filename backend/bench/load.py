@@ -0,0 +1,121 @@
+"""HTTP load test for the dashboard read endpoints.
+
+Drives a running API with a fixed number of concurrent clients and reports
+requests/sec and latency percentiles per endpoint.  To compare the async
+endpoints with the previous thread-pool versions, start one server per build
+and pass both base URLs:
+
+    python -m bench.load --base-url http://localhost:8000 \\
+        --compare http://localhost:8001 --concurrency 64 --duration 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/api/positions?status=all",
+    "/api/alerts",
+    "/api/candidates",
+    "/api/portfolio/summary",
+    "/api/rvol/active-batches?limit=10",
+]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    path: str,
+    deadline: float,
+    latencies: list[float],
+    errors: list[int],
+) -> None:
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        if ok:
+            latencies.append(time.perf_counter() - start)
+        else:
+            errors.append(1)
+
+
+async def run_endpoint(
+    base_url: str, path: str, concurrency: int, duration: float
+) -> dict:
+    latencies: list[float] = []
+    errors: list[int] = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        await client.get(path)  # warm up connections and caches
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *[
+                _worker(client, path, deadline, latencies, errors)
+                for _ in range(concurrency)
+            ]
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1e3 if latencies else float("nan"),
+        "p99_ms": percentile(latencies, 99) * 1e3,
+    }
+
+
+async def run(base_url: str, paths: list[str], concurrency: int, duration: float) -> list[dict]:
+    return [await run_endpoint(base_url, p, concurrency, duration) for p in paths]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--compare", help="second base URL to run the same load against")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    paths = args.paths or DEFAULT_PATHS
+    targets = [args.base_url] + ([args.compare] if args.compare else [])
+    results = {
+        url: asyncio.run(run(url, paths, args.concurrency, args.duration))
+        for url in targets
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for url, rows in results.items():
+        print(f"\n{url}  (concurrency={args.concurrency}, {args.duration:.0f}s per endpoint)")
+        print(f"{'path':<36}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for r in rows:
+            print(
+                f"{r['path']:<36}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}"
+                f"{r['p99_ms']:>10.2f}{r['errors']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Synthetic data generators for benchmarks."""
+
+import random
+from datetime import date, datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import Connection, insert, select
+from zoneinfo import ZoneInfo
+
+from app.models import AlertKind, CandidateFiltered, Position, PriceAlert, RvolBatch, Symbol
+from app.services.filter import rule_snapshot
+
+MARKET_TZ = ZoneInfo("America/New_York")
+BATCH_INTERVAL = timedelta(minutes=5)
+BATCHES_PER_SESSION = 78  # 09:30-16:00 every 5 minutes
+SEED_RULES = {
+    "regime": "hot",
+    "price_range": [5.0, 20.0],
+    "min_rvol": 5.0,
+    "min_pct_change": 0.0,
+    "volume_cap": 20_000_000,
+}
+
+
+def tickers(n: int) -> list[str]:
+    return [f"T{i:04d}" for i in range(n)]
+
+
+def seed_symbols(conn: Connection, symbols: list[str]) -> dict[str, int]:
+    conn.execute(insert(Symbol), [{"ticker": t} for t in symbols])
+    return dict(conn.execute(select(Symbol.ticker, Symbol.id)).all())
+
+
+def trading_days(days: int, end: date | None = None) -> list[date]:
+    """The last ``days`` weekdays up to and including ``end``."""
+
+    current = end or datetime.now(MARKET_TZ).date()
+    out: list[date] = []
+    while len(out) < days:
+        if current.weekday() < 5:
+            out.append(current)
+        current -= timedelta(days=1)
+    return sorted(out)
+
+
+def batch_times(day: date, batches: int = BATCHES_PER_SESSION) -> list[datetime]:
+    open_local = datetime(day.year, day.month, day.day, 9, 30, tzinfo=MARKET_TZ)
+    return [open_local + i * BATCH_INTERVAL for i in range(batches)]
+
+
+def seed_candidates(
+    conn: Connection,
+    days: int = 21,
+    per_batch: int = 20,
+    universe: int = 2000,
+    seed: int = 0,
+) -> int:
+    """Insert one month of ``rvol_batches`` + ``candidates_filtered`` rows.
+
+    Every batch writes ``per_batch`` fresh rows, i.e. the history before any
+    per-day dedupe, which is the worst case for the latest-per-ticker query.
+    """
+
+    rng = random.Random(seed)
+    symbols = tickers(universe)
+    symbol_ids = seed_symbols(conn, symbols)
+    _, snapshot_id = rule_snapshot(conn, SEED_RULES)
+    total = 0
+    for day in trading_days(days):
+        batches = []
+        rows = []
+        for ts in batch_times(day):
+            batch_id = uuid4()
+            batches.append({"id": batch_id, "ingested_at": ts, "rule_snapshot_id": snapshot_id})
+            for ticker in rng.sample(symbols, per_batch):
+                rvol = round(rng.uniform(5, 60), 2)
+                rows.append(
+                    {
+                        "batch_id": batch_id,
+                        "ticker": ticker,
+                        "symbol_id": symbol_ids[ticker],
+                        "score": rvol,
+                        "price": round(rng.uniform(5, 20), 4),
+                        "rvol": rvol,
+                        "pct_change": round(rng.uniform(0, 40), 3),
+                        "volume": rng.randint(10**5, 2 * 10**7),
+                        "rule_snapshot_id": snapshot_id,
+                        "first_seen_at": ts,
+                        "last_seen_at": ts,
+                        "notified_topn": False,
+                    }
+                )
+        conn.execute(insert(RvolBatch), batches)
+        conn.execute(insert(CandidateFiltered), rows)
+        total += len(rows)
+    conn.commit()
+    return total
+
+
+def rvol_items(rng: random.Random, symbols: list[str], rows: int) -> list[dict]:
+    """One screener batch in the ``/internal/ingest-rvol-batch`` item format."""
+
+    return [
+        {
+            "ticker": ticker,
+            "name": f"{ticker} Inc",
+            "rvol": round(rng.uniform(1, 60), 2),
+            "price": round(rng.uniform(1, 40), 4),
+            "pct_change": round(rng.uniform(-20, 60), 3),
+            "volume": rng.randint(10**5, 4 * 10**7),
+            "market_cap": rng.randint(10**7, 10**10),
+            "sector": rng.choice(["Technology", "Healthcare", "Energy", "Financial"]),
+            "analyst_rating": rng.choice(["Buy", "Hold", "Sell", None]),
+        }
+        for ticker in rng.sample(symbols, rows)
+    ]
+
+
+def seed_portfolio(
+    conn: Connection,
+    symbol_ids: dict[str, int],
+    positions: int = 50,
+    alerts: int = 200,
+    seed: int = 0,
+) -> None:
+    """Open positions and active alerts spread over ``symbol_ids``.
+
+    Alerts reference position tickers where possible so the poller evaluates
+    both target/stop and plain price-cross alerts.
+    """
+
+    rng = random.Random(seed)
+    held = rng.sample(sorted(symbol_ids), min(positions, len(symbol_ids)))
+    entries = {ticker: round(rng.uniform(5, 20), 4) for ticker in held}
+    conn.execute(
+        insert(Position),
+        [
+            {
+                "ticker": ticker,
+                "symbol_id": symbol_ids[ticker],
+                "side": rng.choice(["long", "long", "short"]),
+                "qty": rng.randint(10, 1000),
+                "entry_price": entries[ticker],
+            }
+            for ticker in held
+        ],
+    )
+    rows = []
+    for _ in range(alerts):
+        kind = rng.choice(list(AlertKind))
+        if kind == AlertKind.price_cross:
+            ticker = rng.choice(sorted(symbol_ids))
+            threshold = round(rng.uniform(5, 20), 4)
+        else:
+            ticker = rng.choice(held)
+            threshold = {
+                AlertKind.target_pct: rng.uniform(1, 20),
+                AlertKind.target_abs: entries[ticker] * rng.uniform(0.01, 0.3),
+                AlertKind.stop: entries[ticker] * rng.uniform(0.7, 0.99),
+                # the water mark starts at the first quote the poller sees
+                AlertKind.trailing_pct: rng.uniform(1, 10),
+                AlertKind.trailing_abs: entries[ticker] * rng.uniform(0.01, 0.1),
+            }[kind]
+        rows.append(
+            {
+                "ticker": ticker,
+                "symbol_id": symbol_ids[ticker],
+                "kind": kind,
+                "threshold_value": round(threshold, 4),
+                "trailing": kind == AlertKind.price_cross and rng.random() < 0.5,
+                "active": True,
+            }
+        )
+    conn.execute(insert(PriceAlert), rows)
+    conn.commit()
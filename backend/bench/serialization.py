@@ -0,0 +1,291 @@
+"""Serialization microbenchmarks for the list endpoints.
+
+Compares the previous response path (Pydantic models built by hand, then
+FastAPI's default ``json.dumps`` rendering) with the current one (plain dicts
+read from SQLAlchemy rows, rendered by ``ORJSONResponse``).  No database is
+needed: rows are synthesized with the same columns the endpoints select.
+
+    python -m bench.serialization [--sizes 10 1000 10000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+from sqlalchemy.engine.result import result_tuple
+
+from app.api.positions import position_payload
+from app.schemas import (
+    ActiveRvolBatch,
+    ActiveRvolCandidate,
+    AlertOut,
+    CandidateDTO,
+    PortfolioSummary,
+    PositionOut,
+)
+from app.serialization import ORJSONResponse, rows_to_dicts
+
+NOW = datetime.now(timezone.utc)
+TICKERS = [f"T{i:04d}" for i in range(500)]
+
+
+def _legacy_render(adapter: TypeAdapter, models: Any) -> bytes:
+    # What FastAPI does for a response_model: serialize via Pydantic, then
+    # JSONResponse.render with the stdlib encoder.
+    content = adapter.dump_python(models, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _fast_render(content: Any) -> bytes:
+    return ORJSONResponse(content).body
+
+
+# --- positions -------------------------------------------------------------
+
+POSITION_FIELDS = [
+    "id", "created_at", "ticker", "side", "qty", "entry_price",
+    "current_price", "exit_price", "notes", "closed_at",
+]
+
+
+def _position_values(i: int, rng: random.Random) -> tuple:
+    entry = round(rng.uniform(5, 20), 4)
+    closed = i % 3 == 0
+    return (
+        i,
+        NOW - timedelta(minutes=i),
+        rng.choice(TICKERS),
+        "short" if i % 5 == 0 else "long",
+        float(rng.randint(1, 500)),
+        entry,
+        round(entry * rng.uniform(0.9, 1.1), 4),
+        round(entry * 1.05, 4) if closed else None,
+        None,
+        NOW if closed else None,
+    )
+
+
+def bench_positions(n: int, rng: random.Random):
+    values = [_position_values(i, rng) for i in range(n)]
+    Row = result_tuple(POSITION_FIELDS)
+    rows = [Row(v) for v in values]
+    # ORM rows hand back Numeric columns as Decimal
+    legacy_rows = [
+        Row(tuple(Decimal(str(x)) if isinstance(x, float) else x for x in v))
+        for v in values
+    ]
+    adapter = TypeAdapter(list[PositionOut])
+
+    def legacy():
+        models = [PositionOut(**position_payload(r)) for r in legacy_rows]
+        return _legacy_render(adapter, models)
+
+    def fast():
+        return _fast_render([position_payload(r) for r in rows])
+
+    return legacy, fast
+
+
+# --- alerts ----------------------------------------------------------------
+
+ALERT_FIELDS = [
+    "id", "ticker", "kind", "threshold_value", "trailing", "active",
+    "created_at", "last_triggered_at",
+]
+
+
+def bench_alerts(n: int, rng: random.Random):
+    values = [
+        (
+            i,
+            rng.choice(TICKERS),
+            rng.choice(["target_pct", "target_abs", "stop", "price_cross"]),
+            round(rng.uniform(1, 30), 4),
+            bool(i % 2),
+            True,
+            NOW - timedelta(minutes=i),
+            None,
+        )
+        for i in range(n)
+    ]
+    Row = result_tuple(ALERT_FIELDS)
+    rows = [Row(v) for v in values]
+    legacy_rows = [Row(v[:3] + (Decimal(str(v[3])),) + v[4:]) for v in values]
+    adapter = TypeAdapter(list[AlertOut])
+
+    def legacy():
+        models = [
+            AlertOut(
+                id=r.id,
+                ticker=r.ticker,
+                kind=r.kind,
+                threshold_value=float(r.threshold_value),
+                trailing=r.trailing,
+                active=r.active,
+                created_at=r.created_at,
+                last_triggered_at=r.last_triggered_at,
+            )
+            for r in legacy_rows
+        ]
+        return _legacy_render(adapter, models)
+
+    def fast():
+        return _fast_render(rows_to_dicts(rows))
+
+    return legacy, fast
+
+
+# --- candidates ------------------------------------------------------------
+
+def _rules() -> dict:
+    return {"price_range": [5.0, 20.0], "min_rvol": 5.0, "min_pct_change": 0.0,
+            "volume_cap": 20000000}
+
+
+def bench_candidates(n: int, rng: random.Random):
+    values = [
+        (rng.choice(TICKERS), round(rng.uniform(5, 20), 4),
+         round(rng.uniform(5, 50), 2), round(rng.uniform(5, 50), 6), _rules())
+        for _ in range(n)
+    ]
+    rows = [result_tuple(["ticker", "price", "rvol", "score", "reasons"])(v) for v in values]
+    legacy_rows = [
+        (t, Decimal(str(score)), {"price": price, "rvol": rvol, "rules": rules})
+        for t, price, rvol, score, rules in values
+    ]
+    adapter = TypeAdapter(list[CandidateDTO])
+
+    def legacy():
+        models = [
+            CandidateDTO(
+                ticker=t,
+                price=rs.get("price", 0.0),
+                rvol=rs.get("rvol", 0.0),
+                score=float(score),
+                reasons=rs.get("rules", {}),
+            )
+            for t, score, rs in legacy_rows
+        ]
+        return _legacy_render(adapter, models)
+
+    def fast():
+        return _fast_render(rows_to_dicts(rows))
+
+    return legacy, fast
+
+
+# --- portfolio summary -------------------------------------------------------
+
+def bench_portfolio(n: int, rng: random.Random):
+    points = [
+        dict(
+            timestamp=NOW - timedelta(minutes=i),
+            label=f"Closed {rng.choice(TICKERS)}",
+            realized=rng.uniform(-100, 100),
+            unrealized=0.0,
+            equity=rng.uniform(900, 1100),
+        )
+        for i in range(n)
+    ]
+    summary = dict(
+        starting_capital=1000.0,
+        current_capital=1010.0,
+        realized_pnl=10.0,
+        unrealized_pnl=0.0,
+        equity_series=points,
+    )
+    adapter = TypeAdapter(PortfolioSummary)
+
+    def legacy():
+        return _legacy_render(adapter, PortfolioSummary(**summary))
+
+    def fast():
+        return _fast_render(summary)
+
+    return legacy, fast
+
+
+# --- active batches ----------------------------------------------------------
+
+def bench_active_batches(n: int, rng: random.Random):
+    # n candidates spread over 10 batches, as polled by the dashboard
+    batches = []
+    for b in range(10):
+        items = [
+            dict(ticker=rng.choice(TICKERS), name="Example Corp",
+                 rvol=round(rng.uniform(1, 50), 2), price=round(rng.uniform(1, 50), 4),
+                 pct_change=round(rng.uniform(-10, 10), 3), volume=rng.randint(1, 10**8),
+                 market_cap=rng.randint(10**6, 10**10), sector="Technology",
+                 analyst_rating="Buy")
+            for _ in range(max(n // 10, 1))
+        ]
+        batches.append(dict(batch_id=uuid4(), ingested_at=NOW - timedelta(minutes=5 * b),
+                            items=items))
+    # Postgres hands each batch back as a finished JSON document
+    docs = [json.dumps(b, default=str) for b in batches]
+    adapter = TypeAdapter(list[ActiveRvolBatch])
+
+    def legacy():
+        models = [
+            ActiveRvolBatch(
+                batch_id=b["batch_id"],
+                ingested_at=b["ingested_at"],
+                items=[ActiveRvolCandidate(**it) for it in b["items"]],
+            )
+            for b in batches
+        ]
+        return _legacy_render(adapter, models)
+
+    def fast():
+        return ("[" + ",".join(docs) + "]").encode()
+
+    return legacy, fast
+
+
+BENCHMARKS: dict[str, Callable] = {
+    "positions": bench_positions,
+    "alerts": bench_alerts,
+    "candidates": bench_candidates,
+    "portfolio_summary": bench_portfolio,
+    "active_batches": bench_active_batches,
+}
+
+
+def _best_of(fn: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'endpoint':<20}{'rows':>8}{'legacy ms':>12}{'fast ms':>12}{'speedup':>10}")
+    for name, factory in BENCHMARKS.items():
+        for n in args.sizes:
+            legacy, fast = factory(n, rng)
+            legacy_s = _best_of(legacy, args.repeat)
+            fast_s = _best_of(fast, args.repeat)
+            print(
+                f"{name:<20}{n:>8}{legacy_s * 1e3:>12.3f}{fast_s * 1e3:>12.3f}"
+                f"{legacy_s / fast_s:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""API cold-start benchmark: import time and boot-to-ready.
+
+* ``import``: wall time of ``python -c "import app.main"`` in a fresh
+  interpreter, plus the slowest modules by cumulative time from
+  ``-X importtime`` (first run);
+* ``ready``: time from spawning ``uvicorn app.main:app`` until
+  ``/openapi.json`` answers, i.e. what a container health check waits for.
+
+    python -m bench.startup --runs 5 --out startup.json
+
+Nothing is written to the database; startup connects as usual (poller and
+change feed included) unless ``ENABLE_POLLER``/``CHANGE_FEED`` say otherwise.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(top: int) -> tuple[float, list[dict]]:
+    """One ``-X importtime`` run; returns (wall seconds, slowest modules)."""
+
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed = time.perf_counter() - start
+    modules = []
+    for line in out.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1e3})
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return elapsed, modules[:top]
+
+
+def import_seconds() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "import app.main"], cwd=BACKEND_DIR, check=True
+    )
+    return time.perf_counter() - start
+
+
+def ready_seconds(timeout: float) -> float:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {proc.returncode}")
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/openapi.json", timeout=1).raise_for_status()
+                return time.perf_counter() - start
+            except httpx.HTTPError:
+                time.sleep(0.01)
+        raise RuntimeError(f"not ready after {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summary(samples: list[float]) -> dict:
+    return {
+        "runs": len(samples),
+        "min_ms": min(samples) * 1e3,
+        "median_ms": statistics.median(samples) * 1e3,
+        "max_ms": max(samples) * 1e3,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for ready")
+    parser.add_argument("--skip-ready", action="store_true", help="only measure the import")
+    parser.add_argument("--out", help="write JSON here")
+    args = parser.parse_args()
+
+    first, modules = import_profile(args.top)
+    results = {
+        "import": summary([first] + [import_seconds() for _ in range(args.runs - 1)]),
+        "slowest_imports": modules,
+    }
+    if not args.skip_ready:
+        results["ready"] = summary([ready_seconds(args.timeout) for _ in range(args.runs)])
+
+    for section in ("import", "ready"):
+        if section in results:
+            row = results[section]
+            print(f"{section:<7} median {row['median_ms']:7.1f} ms  (min {row['min_ms']:.1f}, max {row['max_ms']:.1f})")
+    for row in modules:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
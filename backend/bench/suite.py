@@ -0,0 +1,321 @@
+"""End-to-end backend benchmark with fake upstreams and JSON output.
+
+Seeds a scratch schema with candidate history, symbols, positions and
+alerts, points Finnhub and Telegram at local fakes (``bench.fakes``) and
+measures:
+
+* ``ingest``: ``POST /internal/ingest-rvol-batch`` throughput, including
+  the synchronous filtering and Top-N notifications;
+* ``filter_and_score``: latency per stored batch;
+* ``poller``: ``poll_once`` cycle time (first cycle loads the watchlist);
+* ``endpoints``: p50/p99 and req/s for every ``GET /api/*`` route, served by
+  uvicorn in-process and driven like ``bench.load``.
+
+Results go to ``--out`` (or stdout) as JSON.  Pass an earlier result as
+``--baseline`` to list metrics that got worse by more than ``--tolerance``;
+the exit status is 1 if any did, so CI can compare two commits:
+
+    python -m bench.suite --out before.json
+    python -m bench.suite --baseline before.json --out after.json
+
+Needs a reachable Postgres (``DATABASE_URL``); nothing outside the scratch
+schema is touched.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import uvicorn
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+
+from app import main as app_main
+from app.config import settings
+from app.db import WorkerSessionLocal
+from app.models import RvolBatch, RvolCandidate, Symbol
+from app.services.filter import filter_and_score
+from app.services.rates import TokenBucket
+from app.workers.poller import poll_once
+from bench.db import route_app_engines, scratch_schema
+from bench.fakes import fake_upstreams
+from bench.load import DEFAULT_PATHS, percentile, run_endpoint
+from bench.seed import rvol_items, seed_candidates, seed_portfolio
+
+
+def latency_summary(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "mean_ms": statistics.fmean(samples) * 1e3 if samples else float("nan"),
+        "p50_ms": statistics.median(samples) * 1e3 if samples else float("nan"),
+        "p99_ms": percentile(samples, 99) * 1e3,
+        "max_ms": max(samples) * 1e3 if samples else float("nan"),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def bench_ingest(client: TestClient, symbols: list[str], batches: int, rows: int, rng) -> dict:
+    samples = []
+    for _ in range(batches):
+        payload = {"batch_id": str(uuid4()), "items": rvol_items(rng, symbols, rows)}
+        start = time.perf_counter()
+        resp = client.post("/internal/ingest-rvol-batch", json=payload)
+        samples.append(time.perf_counter() - start)
+        resp.raise_for_status()
+    elapsed = sum(samples)
+    return {
+        "batches": batches,
+        "rows_per_batch": rows,
+        "batches_per_s": batches / elapsed,
+        "rows_per_s": batches * rows / elapsed,
+        **latency_summary(samples),
+    }
+
+
+def bench_filter(conn, symbol_ids: dict[str, int], batches: int, rows: int, rng) -> dict:
+    """Time ``filter_and_score`` on batches stored without filtering."""
+
+    samples = []
+    symbols = sorted(symbol_ids)
+    for _ in range(batches):
+        batch_id = uuid4()
+        items = rvol_items(rng, symbols, rows)
+        conn.execute(insert(RvolBatch), [{"id": batch_id}])
+        conn.execute(
+            insert(RvolCandidate),
+            [
+                {**item, "batch_id": batch_id, "symbol_id": symbol_ids[item["ticker"]]}
+                for item in items
+            ],
+        )
+        conn.commit()
+        db = WorkerSessionLocal()
+        try:
+            start = time.perf_counter()
+            filter_and_score(db, batch_id)
+            samples.append(time.perf_counter() - start)
+        finally:
+            db.close()
+    return {"rows_per_batch": rows, **latency_summary(samples)}
+
+
+def bench_poller(upstream, cycles: int) -> dict:
+    bucket = TokenBucket(10**9)  # the fakes have no rate limit
+    samples = []
+    quotes = upstream.requests["finnhub"]
+    for _ in range(cycles):
+        start = time.perf_counter()
+        poll_once(bucket)
+        samples.append(time.perf_counter() - start)
+    quotes = upstream.requests["finnhub"] - quotes
+    return {
+        "cycles": cycles,
+        "quotes_per_cycle": quotes / cycles,
+        "first_cycle_ms": samples[0] * 1e3,
+        **latency_summary(samples[1:] or samples),
+    }
+
+
+def read_endpoints() -> list[str]:
+    """Every parameterless ``GET /api/*`` route, with the queries from bench.load."""
+
+    queries = dict(path.partition("?")[::2] for path in DEFAULT_PATHS)
+    paths = []
+    for path, operations in app_main.app.openapi()["paths"].items():
+        if path.startswith("/api/") and "get" in operations and "{" not in path:
+            query = queries.get(path)
+            paths.append(f"{path}?{query}" if query else path)
+    return paths
+
+
+class _Server:
+    """uvicorn on a free local port, in a background thread."""
+
+    def __init__(self) -> None:
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(
+            app_main.app, host="127.0.0.1", port=self.port, log_level="warning"
+        )
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def bench_endpoints(concurrency: int, duration: float) -> list[dict]:
+    with _Server() as base_url:
+        return [
+            asyncio.run(run_endpoint(base_url, path, concurrency, duration))
+            for path in read_endpoints()
+        ]
+
+
+def run_suite(args: argparse.Namespace) -> dict:
+    # The suite drives the poller itself; no background threads.
+    app_main.ENABLE_POLLER = False
+    settings.CHANGE_FEED = False
+    rng = random.Random(args.seed)
+    results: dict = {
+        "meta": {
+            "commit": _git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "params": vars(args),
+        }
+    }
+
+    with fake_upstreams(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        error_rate=args.upstream_error_rate,
+        seed=args.seed,
+    ) as upstream, scratch_schema() as conn:
+        settings.FINNHUB_BASE_URL = f"{upstream.base_url}/api/v1"
+        settings.TELEGRAM_API_URL = upstream.base_url
+        settings.TELEGRAM_BOT_TOKEN = settings.TELEGRAM_BOT_TOKEN or "bench"
+        settings.TELEGRAM_CHAT_ID = settings.TELEGRAM_CHAT_ID or "bench"
+        route_app_engines(conn.info["schema"])
+
+        started = time.perf_counter()
+        seeded = seed_candidates(
+            conn, days=args.days, per_batch=args.per_batch, universe=args.symbols, seed=args.seed
+        )
+        symbol_ids = dict(conn.execute(select(Symbol.ticker, Symbol.id)).all())
+        seed_portfolio(conn, symbol_ids, args.positions, args.alerts, seed=args.seed)
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+        results["seed"] = {
+            "symbols": len(symbol_ids),
+            "candidates_filtered": seeded,
+            "positions": args.positions,
+            "alerts": args.alerts,
+            "seconds": time.perf_counter() - started,
+        }
+        print(f"seeded in {results['seed']['seconds']:.1f}s", file=sys.stderr)
+
+        client = TestClient(app_main.app)
+        results["ingest"] = bench_ingest(
+            client, sorted(symbol_ids), args.batches, args.batch_rows, rng
+        )
+        print("ingest done", file=sys.stderr)
+        results["filter_and_score"] = bench_filter(
+            conn, symbol_ids, args.batches, args.batch_rows, rng
+        )
+        print("filter_and_score done", file=sys.stderr)
+        results["poller"] = bench_poller(upstream, args.poll_cycles)
+        print("poller done", file=sys.stderr)
+        results["endpoints"] = bench_endpoints(args.concurrency, args.duration)
+        results["upstream_requests"] = dict(upstream.requests)
+
+    return results
+
+
+def _metrics(results: dict) -> dict[str, float]:
+    """Flatten comparable numbers: ``*_ms`` (lower is better), ``*_per_s``/``rps``."""
+
+    flat: dict[str, float] = {}
+    for section in ("ingest", "filter_and_score", "poller"):
+        for key, value in results.get(section, {}).items():
+            flat[f"{section}.{key}"] = value
+    for row in results.get("endpoints", []):
+        for key in ("p50_ms", "p99_ms", "rps"):
+            flat[f"endpoints[{row['path']}].{key}"] = row[key]
+    return {
+        k: v
+        for k, v in flat.items()
+        if isinstance(v, (int, float)) and (k.endswith(("_ms", "_per_s", ".rps")))
+    }
+
+
+def regressions(baseline: dict, current: dict, tolerance: float) -> list[tuple[str, float, float]]:
+    before, after = _metrics(baseline), _metrics(current)
+    worse = []
+    for key, old in before.items():
+        new = after.get(key)
+        if new is None or not old or old != old or new != new:  # missing/zero/NaN
+            continue
+        higher_is_better = not key.endswith("_ms")
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        if change > tolerance:
+            worse.append((key, old, new))
+    return worse
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    scale = parser.add_argument_group("scale")
+    scale.add_argument("--symbols", type=int, default=2000)
+    scale.add_argument("--days", type=int, default=5, help="sessions of candidate history")
+    scale.add_argument("--per-batch", type=int, default=20, help="history rows per batch")
+    scale.add_argument("--positions", type=int, default=50)
+    scale.add_argument("--alerts", type=int, default=200)
+    scale.add_argument("--batches", type=int, default=20, help="batches to ingest/filter")
+    scale.add_argument("--batch-rows", type=int, default=300)
+    scale.add_argument("--poll-cycles", type=int, default=5)
+    upstream = parser.add_argument_group("fake upstreams")
+    upstream.add_argument("--upstream-latency-ms", type=float, default=20.0)
+    upstream.add_argument("--upstream-jitter-ms", type=float, default=10.0)
+    upstream.add_argument("--upstream-error-rate", type=float, default=0.01)
+    http = parser.add_argument_group("read endpoints")
+    http.add_argument("--concurrency", type=int, default=16)
+    http.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    text = json.dumps(results, indent=2, default=str)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            worse = regressions(json.load(fh), results, args.tolerance)
+        for key, old, new in worse:
+            print(f"REGRESSION {key}: {old:.2f} -> {new:.2f}", file=sys.stderr)
+        if worse:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
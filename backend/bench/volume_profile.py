@@ -0,0 +1,83 @@
+"""In-house RVOL engine microbenchmarks (``app.services.volume_profile``).
+
+Fills the profile ring with synthetic sessions (no database: observations
+are fed straight to the per-session fill) and times folding one session,
+recomputing the expected curves and RVOL for one ingest batch.
+
+    python -m bench.volume_profile [--symbols 2000] [--per-batch 200] [--repeat 5]
+"""
+
+import argparse
+import itertools
+import time
+from datetime import date
+from typing import Callable
+
+import numpy as np
+
+from app.services.market_calendar import market_calendar
+from app.services.volume_profile import VolumeProfiles
+
+TODAY = date(2026, 10, 19)
+OBSERVATIONS_PER_SESSION = 78  # one batch every 5 minutes
+
+
+def _observations(rng: np.random.Generator, market_session, symbols: int, per_batch: int):
+    """``per_batch`` random symbols per 5-minute batch, cumulative volume ~ linear."""
+
+    minutes = np.repeat(np.arange(OBSERVATIONS_PER_SESSION) * 5.0 + 2.5, per_batch)
+    symbol_ids = rng.integers(0, symbols, size=len(minutes))
+    daily = rng.lognormal(14, 1, size=symbols)
+    volumes = daily[symbol_ids] * minutes / 390 * rng.uniform(0.5, 1.5, size=len(minutes))
+    return symbol_ids, market_session.open + minutes * 60, volumes
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=2000)
+    parser.add_argument("--per-batch", type=int, default=200)
+    parser.add_argument("--days", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    profiles = VolumeProfiles(days=args.days, bin_minutes=5, min_days=5)
+    sessions = market_calendar.previous_sessions(TODAY, args.days)
+    observed = [_observations(rng, s, args.symbols, args.per_batch) for s in sessions]
+
+    ring_slots = itertools.cycle(range(len(sessions)))
+
+    def fold_session():
+        i = next(ring_slots)
+        profiles._history[:, i, :] = np.nan
+        profiles._fill(i, sessions[i], *observed[i])
+
+    for _ in sessions:
+        fold_session()
+    profiles._recompute()
+
+    open_ts = market_calendar.session(TODAY).open
+    batch = rng.choice(args.symbols, size=args.per_batch, replace=False)
+    volumes = rng.lognormal(14, 1, size=args.per_batch)
+
+    def batch_rvol():
+        return profiles.rvol(batch.tolist(), volumes, open_ts + 150 * 60)
+
+    ring_mb = profiles._history.nbytes / 2**20
+    print(f"symbols {len(profiles._rows)}, ring {profiles._history.shape} float32 = {ring_mb:.1f} MiB")
+    print(f"{'fold one session':<28}{_best_of(fold_session, args.repeat) * 1e3:>10.3f} ms")
+    print(f"{'recompute expected curves':<28}{_best_of(profiles._recompute, args.repeat) * 1e3:>10.3f} ms")
+    print(f"{f'rvol for {args.per_batch} rows':<28}{_best_of(batch_rvol, args.repeat) * 1e3:>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,141 @@
+"""Scrape the screener's RVOL table, filter it and post it to the API.
+
+    python scripts/ingest_rvol.py                      # one run
+    python scripts/ingest_rvol.py --daemon --interval 30
+
+``--daemon`` keeps the process (and its imports) alive and runs every
+``--interval`` seconds (``INGEST_INTERVAL_SECONDS``) on a fixed schedule,
+with kept-alive HTTP sessions for the source and the API.  The filter rule
+is revalidated each run with ``If-None-Match``, so it is only downloaded and
+compiled again when it changed.  Uploads run on a background thread while
+the next run fetches; at most one is in flight.  Every run prints its
+timings.
+"""
+
+import argparse
+import hashlib
 import os
 import re
+import sys
+import time
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from typing import Dict
 
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import dotenv
 import unicodedata
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.rules import COLUMNS, NUMBER, Rule, compile_rule, profile_expression  # noqa: E402  (pure: numpy only)
+
 dotenv.load_dotenv()
 URL = os.environ.get("RVOL_URL")
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:8000")
 SETTINGS_URL = os.environ.get("APP_SETTINGS_URL")
+FILTERS_URL = os.environ.get("FILTERS_URL")
 
 MULT = {"K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
 
+# per-row parsing chatter; the daemon turns it off
+VERBOSE = True
+
+
+def _debug(*args) -> None:
+    if VERBOSE:
+        print(*args)
+
+
+def _session() -> requests.Session:
+    """A kept-alive session; idempotent GETs are retried once on connection errors."""
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=2,
+        max_retries=Retry(total=1, backoff_factor=0.2, allowed_methods=["GET"]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 @dataclass
 class FilterConfig:
     min_rvol: float
-    min_price: float
-    max_price: float
+    price_min: float
+    price_max: float
     min_pct_change: float
+    volume_cap: float = float("inf")
+
+
+# DataFrame column behind each rule column
+RULE_COLUMNS = {
+    "ticker": "Ticker",
+    "name": "Name",
+    "sector": "Sector",
+    "analyst_rating": "Analyst Rating",
+    "price": "Price_num",
+    "rvol": "RVOL_num",
+    "pct_change": "Pct_num",
+    "volume": "Volume_num",
+    "market_cap": "MktCap_num",
+}
+
+
+def load_filter_rule(session=requests) -> Rule:
+    """The rule the backend applies (profile plus enabled rule sets).
+
+    Falls back to the profile from the settings API or the environment when
+    ``/api/filters/effective`` is unreachable.
+    """
+
+    try:
+        resp = session.get(_filters_endpoint(), timeout=10)
+        resp.raise_for_status()
+        return _rule_from_response(resp)
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"Warning: unable to fetch the filter rule ({exc}); using the filter profile.")
+    return compile_rule(profile_expression(asdict(load_filter_config(session))))
+
+
+def _filters_endpoint() -> str:
+    return FILTERS_URL or f"{API_BASE_URL.rstrip('/')}/api/filters/effective"
+
+
+def _rule_from_response(resp) -> Rule:
+    data: Dict[str, object] = resp.json()
+    print(f"Using the '{data.get('regime')}' regime filter rule.")
+    return compile_rule(str(data["expression"]))
+
+
+class RuleCache:
+    """The effective filter rule, refetched only when its ETag changes."""
+
+    def __init__(self, session: requests.Session) -> None:
+        self.session = session
+        self.etag: str | None = None
+        self.rule: Rule | None = None
+
+    def current(self) -> Rule:
+        headers = {"If-None-Match": self.etag} if self.etag and self.rule else {}
+        try:
+            resp = self.session.get(_filters_endpoint(), headers=headers, timeout=10)
+            if resp.status_code == 304:
+                return self.rule
+            resp.raise_for_status()
+            self.rule = _rule_from_response(resp)
+            self.etag = resp.headers.get("ETag")
+        except Exception as exc:  # pylint: disable=broad-except
+            if self.rule is None:
+                return load_filter_rule(self.session)
+            print(f"Warning: unable to revalidate the filter rule ({exc}); keeping the last one.")
+        return self.rule
 
 
 def _env_float(*keys: str, default: float) -> float:
@@ -38,19 +150,21 @@ def _env_float(*keys: str, default: float) -> float:
     return default
 
 
-def load_filter_config() -> FilterConfig:
+def load_filter_config(session=requests) -> FilterConfig:
     settings_endpoint = SETTINGS_URL or f"{API_BASE_URL.rstrip('/')}/api/settings"
 
     try:
-        resp = requests.get(settings_endpoint, timeout=10)
+        resp = session.get(settings_endpoint, timeout=10)
         resp.raise_for_status()
         data: Dict[str, object] = resp.json()
-        return FilterConfig(
-            min_rvol=float(data.get("min_rvol", 0.0)),
-            min_price=float(data.get("price_min", 0.0)),
-            max_price=float(data.get("price_max", float("inf"))),
-            min_pct_change=float(data.get("min_pct_change", 0.0)),
-        )
+        # The API returns one filter profile per market regime plus the
+        # regime active today; fall back to the flat settings otherwise.
+        profiles = data.get("profiles") or {}
+        regime = data.get("regime")
+        if regime in profiles:
+            print(f"Using the '{regime}' market regime profile.")
+            return _config_from_settings(profiles[regime])
+        return _config_from_settings(data)
     except Exception as exc:  # pylint: disable=broad-except
         print(
             f"Warning: unable to fetch application settings ({exc}); falling back to environment defaults."
@@ -58,9 +172,20 @@ def load_filter_config() -> FilterConfig:
 
     return FilterConfig(
         min_rvol=_env_float("MIN_RVOL", default=0.0),
-        min_price=_env_float("PRICE_MIN", "MIN_PRICE", default=0.0),
-        max_price=_env_float("PRICE_MAX", "MAX_PRICE", default=float("inf")),
+        price_min=_env_float("PRICE_MIN", "MIN_PRICE", default=0.0),
+        price_max=_env_float("PRICE_MAX", "MAX_PRICE", default=float("inf")),
         min_pct_change=_env_float("MIN_PCT_CHANGE", default=0.0),
+        volume_cap=_env_float("VOLUME_CAP", default=float("inf")),
+    )
+
+
+def _config_from_settings(data: Dict[str, object]) -> FilterConfig:
+    return FilterConfig(
+        min_rvol=float(data.get("min_rvol", 0.0)),
+        price_min=float(data.get("price_min", 0.0)),
+        price_max=float(data.get("price_max", float("inf"))),
+        min_pct_change=float(data.get("min_pct_change", 0.0)),
+        volume_cap=float(data.get("volume_cap") or float("inf")),
     )
 
 def _normalize_numstr(s: str) -> str:
@@ -120,7 +245,7 @@ def table_to_records_fixed(table):
     Fixed version that properly extracts ticker and name from HTML structure
     """
     headers = [th.get_text(strip=True) for th in table.select("thead th")]
-    print(f"Headers found: {headers}")
+    _debug(f"Headers found: {headers}")
     
     rows = []
     symbol_col_idx = None
@@ -138,7 +263,7 @@ def table_to_records_fixed(table):
                 row_data[header] = td.get_text(strip=True)  # Keep original for debugging
                 row_data["Ticker"] = ticker
                 row_data["Name"] = name
-                print(f"Extracted - Ticker: '{ticker}', Name: '{name}'")
+                _debug(f"Extracted - Ticker: '{ticker}', Name: '{name}'")
             else:
                 # Normal text extraction for other columns
                 row_data[header] = td.get_text(strip=True)
@@ -147,11 +272,19 @@ def table_to_records_fixed(table):
     
     return rows
 
-def scrape_and_parse():
-    print("Starting scraping with fixed parser...")
-    r = requests.get(URL, timeout=30)
+def fetch_source(session=requests) -> str:
+    r = session.get(URL, timeout=30)
     r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
+    return r.text
+
+
+def scrape_and_parse(session=requests):
+    _debug("Starting scraping with fixed parser...")
+    return parse_source(fetch_source(session))
+
+
+def parse_source(html: str) -> pd.DataFrame:
+    soup = BeautifulSoup(html, "lxml")
     roots = soup.find_all("div", class_="js-base-screener-page-component-root")
 
     all_records = []
@@ -164,8 +297,8 @@ def scrape_and_parse():
     
     # Now we should have separate Ticker and Name columns already
     if "Ticker" in df.columns and "Name" in df.columns:
-        print("\nFirst 10 rows - Ticker and Name extraction:")
-        print(df[["Symbol", "Ticker", "Name"]].head(10))
+        _debug("\nFirst 10 rows - Ticker and Name extraction:")
+        _debug(df[["Symbol", "Ticker", "Name"]].head(10))
     else:
         print("Warning: Ticker and Name columns not created properly")
         # Fallback to your original method if HTML parsing fails
@@ -279,31 +412,27 @@ def parse_percent(s):
     return parse_human_number(s, as_int=False)
 
 
-def apply_filters(df: pd.DataFrame, cfg: FilterConfig) -> pd.DataFrame:
+def apply_filters(df: pd.DataFrame, rule: Rule) -> pd.DataFrame:
     if df.empty:
         return df
 
-    rvol_series = pd.to_numeric(df["RVOL_num"], errors="coerce")
-    price_series = pd.to_numeric(df["Price_num"], errors="coerce")
-    pct_series = pd.to_numeric(df["Pct_num"], errors="coerce")
-
-    mask = (
-        rvol_series.ge(cfg.min_rvol)
-        & price_series.ge(cfg.min_price)
-        & price_series.le(cfg.max_price)
-        & pct_series.ge(cfg.min_pct_change)
-    )
+    columns = {}
+    for name in rule.columns:
+        source = df[RULE_COLUMNS[name]] if RULE_COLUMNS[name] in df.columns else pd.Series(
+            None, index=df.index, dtype=object
+        )
+        if COLUMNS[name] == NUMBER:
+            columns[name] = pd.to_numeric(source, errors="coerce").to_numpy(dtype="float64")
+        else:
+            columns[name] = source.astype(object).where(source.notna(), None).to_numpy()
 
-    filtered = df.loc[mask].copy()
-    print(
-        f"Applied filters: min RVOL {cfg.min_rvol}, price between {cfg.min_price} and {cfg.max_price}, "
-        f"min % change {cfg.min_pct_change}."
-    )
-    print(f"Rows before filtering: {len(df)} | after filtering: {len(filtered)}")
+    filtered = df.loc[rule.mask(columns)].copy()
+    _debug(f"Applied filter rule: {rule.expression}")
+    _debug(f"Rows before filtering: {len(df)} | after filtering: {len(filtered)}")
     return filtered
 
 
-def post_batch(df):
+def post_batch(df, session=requests):
     payload = {
         "batch_id": str(uuid.uuid4()),
         "items": [
@@ -321,24 +450,131 @@ def post_batch(df):
             for _, row in df.iterrows()
         ],
     }
-    resp = requests.post(
+    # W3C trace context: the API's spans for this batch join this trace id
+    trace_id = os.urandom(16).hex()
+    resp = session.post(
         f"{API_BASE_URL.rstrip('/')}/internal/ingest-rvol-batch",
         json=payload,
+        headers={"traceparent": f"00-{trace_id}-{os.urandom(8).hex()}-01"},
         timeout=30,
     )
-    print(resp.status_code, resp.text)
+    return resp, trace_id
 
 
-if __name__ == "__main__":
-    cfg = load_filter_config()
+def _digest(df: pd.DataFrame) -> str:
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def _upload(run: int, df: pd.DataFrame, session: requests.Session) -> bool:
+    """Post ``df``; True only if the API accepted it (2xx)."""
+
+    start = time.perf_counter()
+    ok = False
+    try:
+        resp, trace_id = post_batch(df, session)
+        ok = resp.ok
+        outcome = f"{resp.status_code} trace_id={trace_id}"
+    except Exception as exc:  # pylint: disable=broad-except
+        outcome = f"failed ({exc})"
+    print(f"run {run}: upload {len(df)} rows {outcome} in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    return ok
+
+
+def run_daemon(interval: float) -> None:
+    """Ingest every ``interval`` seconds until interrupted."""
+
+    global VERBOSE
+    VERBOSE = False
+    source, api, uploader = _session(), _session(), _session()  # sessions aren't shared across threads
+    rules = RuleCache(api)
+    uploads = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload")
+    pending: Future | None = None
+    pending_digest = None
+    last_digest = None  # of the last snapshot the API accepted
+    next_run = time.monotonic()
+    run = 0
+    print(f"Ingesting every {interval:g}s from {URL}")
+    try:
+        while True:
+            run += 1
+            marks = [time.perf_counter()]
+            try:
+                rule = rules.current()
+                marks.append(time.perf_counter())
+                html = fetch_source(source)
+                marks.append(time.perf_counter())
+                df = parse_source(html)
+                marks.append(time.perf_counter())
+                filtered = apply_filters(df, rule)
+                marks.append(time.perf_counter())
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"run {run}: failed ({exc})")
+            else:
+                digest = _digest(filtered) if not filtered.empty else None
+                if pending is not None:
+                    # the previous upload has to land first; a failed one is retried
+                    # by the next run that scrapes the same snapshot
+                    if pending.result():
+                        last_digest = pending_digest
+                    pending = None
+                if digest is None:
+                    status = "nothing matched"
+                elif digest == last_digest:
+                    status = "unchanged, not uploaded"
+                else:
+                    pending = uploads.submit(_upload, run, filtered, uploader)
+                    pending_digest = digest
+                    status = "uploading"
+                rule_ms, fetch_ms, parse_ms, filter_ms = (
+                    (b - a) * 1e3 for a, b in zip(marks, marks[1:])
+                )
+                print(
+                    f"run {run}: rule {rule_ms:.0f} ms, fetch {fetch_ms:.0f} ms, "
+                    f"parse {parse_ms:.0f} ms, filter {filter_ms:.1f} ms, "
+                    f"total {(marks[-1] - marks[0]) * 1e3:.0f} ms; "
+                    f"{len(df)} -> {len(filtered)} rows, {status}"
+                )
+
+            next_run += interval
+            late = time.monotonic() - next_run
+            if late > 0:
+                skipped = int(late // interval) + 1
+                next_run += skipped * interval
+                print(f"run {run}: overran the {interval:g}s interval, skipping {skipped} run(s)")
+            time.sleep(max(0.0, next_run - time.monotonic()))
+    except KeyboardInterrupt:
+        print("Stopping; waiting for the last upload.")
+    finally:
+        uploads.shutdown(wait=True)
+
+
+def run_once() -> None:
+    rule = load_filter_rule()
     df = scrape_and_parse()
     if not df.empty:
         print(f"\nFinal DataFrame shape: {df.shape}")
         if "Ticker" in df.columns and "Name" in df.columns:
             print("\nFinal results:")
             print(df[["Ticker", "Name", "RVOL", "Price", "PctChange", "Volume", "MarketCap"]].head(10))
-        filtered_df = apply_filters(df, cfg)
+        filtered_df = apply_filters(df, rule)
         if filtered_df.empty:
             print("No rows matched the configured filters. Skipping batch upload.")
         else:
-            post_batch(filtered_df)
+            resp, trace_id = post_batch(filtered_df)
+            print(resp.status_code, resp.text, f"trace_id={trace_id}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--daemon", action="store_true", help="keep running on a schedule")
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=_env_float("INGEST_INTERVAL_SECONDS", default=60.0),
+        help="seconds between daemon runs",
+    )
+    args = parser.parse_args()
+    if args.daemon:
+        run_daemon(max(args.interval, 1.0))
+    else:
+        run_once()
@@ -1,7 +1,15 @@
 CREATE TYPE "alert_kind" AS ENUM (
   'target_pct',
   'target_abs',
-  'stop'
+  'stop',
+  'price_cross',
+  'trailing_pct',
+  'trailing_abs'
+);
+
+CREATE TYPE "alert_state" AS ENUM (
+  'armed',
+  'fired'
 );
 
 CREATE TYPE "channel" AS ENUM (
@@ -28,6 +36,16 @@ CREATE TABLE "app_settings" (
   "updated_at" timestamptz DEFAULT (now())
 );
 
+CREATE TABLE "filters" (
+  "id" serial PRIMARY KEY,
+  "name" text UNIQUE NOT NULL,
+  "expression" text NOT NULL,
+  "enabled" boolean NOT NULL DEFAULT true,
+  "version" integer NOT NULL DEFAULT 1,
+  "created_at" timestamptz DEFAULT (now()),
+  "updated_at" timestamptz DEFAULT (now())
+);
+
 CREATE TABLE "market_regime" (
   "id" serial PRIMARY KEY,
   "for_date" date UNIQUE NOT NULL,
@@ -36,16 +54,34 @@ CREATE TABLE "market_regime" (
   "created_at" timestamptz DEFAULT (now())
 );
 
+CREATE TABLE "symbols" (
+  "id" serial PRIMARY KEY,
+  "ticker" text UNIQUE NOT NULL,
+  "name" text,
+  "exchange" text,
+  "is_active" boolean NOT NULL DEFAULT true,
+  "created_at" timestamptz DEFAULT (now())
+);
+
+CREATE TABLE "rule_snapshots" (
+  "id" serial PRIMARY KEY,
+  "hash" text UNIQUE NOT NULL,
+  "rules_json" jsonb NOT NULL,
+  "created_at" timestamptz DEFAULT (now())
+);
+
 CREATE TABLE "rvol_batches" (
   "id" uuid PRIMARY KEY,
   "ingested_at" timestamptz NOT NULL DEFAULT (now()),
-  "source_hash" text
+  "source_hash" text,
+  "rule_snapshot_id" integer
 );
 
 CREATE TABLE "rvol_candidates" (
   "id" bigserial PRIMARY KEY,
   "batch_id" uuid NOT NULL,
   "ticker" text NOT NULL,
+  "symbol_id" integer NOT NULL,
   "name" text,
   "rvol" numeric(10,2) NOT NULL,
   "price" numeric(12,4) NOT NULL,
@@ -61,7 +97,13 @@ CREATE TABLE "candidates_filtered" (
   "id" bigserial PRIMARY KEY,
   "batch_id" uuid NOT NULL,
   "ticker" text NOT NULL,
+  "symbol_id" integer NOT NULL,
   "score" numeric(12,6) NOT NULL DEFAULT 0,
+  "price" numeric(12,4),
+  "rvol" numeric(12,4),
+  "pct_change" numeric(7,3),
+  "volume" bigint,
+  "rule_snapshot_id" integer,
   "reasons_json" jsonb,
   "first_seen_at" timestamptz NOT NULL DEFAULT (now()),
   "last_seen_at" timestamptz NOT NULL DEFAULT (now()),
@@ -71,6 +113,7 @@ CREATE TABLE "candidates_filtered" (
 CREATE TABLE "positions" (
   "id" bigserial PRIMARY KEY,
   "ticker" text NOT NULL,
+  "symbol_id" integer NOT NULL,
   "side" text NOT NULL,
   "qty" numeric(18,4) NOT NULL,
   "entry_price" numeric(12,4) NOT NULL,
@@ -84,18 +127,28 @@ CREATE TABLE "positions" (
 CREATE TABLE "price_alerts" (
   "id" bigserial PRIMARY KEY,
   "ticker" text NOT NULL,
+  "symbol_id" integer NOT NULL,
   "kind" alert_kind NOT NULL,
   "threshold_value" numeric(12,4) NOT NULL,
   "trailing" boolean NOT NULL DEFAULT false,
   "active" boolean NOT NULL DEFAULT true,
   "created_at" timestamptz NOT NULL DEFAULT (now()),
-  "last_triggered_at" timestamptz
+  "last_triggered_at" timestamptz,
+  "water_mark" numeric(12,4),
+  "water_mark_at" timestamptz,
+  "state" alert_state NOT NULL DEFAULT 'armed',
+  "rearm_price" numeric(12,4),
+  "rearm_above" boolean,
+  "rearm_after" timestamptz,
+  "cooldown_seconds" integer,
+  "rearm_band_pct" numeric(6,3)
 );
 
 CREATE TABLE "notifications" (
   "id" bigserial PRIMARY KEY,
   "channel" channel NOT NULL,
   "ticker" text,
+  "symbol_id" integer,
   "message" text NOT NULL,
   "dedupe_key" text UNIQUE NOT NULL,
   "sent_at" timestamptz,
@@ -111,9 +164,16 @@ CREATE TABLE "news_cache" (
   "provider" text,
   "published_at" timestamptz NOT NULL,
   "hash" text UNIQUE NOT NULL,
-  "created_at" timestamptz DEFAULT (now())
+  "created_at" timestamptz DEFAULT (now()),
+  "symbol_id" integer
 );
 
+CREATE INDEX "ix_rvol_batches_ingested_at" ON "rvol_batches" ("ingested_at", "id");
+
+CREATE INDEX "ix_rvol_candidates_batch_id" ON "rvol_candidates" ("batch_id");
+
+CREATE INDEX "ix_candidates_filtered_symbol_latest" ON "candidates_filtered" ("symbol_id", "last_seen_at" DESC, "id" DESC) INCLUDE ("score");
+
 CREATE INDEX ON "positions" ("ticker");
 
 CREATE INDEX ON "positions" ("created_at");
@@ -122,10 +182,16 @@ CREATE INDEX ON "news_cache" ("ticker");
 
 CREATE INDEX ON "news_cache" ("published_at");
 
+CREATE INDEX "ix_news_cache_symbol_published" ON "news_cache" ("symbol_id", "published_at");
+
 COMMENT ON COLUMN "app_settings"."value_json" IS 'Arbitrary config in JSON';
 
 COMMENT ON COLUMN "rvol_batches"."source_hash" IS 'hash of source payload for dedupe (optional)';
 
+COMMENT ON COLUMN "rule_snapshots"."hash" IS 'md5 of rules_json::text';
+
+COMMENT ON COLUMN "candidates_filtered"."reasons_json" IS 'row-specific extras; rules live in rule_snapshots';
+
 COMMENT ON COLUMN "positions"."side" IS 'long/short';
 
 COMMENT ON COLUMN "price_alerts"."threshold_value" IS 'For target_pct use % like 10.0';
@@ -133,3 +199,78 @@ COMMENT ON COLUMN "price_alerts"."threshold_value" IS 'For target_pct use % like
 ALTER TABLE "rvol_candidates" ADD FOREIGN KEY ("batch_id") REFERENCES "rvol_batches" ("id");
 
 ALTER TABLE "candidates_filtered" ADD FOREIGN KEY ("batch_id") REFERENCES "rvol_batches" ("id");
+
+ALTER TABLE "rvol_candidates" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+ALTER TABLE "candidates_filtered" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+ALTER TABLE "rvol_batches" ADD FOREIGN KEY ("rule_snapshot_id") REFERENCES "rule_snapshots" ("id");
+
+ALTER TABLE "candidates_filtered" ADD FOREIGN KEY ("rule_snapshot_id") REFERENCES "rule_snapshots" ("id");
+
+ALTER TABLE "positions" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+ALTER TABLE "price_alerts" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+ALTER TABLE "notifications" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+ALTER TABLE "news_cache" ADD FOREIGN KEY ("symbol_id") REFERENCES "symbols" ("id");
+
+CREATE TABLE "price_quotes" (
+  "id" bigserial PRIMARY KEY,
+  "ticker" text NOT NULL,
+  "symbol_id" integer NOT NULL REFERENCES "symbols" ("id"),
+  "price" numeric(12,4) NOT NULL,
+  "day_high" numeric(12,4),
+  "day_low" numeric(12,4),
+  "quoted_at" timestamptz DEFAULT (now())
+);
+
+CREATE INDEX "ix_price_quotes_symbol_quoted_at" ON "price_quotes" ("symbol_id", "quoted_at");
+
+-- Change feed: committed writes to tables that workers cache are announced
+-- on the "screener_changes" channel as {"table", "op", "id"} JSON so the
+-- listener in each process (app/services/changes.py) can apply them.
+-- UPDATE triggers are limited to the columns those caches read; the price
+-- poller's own current_price/water_mark writes stay silent.
+CREATE OR REPLACE FUNCTION "notify_change"() RETURNS trigger AS $$
+DECLARE
+  rec record;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    rec := OLD;
+  ELSE
+    rec := NEW;
+  END IF;
+  PERFORM pg_notify(
+    'screener_changes',
+    json_build_object('table', TG_TABLE_NAME, 'op', lower(TG_OP), 'id', rec.id)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER "price_alerts_notify_change"
+AFTER INSERT OR DELETE OR UPDATE OF "symbol_id", "kind", "threshold_value", "trailing", "active",
+  "state", "cooldown_seconds", "rearm_band_pct"
+ON "price_alerts" FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "positions_notify_change"
+AFTER INSERT OR DELETE OR UPDATE OF "symbol_id", "side", "qty", "entry_price", "closed_at"
+ON "positions" FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "app_settings_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "app_settings"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "filters_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "filters"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "market_regime_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "market_regime"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "rvol_batches_notify_change"
+AFTER INSERT ON "rvol_batches"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
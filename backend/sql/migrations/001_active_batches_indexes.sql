@@ -0,0 +1,5 @@
+-- Supports keyset pagination of /api/rvol/active-batches and the per-batch
+-- candidate aggregation.
+CREATE INDEX IF NOT EXISTS "ix_rvol_batches_ingested_at" ON "rvol_batches" ("ingested_at", "id");
+
+CREATE INDEX IF NOT EXISTS "ix_rvol_candidates_batch_id" ON "rvol_candidates" ("batch_id");
@@ -0,0 +1,4 @@
+-- Serves the DISTINCT ON (ticker) "latest row per ticker" scan in
+-- /api/candidates.
+CREATE INDEX IF NOT EXISTS "ix_candidates_filtered_ticker_latest"
+  ON "candidates_filtered" ("ticker", "last_seen_at" DESC, "id" DESC) INCLUDE ("score");
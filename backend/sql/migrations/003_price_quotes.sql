@@ -0,0 +1,13 @@
+-- Quote history recorded by the price poller; read by the backtester
+-- (python -m app.backtest).
+CREATE TABLE IF NOT EXISTS "price_quotes" (
+  "id" bigserial PRIMARY KEY,
+  "ticker" text NOT NULL,
+  "price" numeric(12,4) NOT NULL,
+  "day_high" numeric(12,4),
+  "day_low" numeric(12,4),
+  "quoted_at" timestamptz DEFAULT (now())
+);
+
+CREATE INDEX IF NOT EXISTS "ix_price_quotes_ticker_quoted_at"
+  ON "price_quotes" ("ticker", "quoted_at");
@@ -0,0 +1,66 @@
+-- Ticker master table.  The hot tables keep their "ticker" text column for
+-- display but are joined/filtered through an integer "symbol_id".
+CREATE TABLE IF NOT EXISTS "symbols" (
+  "id" serial PRIMARY KEY,
+  "ticker" text UNIQUE NOT NULL,
+  "name" text,
+  "exchange" text,
+  "is_active" boolean NOT NULL DEFAULT true,
+  "created_at" timestamptz DEFAULT (now())
+);
+
+INSERT INTO "symbols" ("ticker")
+SELECT DISTINCT upper(trim("ticker")) FROM (
+  SELECT "ticker" FROM "rvol_candidates"
+  UNION SELECT "ticker" FROM "candidates_filtered"
+  UNION SELECT "ticker" FROM "positions"
+  UNION SELECT "ticker" FROM "price_alerts"
+  UNION SELECT "ticker" FROM "price_quotes"
+  UNION SELECT "ticker" FROM "notifications"
+) AS "all_tickers"
+WHERE "ticker" IS NOT NULL
+ON CONFLICT ("ticker") DO NOTHING;
+
+UPDATE "symbols" AS s SET "name" = c."name"
+FROM (
+  SELECT DISTINCT ON (upper(trim("ticker"))) upper(trim("ticker")) AS "ticker", "name"
+  FROM "rvol_candidates"
+  WHERE "name" IS NOT NULL
+  ORDER BY upper(trim("ticker")), "seen_at" DESC
+) AS c
+WHERE s."ticker" = c."ticker" AND s."name" IS NULL;
+
+ALTER TABLE "rvol_candidates" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+ALTER TABLE "positions" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+ALTER TABLE "price_quotes" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+ALTER TABLE "notifications" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+
+UPDATE "rvol_candidates" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+UPDATE "candidates_filtered" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+UPDATE "positions" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+UPDATE "price_alerts" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+UPDATE "price_quotes" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+UPDATE "notifications" AS t SET "symbol_id" = s."id" FROM "symbols" AS s
+WHERE s."ticker" = upper(trim(t."ticker")) AND t."symbol_id" IS NULL;
+
+ALTER TABLE "rvol_candidates" ALTER COLUMN "symbol_id" SET NOT NULL;
+ALTER TABLE "candidates_filtered" ALTER COLUMN "symbol_id" SET NOT NULL;
+ALTER TABLE "positions" ALTER COLUMN "symbol_id" SET NOT NULL;
+ALTER TABLE "price_alerts" ALTER COLUMN "symbol_id" SET NOT NULL;
+ALTER TABLE "price_quotes" ALTER COLUMN "symbol_id" SET NOT NULL;
+
+-- Integer keys replace the text-keyed indexes.
+DROP INDEX IF EXISTS "ix_candidates_filtered_ticker_latest";
+CREATE INDEX IF NOT EXISTS "ix_candidates_filtered_symbol_latest"
+  ON "candidates_filtered" ("symbol_id", "last_seen_at" DESC, "id" DESC) INCLUDE ("score");
+
+DROP INDEX IF EXISTS "ix_price_quotes_ticker_quoted_at";
+CREATE INDEX IF NOT EXISTS "ix_price_quotes_symbol_quoted_at"
+  ON "price_quotes" ("symbol_id", "quoted_at");
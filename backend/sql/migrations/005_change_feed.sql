@@ -0,0 +1,41 @@
+-- Change feed: committed writes to tables that workers cache are announced
+-- on the "screener_changes" channel as {"table", "op", "id"} JSON so the
+-- listener in each process (app/services/changes.py) can apply them.
+-- UPDATE triggers are limited to the columns those caches read; the price
+-- poller's own current_price/last_triggered_at writes stay silent.
+CREATE OR REPLACE FUNCTION "notify_change"() RETURNS trigger AS $$
+DECLARE
+  rec record;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    rec := OLD;
+  ELSE
+    rec := NEW;
+  END IF;
+  PERFORM pg_notify(
+    'screener_changes',
+    json_build_object('table', TG_TABLE_NAME, 'op', lower(TG_OP), 'id', rec.id)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER "price_alerts_notify_change"
+AFTER INSERT OR DELETE OR UPDATE OF "symbol_id", "kind", "threshold_value", "trailing", "active"
+ON "price_alerts" FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "positions_notify_change"
+AFTER INSERT OR DELETE OR UPDATE OF "symbol_id", "side", "qty", "entry_price", "closed_at"
+ON "positions" FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "app_settings_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "app_settings"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "market_regime_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "market_regime"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
+
+CREATE OR REPLACE TRIGGER "rvol_batches_notify_change"
+AFTER INSERT ON "rvol_batches"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
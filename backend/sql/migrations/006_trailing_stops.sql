@@ -0,0 +1,21 @@
+-- Trailing stops: alert kinds that follow the running peak (long) or trough
+-- (short) by a percent or an absolute distance.  The price poller keeps the
+-- mark in memory and checkpoints it here so it survives restarts.
+--
+-- Databases created from the models name the enum "alertkind", ones created
+-- from init.sql "alert_kind".
+DO $$
+DECLARE
+  enum_name text;
+BEGIN
+  FOREACH enum_name IN ARRAY ARRAY['alertkind', 'alert_kind'] LOOP
+    IF to_regtype(enum_name) IS NOT NULL THEN
+      EXECUTE format('ALTER TYPE %I ADD VALUE IF NOT EXISTS %L', enum_name, 'trailing_pct');
+      EXECUTE format('ALTER TYPE %I ADD VALUE IF NOT EXISTS %L', enum_name, 'trailing_abs');
+    END IF;
+  END LOOP;
+END
+$$;
+
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "water_mark" numeric(12,4);
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "water_mark_at" timestamptz;
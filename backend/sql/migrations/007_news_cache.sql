@@ -0,0 +1,22 @@
+-- News headlines per ticker (app/services/news.py).  init.sql always had the
+-- table; databases created from the models did not.  Either way it gains a
+-- symbol_id and an index for the per-symbol recency lookups the scorer does.
+CREATE TABLE IF NOT EXISTS "news_cache" (
+  "id" bigserial PRIMARY KEY,
+  "ticker" text NOT NULL,
+  "headline" text NOT NULL,
+  "url" text,
+  "provider" text,
+  "published_at" timestamptz NOT NULL,
+  "hash" text UNIQUE NOT NULL,
+  "created_at" timestamptz DEFAULT (now())
+);
+
+ALTER TABLE "news_cache" ADD COLUMN IF NOT EXISTS "symbol_id" integer REFERENCES "symbols" ("id");
+
+UPDATE "news_cache" AS n SET "symbol_id" = s."id"
+FROM "symbols" AS s
+WHERE n."symbol_id" IS NULL AND s."ticker" = upper(trim(n."ticker"));
+
+CREATE INDEX IF NOT EXISTS "ix_news_cache_symbol_published"
+  ON "news_cache" ("symbol_id", "published_at");
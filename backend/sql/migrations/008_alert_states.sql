@@ -0,0 +1,25 @@
+-- Alert state machine (app/workers/watchlist.py): an armed alert fires once,
+-- then stays "fired" until its cooldown has passed and the price has moved
+-- back through the re-arm level (the trigger level plus a hysteresis band).
+-- cooldown_seconds/rearm_band_pct override ALERT_COOLDOWN_SECONDS and
+-- ALERT_REARM_BAND_PCT per alert.
+DO $$
+BEGIN
+  IF to_regtype('alert_state') IS NULL THEN
+    CREATE TYPE "alert_state" AS ENUM ('armed', 'fired');
+  END IF;
+END
+$$;
+
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "state" alert_state NOT NULL DEFAULT 'armed';
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "rearm_price" numeric(12,4);
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "rearm_above" boolean;
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "rearm_after" timestamptz;
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "cooldown_seconds" integer;
+ALTER TABLE "price_alerts" ADD COLUMN IF NOT EXISTS "rearm_band_pct" numeric(6,3);
+
+-- State changes are announced so every poller process agrees on them.
+CREATE OR REPLACE TRIGGER "price_alerts_notify_change"
+AFTER INSERT OR DELETE OR UPDATE OF "symbol_id", "kind", "threshold_value", "trailing", "active",
+  "state", "cooldown_seconds", "rearm_band_pct"
+ON "price_alerts" FOR EACH ROW EXECUTE FUNCTION "notify_change"();
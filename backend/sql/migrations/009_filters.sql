@@ -0,0 +1,18 @@
+-- Named filter rule sets (app/rules.py, app/services/filter_rules.py).  Each
+-- row is an expression over candidate columns; the enabled ones are ANDed
+-- with the regime profile's price/RVOL/change/volume rules.  ``version`` is
+-- bumped on every edit through the API.
+CREATE TABLE IF NOT EXISTS "filters" (
+  "id" serial PRIMARY KEY,
+  "name" text UNIQUE NOT NULL,
+  "expression" text NOT NULL,
+  "enabled" boolean NOT NULL DEFAULT true,
+  "version" integer NOT NULL DEFAULT 1,
+  "created_at" timestamptz DEFAULT (now()),
+  "updated_at" timestamptz DEFAULT (now())
+);
+
+-- Workers cache the compiled rule sets until this announces a change.
+CREATE OR REPLACE TRIGGER "filters_notify_change"
+AFTER INSERT OR UPDATE OR DELETE ON "filters"
+FOR EACH ROW EXECUTE FUNCTION "notify_change"();
@@ -0,0 +1,56 @@
+-- candidates_filtered used to carry the full rule set and the row's metrics
+-- in reasons_json, and list queries decoded that JSONB per row.  Rules now
+-- live once per distinct content in rule_snapshots (referenced by every
+-- batch and candidate scored with them), metrics in typed columns, and
+-- reasons_json keeps only row-specific extras.
+CREATE TABLE IF NOT EXISTS "rule_snapshots" (
+  "id" serial PRIMARY KEY,
+  "hash" text UNIQUE NOT NULL,
+  "rules_json" jsonb NOT NULL,
+  "created_at" timestamptz DEFAULT (now())
+);
+
+ALTER TABLE "rvol_batches" ADD COLUMN IF NOT EXISTS "rule_snapshot_id" integer REFERENCES "rule_snapshots" ("id");
+
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "price" numeric(12,4);
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "rvol" numeric(12,4);
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "pct_change" numeric(7,3);
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "volume" bigint;
+ALTER TABLE "candidates_filtered" ADD COLUMN IF NOT EXISTS "rule_snapshot_id" integer REFERENCES "rule_snapshots" ("id");
+
+-- Backfill: one snapshot per distinct "rules" object, hashed the way
+-- services/filter.py hashes new ones.
+INSERT INTO "rule_snapshots" ("hash", "rules_json")
+SELECT DISTINCT ON (md5(("reasons_json" -> 'rules')::text))
+  md5(("reasons_json" -> 'rules')::text), "reasons_json" -> 'rules'
+FROM "candidates_filtered"
+WHERE jsonb_typeof("reasons_json" -> 'rules') = 'object'
+ON CONFLICT ("hash") DO NOTHING;
+
+UPDATE "candidates_filtered" AS c SET
+  "price" = (c."reasons_json" ->> 'price')::numeric,
+  "rvol" = (c."reasons_json" ->> 'rvol')::numeric,
+  "pct_change" = (c."reasons_json" ->> 'pct_change')::numeric,
+  "volume" = (c."reasons_json" ->> 'volume')::bigint,
+  "rule_snapshot_id" = (
+    SELECT s."id" FROM "rule_snapshots" AS s
+    WHERE s."hash" = md5((c."reasons_json" -> 'rules')::text)
+  ),
+  "reasons_json" = nullif(
+    c."reasons_json" - 'price' - 'rvol' - 'pct_change' - 'volume' - 'rules', '{}'::jsonb
+  )
+WHERE c."reasons_json" ?| ARRAY['price', 'rvol', 'pct_change', 'volume', 'rules'];
+
+-- A batch's snapshot is the one its own candidates were scored with.
+UPDATE "rvol_batches" AS b SET "rule_snapshot_id" = c."rule_snapshot_id"
+FROM (
+  SELECT DISTINCT ON ("batch_id") "batch_id", "rule_snapshot_id"
+  FROM "candidates_filtered"
+  WHERE "rule_snapshot_id" IS NOT NULL
+  ORDER BY "batch_id", "id"
+) AS c
+WHERE b."id" = c."batch_id" AND b."rule_snapshot_id" IS NULL;
+
+-- The rewritten rows leave dead tuples and TOAST behind; run
+-- VACUUM FULL "candidates_filtered" (outside this transaction) to hand the
+-- space back, plain VACUUM to make it reusable.
@@ -61,6 +61,7 @@ type ApiAlert = {
   threshold_value: number;
   trailing: boolean;
   active: boolean;
+  state: 'armed' | 'fired';
   created_at: string;
   last_triggered_at: string | null;
 };
@@ -351,48 +352,47 @@ const PositionTargetsTable = ({
     setSnackbar(null);
 
     try {
+      // swap the old alert for the new one in a single transaction
+      const operations: Record<string, unknown>[] = [];
       if (
         current.active &&
         current.alertKind &&
         current.threshold !== null &&
         (current.alertKind !== desiredKind || Math.abs(current.threshold - parsedValue) > 1e-6)
       ) {
-        const deactivateResponse = await fetch(`${API_BASE_URL}/api/alerts/deactivate`, {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json'
-          },
-          body: JSON.stringify({
-            ticker: normalizedTicker,
-            kind: current.alertKind,
-            threshold_value: current.threshold,
-            trailing: false
-          })
+        operations.push({
+          op: 'deactivate',
+          ticker: normalizedTicker,
+          kind: current.alertKind,
+          threshold_value: current.threshold,
+          trailing: false
         });
-
-        if (!deactivateResponse.ok) {
-          throw new Error('Unable to update existing custom alert.');
-        }
       }
+      operations.push({
+        op: 'activate',
+        ticker: normalizedTicker,
+        kind: desiredKind,
+        threshold_value: parsedValue,
+        trailing: false
+      });
 
-      const response = await fetch(`${API_BASE_URL}/api/alerts/activate`, {
+      const response = await fetch(`${API_BASE_URL}/api/alerts/bulk`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json'
         },
-        body: JSON.stringify({
-          ticker: normalizedTicker,
-          kind: desiredKind,
-          threshold_value: parsedValue,
-          trailing: false
-        })
+        body: JSON.stringify({ operations })
       });
 
       if (!response.ok) {
         throw new Error('Unable to set custom alert.');
       }
 
-      const data: ApiAlert = await response.json();
+      const { results }: { results: (ApiAlert | null)[] } = await response.json();
+      const data = results[results.length - 1];
+      if (!data) {
+        throw new Error('Unable to set custom alert.');
+      }
       const numericThreshold = Number(data.threshold_value);
 
       setCustomTargets((prev) => ({